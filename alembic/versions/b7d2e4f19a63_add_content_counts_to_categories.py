@@ -0,0 +1,62 @@
+"""Add published content counts to categories
+
+Revision ID: b7d2e4f19a63
+Revises: f3a9c6b1d274
+Create Date: 2026-10-19 14:05:32.918274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f19a63'
+down_revision = 'f3a9c6b1d274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column('content_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('total_content_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Fill in the counts of existing contents
+    connection = op.get_bind()
+    parents = dict(connection.execute(sa.text('SELECT category_id, parent_id FROM categories')).all())
+    counts = dict(
+        connection.execute(
+            sa.text(
+                'SELECT category_id, COUNT(*) FROM contents '
+                'WHERE is_published = :published AND category_id IS NOT NULL '
+                'GROUP BY category_id'
+            ),
+            {'published': True},
+        ).all()
+    )
+    totals = dict.fromkeys(parents, 0)
+    for category_id, count in counts.items():
+        seen = set()
+        ancestor_id = category_id
+        while ancestor_id in parents and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            totals[ancestor_id] += count
+            ancestor_id = parents[ancestor_id]
+
+    rows = [
+        {'category_id': category_id, 'content_count': counts.get(category_id, 0), 'total_content_count': total}
+        for category_id, total in totals.items()
+        if total
+    ]
+    if rows:
+        connection.execute(
+            sa.text(
+                'UPDATE categories SET content_count = :content_count, '
+                'total_content_count = :total_content_count WHERE category_id = :category_id'
+            ),
+            rows,
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('categories', 'total_content_count')
+    op.drop_column('categories', 'content_count')
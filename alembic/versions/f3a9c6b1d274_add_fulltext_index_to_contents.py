@@ -0,0 +1,46 @@
+"""Add full-text index to contents
+
+Revision ID: f3a9c6b1d274
+Revises: e5b8d17c2a90
+Create Date: 2026-10-19 13:05:22.184903
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c6b1d274'
+down_revision = 'e5b8d17c2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == 'mysql':
+        op.create_index(
+            'ix_contents_title_description_fulltext',
+            'contents',
+            ['title', 'description'],
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        )
+    elif dialect_name == 'sqlite':
+        from src.models.content import CONTENT_FTS_DDL, CONTENT_FTS_TABLE
+
+        for statement in CONTENT_FTS_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute(
+            f"INSERT INTO {CONTENT_FTS_TABLE}({CONTENT_FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def downgrade() -> None:
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name == 'mysql':
+        op.drop_index('ix_contents_title_description_fulltext', table_name='contents')
+    elif dialect_name == 'sqlite':
+        for trigger in ('insert', 'update', 'delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS contents_fts_{trigger}')
+        op.execute('DROP TABLE IF EXISTS contents_fts')
@@ -0,0 +1,168 @@
+"""
+Benchmark concurrent database-bound requests: sync Session vs AsyncSession
+
+Usage:
+    python -m benchmarks.bench_db_concurrency [concurrency] [latency_ms]
+
+Every request runs one query that takes latency_ms on the database side
+(a SQLite function that sleeps, standing in for a MySQL round trip). The
+sync variant is a ``def`` endpoint with a synchronous Session, so each
+in-flight request occupies one of AnyIO's 40 worker threads. The async
+variant awaits an AsyncSession and is only bounded by the connection pool,
+which is sized to the concurrency for both variants.
+
+The peak number of requests waiting on the database at the same time is
+reported next to the wall time. aiosqlite runs each connection in its own
+thread, so absolute async numbers are pessimistic compared to aiomysql.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+
+class InFlight:
+    """Track how many requests are inside a query at the same time"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.current -= 1
+
+
+def _sleep_ms(milliseconds):
+    time.sleep(milliseconds / 1000)
+    return milliseconds
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def build_sync_app(path: str, pool_size: int, in_flight: InFlight):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    event.listen(engine, "connect", _register_sleep)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/query")
+    def query(latency_ms: int, db: Session = Depends(get_db)):
+        with in_flight:
+            result = db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency_ms})
+        return {"value": result.scalar()}
+
+    return app, engine
+
+
+def build_async_app(path: str, pool_size: int, in_flight: InFlight):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", pool_size=pool_size, max_overflow=0
+    )
+    event.listen(engine.sync_engine, "connect", _register_sleep)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/query")
+    async def query(latency_ms: int, db: AsyncSession = Depends(get_db)):
+        with in_flight:
+            result = await db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency_ms})
+        return {"value": result.scalar()}
+
+    return app, engine
+
+
+async def run(app, concurrency: int, latency_ms: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        params = {"latency_ms": latency_ms}
+
+        # Warm up the connection pool
+        await asyncio.gather(
+            *(client.get("/query", params=params) for _ in range(concurrency))
+        )
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/query", params=params) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    return elapsed
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+
+        sync_in_flight = InFlight()
+        sync_app, sync_engine = build_sync_app(path, concurrency, sync_in_flight)
+        sync_elapsed = asyncio.run(run(sync_app, concurrency, latency_ms))
+        sync_engine.dispose()
+
+        async_in_flight = InFlight()
+
+        async def run_async():
+            async_app, async_engine = build_async_app(
+                path, concurrency, async_in_flight
+            )
+            try:
+                return await run(async_app, concurrency, latency_ms)
+            finally:
+                await async_engine.dispose()
+
+        async_elapsed = asyncio.run(run_async())
+
+    print(f"{concurrency} concurrent requests, {latency_ms} ms per query")
+    for name, elapsed, in_flight in (
+        ("sync Session", sync_elapsed, sync_in_flight),
+        ("AsyncSession", async_elapsed, async_in_flight),
+    ):
+        print(
+            f"{name:<14} {elapsed * 1000:8.1f} ms total "
+            f"{concurrency / elapsed:8.1f} requests/s "
+            f"peak in-flight queries {in_flight.peak:4d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark log call latency with a slow log sink
+
+Usage:
+    python -m benchmarks.bench_logging [users] [calls_per_user]
+
+Simulates concurrent request handlers (one asyncio task per user) logging
+to a stream whose write() takes 1 ms, first through a synchronous
+StreamHandler and then through the background queue pipeline. Reports
+the caller-side latency of each log call.
+"""
+
+import asyncio
+import io
+import logging
+import statistics
+import sys
+import time
+
+import structlog
+
+from src.config import logging_config
+
+
+class SlowStream(io.StringIO):
+    """Stream that simulates a slow stdout/disk"""
+
+    def write(self, s):
+        time.sleep(0.001)
+        return super().write(s)
+
+
+async def simulate_users(logger, users: int, calls: int):
+    latencies = []
+
+    async def user(user_id: int):
+        for call in range(calls):
+            start = time.perf_counter()
+            logger.info("Request completed", user=user_id, call=call)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(user(user_id) for user_id in range(users)))
+    return latencies
+
+
+def report(name: str, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<12} p50={p50 * 1e6:9.1f} us  p99={p99 * 1e6:9.1f} us")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    # Synchronous rendering and writing on the caller
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.StreamHandler(SlowStream())]
+    root_logger.setLevel(logging.INFO)
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(),
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=False,
+    )
+    report(
+        "synchronous",
+        asyncio.run(simulate_users(structlog.get_logger("bench"), users, calls)),
+    )
+
+    # Background queue pipeline
+    listener = logging_config.setup_logging(stream=SlowStream())
+    report(
+        "queued",
+        asyncio.run(simulate_users(structlog.get_logger("bench"), users, calls)),
+    )
+    logging_config.shutdown_logging()
+    print(f"dropped={logging_config.get_dropped_log_count()}")
+    listener.handlers[0].flush()
+
+
+if __name__ == "__main__":
+    main()
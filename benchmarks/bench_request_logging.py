@@ -0,0 +1,124 @@
+"""
+Benchmark the per-request overhead of the request logging middleware
+
+Usage:
+    python -m benchmarks.bench_request_logging [iterations]
+
+Drives the ASGI stack directly (no sockets) so that only middleware cost is
+measured. Compares a bare endpoint, the pure ASGI RequestLoggingMiddleware
+and an equivalent BaseHTTPMiddleware implementation.
+"""
+
+import asyncio
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.middleware.request_logging import RequestLoggingMiddleware
+
+
+class NullLogger:
+    """Logger that discards everything, so only middleware cost is measured"""
+
+    def info(self, *args, **kwargs):
+        pass
+
+    warning = info
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok")
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous @app.middleware("http") implementation"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        NullLogger().info("Request started", url=str(request.url))
+        response = await call_next(request)
+        NullLogger().info(
+            "Request completed",
+            url=str(request.url),
+            status_code=response.status_code,
+            process_time=time.time() - start_time,
+        )
+        return response
+
+
+def build_app(middleware):
+    return Starlette(
+        routes=[Route("/items/{item_id}", endpoint)], middleware=middleware
+    )
+
+
+async def run(app, iterations: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/42",
+        "raw_path": b"/items/42",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+
+    async def send(message):
+        pass
+
+    async def request_once():
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if body_sent:
+                # The client stays connected until the response is finished
+                await asyncio.Event().wait()
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await app(dict(scope), receive, send)
+
+    # Warm up
+    for _ in range(1000):
+        await request_once()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await request_once()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    apps = {
+        "no middleware": build_app([]),
+        "pure ASGI": build_app(
+            [Middleware(RequestLoggingMiddleware, logger=NullLogger())]
+        ),
+        "BaseHTTPMiddleware": build_app([Middleware(BaseHTTPLoggingMiddleware)]),
+    }
+
+    baseline = None
+    for name, app in apps.items():
+        per_request = asyncio.run(run(app, iterations))
+        baseline = per_request if baseline is None else baseline
+        print(
+            f"{name:<20} {per_request * 1e6:8.1f} us/request "
+            f"(+{(per_request - baseline) * 1e6:6.1f} us)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark the serialization of assessment responses
+
+Usage:
+    python -m benchmarks.bench_serialization [questions] [quizzes] [rounds]
+
+Encodes a quiz with its questions (four choices each), as GET
+/assessment/quizzes/{quiz_id} returns it, and a page of quizzes, as GET
+/assessment/quizzes returns it, from ORM rows held in memory. Each is
+encoded twice:
+
+- before: the response model built field by field, validated again against
+  response_model by FastAPI and encoded with the stdlib json module
+- after: the response model built with model_validate from the rows and
+  encoded with orjson by json_response()
+
+Reports the median time per response and the body size of both.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.models import content, learning, user  # noqa: F401 (related mappers)
+from src.models.assessment import Question, QuestionChoice, Quiz
+from src.schemas.assessment import (
+    QuestionChoiceResponse,
+    QuestionResponse,
+    QuizListResponse,
+    QuizResponse,
+)
+from src.utils.json_response import json_response
+
+
+def make_quiz(number: int, questions: int) -> Quiz:
+    now = datetime.utcnow()
+    return Quiz(
+        quiz_id=f"quiz-{number}",
+        title=f"情報セキュリティ理解度テスト 第{number + 1}回",
+        description="社内ルールと事例を確認するためのテストです",
+        content_id=f"content-{number}",
+        time_limit_minutes=30,
+        max_attempts=3,
+        passing_score=70.0,
+        is_randomized=False,
+        is_published=True,
+        created_by="admin",
+        created_at=now,
+        updated_at=now,
+        questions=[
+            Question(
+                question_id=f"question-{number}-{index}",
+                question_text=f"問{index + 1}: 次のうち正しい対応はどれですか。" * 3,
+                question_type="multiple_choice",
+                points=1.0,
+                order_index=index,
+                explanation="社内規程の第3章を参照してください。",
+                is_required=True,
+                choices=[
+                    QuestionChoice(
+                        choice_id=f"choice-{number}-{index}-{order}",
+                        choice_text=f"選択肢{order + 1}の説明文",
+                        is_correct=order == 0,
+                        order_index=order,
+                    )
+                    for order in range(4)
+                ],
+            )
+            for index in range(questions)
+        ],
+    )
+
+
+def build_by_field(quiz: Quiz) -> QuizResponse:
+    """The response model as the endpoints used to build it"""
+    questions = []
+    for question in quiz.questions:
+        choices = []
+        for choice in question.choices:
+            choices.append(
+                QuestionChoiceResponse(
+                    choice_id=choice.choice_id,
+                    choice_text=choice.choice_text,
+                    is_correct=choice.is_correct,
+                    order_index=choice.order_index,
+                )
+            )
+        questions.append(
+            QuestionResponse(
+                question_id=question.question_id,
+                question_text=question.question_text,
+                question_type=question.question_type,
+                points=question.points,
+                order_index=question.order_index,
+                explanation=question.explanation,
+                is_required=question.is_required,
+                choices=choices,
+            )
+        )
+    return QuizResponse(
+        quiz_id=quiz.quiz_id,
+        title=quiz.title,
+        description=quiz.description,
+        content_id=quiz.content_id,
+        time_limit_minutes=quiz.time_limit_minutes,
+        max_attempts=quiz.max_attempts,
+        passing_score=quiz.passing_score,
+        is_randomized=quiz.is_randomized,
+        is_published=quiz.is_published,
+        created_by=quiz.created_by,
+        created_at=quiz.created_at,
+        updated_at=quiz.updated_at,
+        questions=questions,
+    )
+
+
+def page_of(responses, per_page: int) -> QuizListResponse:
+    return QuizListResponse(
+        quizzes=responses,
+        total=len(responses),
+        page=1,
+        per_page=per_page,
+        total_pages=1,
+    )
+
+
+def measure(encode, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = encode()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    quizzes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    quiz = make_quiz(0, questions)
+    page = [make_quiz(number, 0) for number in range(quizzes)]
+    loop = asyncio.new_event_loop()
+
+    def through_fastapi(response_model, build):
+        field = create_response_field(name="response", type_=response_model)
+
+        def encode():
+            data = loop.run_until_complete(
+                serialize_response(
+                    field=field, response_content=build(), is_coroutine=True
+                )
+            )
+            return JSONResponse(data).body
+
+        return encode
+
+    cases = [
+        (
+            f"quiz with {questions} questions",
+            through_fastapi(QuizResponse, lambda: build_by_field(quiz)),
+            lambda: json_response(QuizResponse.model_validate(quiz)).body,
+        ),
+        (
+            f"list of {quizzes} quizzes",
+            through_fastapi(
+                QuizListResponse,
+                lambda: page_of([build_by_field(item) for item in page], quizzes),
+            ),
+            lambda: json_response(
+                page_of([QuizResponse.model_validate(item) for item in page], quizzes)
+            ).body,
+        ),
+    ]
+
+    for name, before, after in cases:
+        before_time, before_size = measure(before, rounds)
+        after_time, after_size = measure(after, rounds)
+        print(
+            f"{name}: before={before_time * 1e3:.2f} ms ({before_size} B)  "
+            f"after={after_time * 1e3:.2f} ms ({after_size} B)  "
+            f"{before_time / after_time:.1f}x"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark the in-memory suggest index on a synthetic catalog
+
+Usage:
+    python -m benchmarks.bench_suggest_index [contents] [queries]
+
+Builds the NgramIndex behind GET /contents/suggest from randomly combined
+Japanese and English titles, descriptions and category names, then runs
+prefixes of existing titles through it as a user typing would. Reports the
+build time, the memory held by the index and the query latency.
+"""
+
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from src.services.content_suggest import SUGGEST_FIELD_WEIGHTS, _fields
+from src.utils.ngram_index import NgramIndex
+
+TOPICS = [
+    "機械学習",
+    "情報セキュリティ",
+    "コンプライアンス",
+    "ハラスメント防止",
+    "プロジェクト管理",
+    "データ分析",
+    "クラウド",
+    "Python",
+    "Excel",
+    "ビジネスマナー",
+    "リーダーシップ",
+    "品質管理",
+    "個人情報保護",
+    "会計",
+    "マーケティング",
+]
+LEVELS = ["入門", "基礎", "応用", "実践", "演習", "研修", "ワークショップ"]
+CATEGORIES = ["IT", "法務", "人事", "営業", "経理", "データサイエンス", "新人研修"]
+PHRASES = [
+    "の基本を学びます",
+    "を業務で活用する方法を紹介します",
+    "に関する社内ルールを確認します",
+    "の事例を交えて解説します",
+    "の理解度をテストで確認します",
+]
+
+
+def catalog(size: int, rng: random.Random):
+    for number in range(size):
+        topic = rng.choice(TOPICS)
+        title = f"{topic}{rng.choice(LEVELS)} 第{number % 20 + 1}回"
+        description = "。".join(
+            f"{rng.choice(TOPICS)}{rng.choice(PHRASES)}" for _ in range(3)
+        )
+        yield f"content-{number}", _fields(title, description, rng.choice(CATEGORIES))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+    documents = list(catalog(size, rng))
+
+    start = time.perf_counter()
+    index = NgramIndex.build(SUGGEST_FIELD_WEIGHTS, documents)
+    build = time.perf_counter() - start
+
+    # Built again with tracing, which slows building down too much to time
+    del index
+    tracemalloc.start()
+    index = NgramIndex.build(SUGGEST_FIELD_WEIGHTS, documents)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"contents={size}  build={build:.2f} s  memory={memory / 2**20:.1f} MiB")
+
+    # Prefixes of existing titles, from two characters to the whole title
+    typed = []
+    for _ in range(queries):
+        title = rng.choice(documents)[1]["title"]
+        typed.append(title[: rng.randint(2, len(title))])
+
+    latencies = []
+    for query in typed:
+        start = time.perf_counter()
+        index.search(query)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"queries={queries}  p50={p50 * 1e3:.2f} ms  p99={p99 * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,85 @@
 #!/usr/bin/env python3
 """
 Script to delete all users from the database
+
+Usage:
+    python delete_users.py [--batch-size 1000]
+
+Users are read and deleted a batch at a time, each batch in its own
+transaction, so the table is never loaded into memory or locked as a whole.
 """
 
-from src.config.database import SessionLocal
+import argparse
+import asyncio
+
+from sqlalchemy import delete, func, select
+
+from src.config.database import AsyncSessionLocal, engine
+from src.config.settings import settings
 from src.models.user import User
 
-def delete_all_users():
+# Imported so that the relationships of User can be resolved
+from src.models import assessment, content, learning  # noqa: F401
+
+
+async def delete_all_users(batch_size: int):
     """Delete all users from the database"""
     # データベースセッションを作成
-    db = SessionLocal()
-    
+    db = AsyncSessionLocal()
+
     try:
-        # 全ユーザーを取得
-        users = db.query(User).all()
-        user_count = len(users)
-        print(f'削除前のユーザー数: {user_count}')
-        
+        user_count = await db.scalar(select(func.count()).select_from(User))
+        print(f"削除前のユーザー数: {user_count}")
+
         if user_count > 0:
-            # 各ユーザーの情報を表示
-            print('\n削除対象のユーザー:')
-            for user in users:
-                print(f'- {user.email} ({user.display_name})')
-            
-            # 全ユーザーを削除
-            db.query(User).delete()
-            db.commit()
-            print(f'\n✅ {user_count}人のユーザーを削除しました')
+            print("\n削除対象のユーザー:")
+            deleted = 0
+            while True:
+                # 次のバッチを取得
+                result = await db.execute(
+                    select(User.user_id, User.email, User.display_name).limit(
+                        batch_size
+                    )
+                )
+                users = result.all()
+                if not users:
+                    break
+
+                for user in users:
+                    print(f"- {user.email} ({user.display_name})")
+
+                # バッチ単位で削除・コミット
+                await db.execute(
+                    delete(User).where(User.user_id.in_([u.user_id for u in users]))
+                )
+                await db.commit()
+                deleted += len(users)
+                print(f"削除済み: {deleted}/{user_count}")
+
+            print(f"\n✅ {deleted}人のユーザーを削除しました")
         else:
-            print('削除するユーザーがありません')
-            
+            print("削除するユーザーがありません")
+
         # 削除後の確認
-        remaining_users = db.query(User).count()
-        print(f'削除後のユーザー数: {remaining_users}')
-        
+        remaining_users = await db.scalar(select(func.count()).select_from(User))
+        print(f"削除後のユーザー数: {remaining_users}")
+
     except Exception as e:
-        print(f'❌ エラーが発生しました: {e}')
-        db.rollback()
+        print(f"❌ エラーが発生しました: {e}")
+        await db.rollback()
         raise
     finally:
-        db.close()
+        await db.close()
+        await engine.dispose()
+
 
 if __name__ == "__main__":
-    delete_all_users() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Delete all users")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.DELETE_BATCH_SIZE,
+        help="users deleted per transaction",
+    )
+    args = parser.parse_args()
+    asyncio.run(delete_all_users(args.batch_size))
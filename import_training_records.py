@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script to import training records kept before the system went live
+
+Usage:
+    python import_training_records.py progress progress.csv
+    python import_training_records.py quiz-attempts attempts.csv
+
+Users, contents and quizzes must already exist; rows refer to them by
+email and title. The last committed line is kept in <file>.checkpoint, so an
+interrupted import continues where it stopped when run again.
+"""
+
+import argparse
+import asyncio
+
+from src.config.database import AsyncSessionLocal, engine
+from src.services.training_import_service import TrainingRecordImportService
+from src.utils.csv_import import CSVFormatError, ImportCheckpoint
+
+
+async def import_training_records(
+    record_type: str, path: str, checkpoint_path: str, chunk_size: int
+):
+    """Import training records from a CSV file"""
+    # データベースセッションを作成
+    db = AsyncSessionLocal()
+    checkpoint = ImportCheckpoint(checkpoint_path)
+    import_service = TrainingRecordImportService(db, chunk_size)
+
+    try:
+        if checkpoint.line:
+            print(f"{checkpoint.line}行目まで取り込み済みのため、続きから再開します")
+
+        with open(path, encoding="utf-8-sig", newline="") as csv_file:
+            if record_type == "progress":
+                result = await import_service.import_progress_csv(csv_file, checkpoint)
+            else:
+                result = await import_service.import_quiz_attempts_csv(
+                    csv_file, checkpoint
+                )
+
+        print(f"処理した行数: {result.processed}（スキップ: {result.skipped}）")
+        print(f"✅ {result.imported}件の研修記録を登録・更新しました")
+        if result.failed:
+            print(f"❌ {result.failed}行を取り込めませんでした")
+            for error in result.errors:
+                print(f"- {error.line}行目: {error.error}")
+
+    except CSVFormatError as e:
+        print(f"❌ CSVを読み込めません: {e}")
+        raise SystemExit(1)
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        print(f"再実行すると {checkpoint.line} 行目の次から再開します")
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import historical training records")
+    parser.add_argument("record_type", choices=["progress", "quiz-attempts"])
+    parser.add_argument("path", help="CSV file with a header row")
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="checkpoint file (default: <path>.checkpoint)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="rows per INSERT statement"
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        import_training_records(
+            args.record_type,
+            args.path,
+            args.checkpoint or f"{args.path}.checkpoint",
+            args.chunk_size,
+        )
+    )
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script to import users from a CSV file
+
+Usage:
+    python import_users.py users.csv [--chunk-size 1000]
+
+The CSV needs a header row with email and display_name columns, and may
+have department and position. Users that already exist (same email) are
+updated, so the import can be run again with the same file.
+"""
+
+import argparse
+import asyncio
+
+from src.config.database import AsyncSessionLocal, engine
+from src.services.user_import_service import UserImportService
+from src.utils.csv_import import CSVFormatError
+
+
+async def import_users(path: str, chunk_size: int):
+    """Import users from a CSV file"""
+    # データベースセッションを作成
+    db = AsyncSessionLocal()
+
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as csv_file:
+            result = await UserImportService(db, chunk_size).import_csv(csv_file)
+
+        print(f"処理した行数: {result.processed}")
+        print(f"✅ {result.imported}人のユーザーを登録・更新しました")
+        if result.failed:
+            print(f"❌ {result.failed}行を取り込めませんでした")
+            for error in result.errors:
+                print(f"- {error.line}行目: {error.error}")
+
+    except CSVFormatError as e:
+        print(f"❌ CSVを読み込めません: {e}")
+        raise SystemExit(1)
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import users from a CSV file")
+    parser.add_argument("path", help="CSV file with a header row")
+    parser.add_argument(
+        "--chunk-size", type=int, default=None, help="rows per INSERT statement"
+    )
+    args = parser.parse_args()
+    asyncio.run(import_users(args.path, args.chunk_size))
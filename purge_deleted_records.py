@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Script to purge quizzes and assessments marked as deleted
+
+Usage:
+    python purge_deleted_records.py [--batch-size 1000]
+
+Deleting a quiz or assessment through the API hides it at once and purges
+its related rows in a background task. This script finishes purges that
+were interrupted, e.g. by a restart, and can safely be run at any time.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from src.config.database import AsyncSessionLocal, engine
+from src.models.assessment import Assessment, Quiz
+from src.services.assessment_service import AssessmentService
+
+# Imported so that the relationships between models can be resolved
+from src.models import content, learning, user  # noqa: F401
+
+
+def print_progress(table: str, deleted: int):
+    print(f"  {table}: {deleted}行削除")
+
+
+async def purge_deleted_records(batch_size: int):
+    """Purge every quiz and assessment marked as deleted"""
+    # データベースセッションを作成
+    db = AsyncSessionLocal()
+
+    try:
+        service = AssessmentService(db)
+        result = await db.execute(
+            select(Quiz.quiz_id).where(Quiz.deleted_at.isnot(None))
+        )
+        quiz_ids = result.scalars().all()
+        result = await db.execute(
+            select(Assessment.assessment_id).where(Assessment.deleted_at.isnot(None))
+        )
+        assessment_ids = result.scalars().all()
+
+        if not quiz_ids and not assessment_ids:
+            print("削除待ちのデータはありません")
+            return
+
+        for quiz_id in quiz_ids:
+            print(f"クイズ {quiz_id} を削除中")
+            await service.purge_quiz(quiz_id, batch_size, print_progress)
+        for assessment_id in assessment_ids:
+            print(f"評価 {assessment_id} を削除中")
+            await service.purge_assessment(assessment_id, batch_size, print_progress)
+
+        print(f"\n✅ {len(quiz_ids)}件のクイズと{len(assessment_ids)}件の評価を削除しました")
+
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Purge quizzes and assessments marked as deleted"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="rows deleted per transaction"
+    )
+    args = parser.parse_args()
+    asyncio.run(purge_deleted_records(args.batch_size))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script to correct the published content counts of categories
+
+Usage:
+    python reconcile_category_counts.py
+
+The counts shown in the category list are updated on every content write.
+This script recounts them from the contents table and fixes any that
+drifted, e.g. through writes made outside the API. Run it periodically
+(e.g. nightly from cron); it can safely be run at any time.
+"""
+
+import asyncio
+
+from src.config.database import AsyncSessionLocal, engine
+from src.services.content_service import ContentService
+
+# Imported so that the relationships between models can be resolved
+from src.models import assessment, content, learning, user  # noqa: F401
+
+
+async def reconcile_category_counts():
+    """Recount the published contents of every category"""
+    # データベースセッションを作成
+    db = AsyncSessionLocal()
+
+    try:
+        fixed = await ContentService(db).reconcile_category_counts()
+        if fixed:
+            print(f"✅ {fixed}件のカテゴリの件数を修正しました")
+        else:
+            print("✅ 件数のずれはありません")
+
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_category_counts())
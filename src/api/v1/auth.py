@@ -3,10 +3,11 @@ Authentication API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config.database import get_db
-from src.api.v1.deps import get_current_user
+from src.api.v1.deps import get_current_user, security, SessionReleasingRoute
 from src.models.user import User
 from src.services.auth_service import AuthService
 from src.schemas.auth import (
@@ -18,13 +19,13 @@ from src.schemas.auth import (
 )
 from src.schemas.user import UserResponse
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def register(user_data: UserRegistration, db: Session = Depends(get_db)):
+async def register(user_data: UserRegistration, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     auth_service = AuthService(db)
     user = await auth_service.register_user(user_data)
@@ -32,7 +33,7 @@ async def register(user_data: UserRegistration, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """Login user and return access token"""
     auth_service = AuthService(db)
     tokens = await auth_service.login_user(
@@ -43,23 +44,26 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
-    refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)
+    refresh_data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)
 ):
-    """Refresh access token using refresh token"""
+    """Refresh access token (the refresh token is rotated)"""
     auth_service = AuthService(db)
     tokens = await auth_service.refresh_access_token(refresh_data.refresh_token)
-    return TokenResponse(
-        access_token=tokens["access_token"], expires_in=tokens["expires_in"]
-    )
+    return TokenResponse(**tokens)
 
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Logout user by invalidating refresh token"""
+    """Logout user by revoking the session of the current token"""
     auth_service = AuthService(db)
-    success = await auth_service.logout_user(current_user.user_id)
+    token_data = auth_service.verify_token(credentials.credentials)
+    success = await auth_service.logout_user(
+        current_user.user_id, session_id=token_data.session_id
+    )
 
     if not success:
         raise HTTPException(
@@ -73,7 +77,7 @@ async def logout(
 async def change_password(
     password_data: PasswordChangeRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Change user password"""
     auth_service = AuthService(db)
@@ -3,27 +3,55 @@ Content API endpoints
 """
 
 import math
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional
-
-from src.config.database import get_db
-from src.api.v1.deps import get_current_user, get_current_active_admin
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
+
+from src.config.database import get_db, get_session_factory
+from src.api.v1.deps import (
+    get_current_user,
+    get_current_active_admin,
+    SessionReleasingRoute,
+)
 from src.models.user import User
+from src.services.content_search import highlight_content, search_terms
 from src.services.content_service import ContentService
+from src.services.content_suggest import suggest_index
+from src.utils.http_cache import (
+    REVALIDATE,
+    SHORT_LIVED,
+    conditional_response,
+    etag_for,
+)
+from src.utils.json_response import json_response
+from src.utils.sparse_fields import FIELDS_DESCRIPTION, parse_fields, project
 from src.schemas.content import (
     CategoryCreate,
     CategoryUpdate,
     CategoryResponse,
+    CategoryBreadcrumb,
     CategoryListResponse,
     ContentCreate,
     ContentUpdate,
     ContentResponse,
     ContentListResponse,
+    ContentSuggestResponse,
     ContentType,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+# Fields a content list can be narrowed to with fields=
+CONTENT_FIELDS = tuple(ContentResponse.model_fields)
 
 
 # Category endpoints
@@ -31,7 +59,7 @@ router = APIRouter()
 async def create_category(
     category_data: CategoryCreate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new category (Admin only)"""
     content_service = ContentService(db)
@@ -40,12 +68,14 @@ async def create_category(
 
 @router.get("/categories", response_model=CategoryListResponse)
 async def get_categories(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     parent_id: Optional[str] = Query(None, description="Filter by parent category"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get categories with pagination and filters"""
     content_service = ContentService(db)
@@ -57,6 +87,11 @@ async def get_categories(
 
     total_pages = math.ceil(total / per_page)
 
+    etag = etag_for(*categories, extra=(total, page, per_page))
+    not_modified = conditional_response(request, response, etag, SHORT_LIVED)
+    if not_modified:
+        return not_modified
+
     return CategoryListResponse(
         categories=categories,
         total=total,
@@ -69,8 +104,10 @@ async def get_categories(
 @router.get("/categories/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get category by ID"""
     content_service = ContentService(db)
@@ -81,15 +118,41 @@ async def get_category(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
         )
 
+    not_modified = conditional_response(
+        request, response, etag_for(category), SHORT_LIVED
+    )
+    if not_modified:
+        return not_modified
+
     return category
 
 
+@router.get(
+    "/categories/{category_id}/breadcrumbs", response_model=List[CategoryBreadcrumb]
+)
+async def get_category_breadcrumbs(
+    category_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the categories from the root down to a category"""
+    content_service = ContentService(db)
+    breadcrumbs = await content_service.get_category_breadcrumbs(category_id)
+
+    if breadcrumbs is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
+        )
+
+    return breadcrumbs
+
+
 @router.put("/categories/{category_id}", response_model=CategoryResponse)
 async def update_category(
     category_id: str,
     category_data: CategoryUpdate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update category (Admin only)"""
     content_service = ContentService(db)
@@ -107,7 +170,7 @@ async def update_category(
 async def delete_category(
     category_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete category (Admin only)"""
     content_service = ContentService(db)
@@ -126,7 +189,7 @@ async def delete_category(
 async def create_content(
     content_data: ContentCreate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new content (Admin only)"""
     content_service = ContentService(db)
@@ -135,9 +198,14 @@ async def create_content(
 
 @router.get("/", response_model=ContentListResponse)
 async def get_contents(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     category_id: Optional[str] = Query(None, description="Filter by category"),
+    include_descendants: bool = Query(
+        False, description="Include contents of the categories below category_id"
+    ),
     content_type: Optional[ContentType] = Query(
         None, description="Filter by content type"
     ),
@@ -145,13 +213,21 @@ async def get_contents(
         None, description="Filter by published status"
     ),
     search: Optional[str] = Query(None, description="Search in title and description"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get contents with pagination and filters"""
     content_service = ContentService(db)
     skip = (page - 1) * per_page
 
+    selected = parse_fields(fields, CONTENT_FIELDS)
+    columns = None
+    if selected:
+        columns = [field for field in selected if field != "highlight"]
+        if "highlight" in selected:
+            columns += ["title", "description"]
+
     contents, total = await content_service.get_contents(
         skip=skip,
         limit=per_page,
@@ -159,12 +235,48 @@ async def get_contents(
         content_type=content_type.value if content_type else None,
         is_published=is_published,
         search=search,
+        include_descendants=include_descendants,
+        columns=columns,
     )
 
     total_pages = math.ceil(total / per_page)
 
+    etag = etag_for(*contents, extra=(total, page, per_page, search, selected))
+    not_modified = conditional_response(request, response, etag, REVALIDATE)
+    if not_modified:
+        return not_modified
+
+    terms = search_terms(search) if search else None
+    if selected:
+        # Only the selected fields, encoded as they are
+        items = []
+        for content in contents:
+            item = project(
+                content, (field for field in selected if field != "highlight")
+            )
+            if "highlight" in selected:
+                item["highlight"] = (
+                    highlight_content(content, terms).model_dump() if search else None
+                )
+            items.append(item)
+        return json_response(
+            {
+                "contents": items,
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "total_pages": total_pages,
+            },
+            response,
+        )
+
+    items = [ContentResponse.model_validate(content) for content in contents]
+    if search:
+        for item, content in zip(items, contents):
+            item.highlight = highlight_content(content, terms)
+
     return ContentListResponse(
-        contents=contents,
+        contents=items,
         total=total,
         page=page,
         per_page=per_page,
@@ -172,11 +284,31 @@ async def get_contents(
     )
 
 
+@router.get("/suggest", response_model=ContentSuggestResponse)
+async def suggest_contents(
+    background_tasks: BackgroundTasks,
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of ids"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """Ids of published contents matching a partial query, best first"""
+    if not suggest_index.loaded:
+        await suggest_index.ensure_loaded(db)
+    elif suggest_index.is_stale():
+        background_tasks.add_task(suggest_index.refresh, session_factory)
+
+    return ContentSuggestResponse(query=q, content_ids=suggest_index.suggest(q, limit))
+
+
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get content by ID"""
     content_service = ContentService(db)
@@ -195,6 +327,12 @@ async def get_content(
             detail="Access denied to unpublished content",
         )
 
+    not_modified = conditional_response(
+        request, response, etag_for(content), REVALIDATE
+    )
+    if not_modified:
+        return not_modified
+
     return content
 
 
@@ -203,7 +341,7 @@ async def update_content(
     content_id: str,
     content_data: ContentUpdate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update content (Admin only)"""
     content_service = ContentService(db)
@@ -221,7 +359,7 @@ async def update_content(
 async def delete_content(
     content_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete content (Admin only)"""
     content_service = ContentService(db)
@@ -239,7 +377,7 @@ async def delete_content(
 async def publish_content(
     content_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Publish content (Admin only)"""
     content_service = ContentService(db)
@@ -257,7 +395,7 @@ async def publish_content(
 async def unpublish_content(
     content_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Unpublish content (Admin only)"""
     content_service = ContentService(db)
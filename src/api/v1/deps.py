@@ -2,20 +2,70 @@
 Dependency injection for FastAPI
 """
 
-from fastapi import Depends, HTTPException, status
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.config.database import get_db
+from src.config.database import (
+    get_db,
+    release_request_sessions,
+    track_request_sessions,
+)
 from src.models.user import User
 from src.services.auth_service import AuthService
+from src.utils.db_routing import publish_writes, set_current_user
 
 security = HTTPBearer()
 
 
+class SessionReleasingRoute(APIRoute):
+    """
+    Route that hands database connections back before serializing the response
+
+    Sessions opened by get_db are closed as soon as the endpoint returns, so
+    the pool is not held while the response model is validated and encoded.
+    Endpoints must return fully loaded objects, which AsyncSession already
+    requires.
+
+    Writes committed by the request pin the user to the primary before the
+    response is sent, so the user's next request reads them wherever it is
+    served.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def release_after_endpoint(*args, **kwargs):
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    await release_request_sessions()
+
+            self.dependant.call = release_after_endpoint
+
+        route_handler = super().get_route_handler()
+
+        async def session_releasing_handler(request: Request) -> Response:
+            token = track_request_sessions()
+            try:
+                return await route_handler(request)
+            finally:
+                await release_request_sessions(token)
+                await publish_writes()
+
+        return session_releasing_handler
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Get current authenticated user from JWT token
@@ -32,6 +82,9 @@ async def get_current_user(
     if token_data is None or token_data.user_id is None:
         raise credentials_exception
 
+    # Users who have just written read from the primary, not a replica
+    await set_current_user(token_data.user_id)
+
     user = await auth_service.user_service.get_user_by_id(token_data.user_id)
     if user is None:
         raise credentials_exception
@@ -57,7 +110,7 @@ async def get_current_active_admin(
 
 async def get_optional_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer(auto_error=False)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Get current user if token is provided, otherwise return None
@@ -73,6 +126,8 @@ async def get_optional_current_user(
         if token_data is None or token_data.user_id is None:
             return None
 
+        await set_current_user(token_data.user_id)
+
         user = await auth_service.user_service.get_user_by_id(token_data.user_id)
         if user is None or not user.is_active:
             return None
@@ -2,15 +2,24 @@
 Learning progress API endpoints
 """
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config.database import get_db
-from src.api.v1.deps import get_current_user, get_current_active_admin
+from src.api.v1.deps import (
+    get_current_user,
+    get_current_active_admin,
+    SessionReleasingRoute,
+)
 from src.models.user import User
 from src.models.content import Content
 from src.models.learning import LearningPathContent
 from src.services.learning_service import LearningService
+from src.utils.json_response import json_response
+from src.utils.sparse_fields import FIELDS_DESCRIPTION, parse_fields, project
 from src.schemas.learning import (
     ProgressUpdate,
     LearningProgressResponse,
@@ -25,21 +34,24 @@ from src.schemas.learning import (
     AssignmentListResponse,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+# Fields a progress list can be narrowed to with fields=
+PROGRESS_FIELDS = tuple(LearningProgressResponse.model_fields)
 
 
 @router.post("/progress/{content_id}")
-def update_progress(
+async def update_progress(
     content_id: str,
     progress_data: ProgressUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update user progress for content"""
     learning_service = LearningService(db)
 
     try:
-        progress = learning_service.update_progress(
+        progress = await learning_service.update_progress(
             current_user.user_id, content_id, progress_data
         )
 
@@ -54,15 +66,17 @@ def update_progress(
 
 
 @router.get("/progress/{content_id}")
-def get_content_progress(
+async def get_content_progress(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get user progress for specific content"""
     learning_service = LearningService(db)
 
-    progress = learning_service.get_user_progress(current_user.user_id, content_id)
+    progress = await learning_service.get_user_progress(
+        current_user.user_id, content_id
+    )
 
     if not progress:
         return {
@@ -83,64 +97,42 @@ def get_content_progress(
 
 
 @router.get("/progress")
-def get_user_progress(
+async def get_user_progress(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all user progress"""
     learning_service = LearningService(db)
 
-    progress_list = learning_service.get_user_progress(current_user.user_id)
+    selected = parse_fields(fields, PROGRESS_FIELDS) or PROGRESS_FIELDS
+    rows = await learning_service.get_user_progress_rows(current_user.user_id, selected)
 
-    # Convert to response format with content info
-    progress_responses = []
-    for progress in progress_list:
-        # Get content info
-        content = (
-            db.query(Content).filter(Content.content_id == progress.content_id).first()
-        )
-
-        if content:
-            progress_responses.append(
-                {
-                    "progress_id": progress.progress_id,
-                    "user_id": progress.user_id,
-                    "content_id": progress.content_id,
-                    "content_title": content.title,
-                    "progress_percentage": progress.progress_percentage,
-                    "time_spent_minutes": progress.time_spent_minutes,
-                    "is_completed": progress.is_completed,
-                    "started_at": progress.started_at,
-                    "completed_at": progress.completed_at,
-                    "last_accessed_at": progress.last_accessed_at,
-                }
-            )
-
-    return {"progress": progress_responses}
+    return json_response({"progress": [project(row, selected) for row in rows]})
 
 
 @router.get("/summary")
-def get_progress_summary(
+async def get_progress_summary(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get user progress summary"""
     learning_service = LearningService(db)
 
-    summary = learning_service.get_user_progress_summary(current_user.user_id)
+    summary = await learning_service.get_user_progress_summary(current_user.user_id)
     return summary
 
 
 @router.get("/stats/content/{content_id}")
-def get_content_stats(
+async def get_content_stats(
     content_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get progress statistics for content (admin only)"""
     learning_service = LearningService(db)
 
-    stats = learning_service.get_content_progress_stats(content_id)
+    stats = await learning_service.get_content_progress_stats(content_id)
 
     if not stats:
         raise HTTPException(status_code=404, detail="Content not found")
@@ -149,26 +141,22 @@ def get_content_stats(
 
 
 @router.post("/assignments")
-def create_assignment(
+async def create_assignment(
     assignment_data: AssignmentCreate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create learning assignment (admin only)"""
     learning_service = LearningService(db)
 
     try:
-        assignment = learning_service.create_assignment(
+        assignment = await learning_service.create_assignment(
             assignment_data, current_user.user_id
         )
 
         # Get user and content info for response
-        user = db.query(User).filter(User.user_id == assignment.user_id).first()
-        content = (
-            db.query(Content)
-            .filter(Content.content_id == assignment.content_id)
-            .first()
-        )
+        user = await db.get(User, assignment.user_id)
+        content = await db.get(Content, assignment.content_id)
 
         return {
             "assignment_id": assignment.assignment_id,
@@ -187,17 +175,17 @@ def create_assignment(
 
 
 @router.get("/assignments")
-def get_user_assignments(
+async def get_user_assignments(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get user assignments with pagination"""
     learning_service = LearningService(db)
 
     skip = (page - 1) * per_page
-    assignments, total = learning_service.get_user_assignments(
+    assignments, total = await learning_service.get_user_assignments(
         current_user.user_id, skip, per_page
     )
 
@@ -205,13 +193,9 @@ def get_user_assignments(
     assignment_responses = []
     for assignment in assignments:
         # Get content and progress info
-        content = (
-            db.query(Content)
-            .filter(Content.content_id == assignment.content_id)
-            .first()
-        )
+        content = await db.get(Content, assignment.content_id)
 
-        progress = learning_service.get_user_progress(
+        progress = await learning_service.get_user_progress(
             current_user.user_id, assignment.content_id
         )
 
@@ -246,21 +230,23 @@ def get_user_assignments(
 
 
 @router.post("/paths")
-def create_learning_path(
+async def create_learning_path(
     path_data: LearningPathCreate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create learning path (admin only)"""
     learning_service = LearningService(db)
 
     try:
-        path = learning_service.create_learning_path(path_data, current_user.user_id)
+        path = await learning_service.create_learning_path(
+            path_data, current_user.user_id
+        )
 
         # Get contents info
         contents = []
         for content_id in path_data.content_ids:
-            content = db.query(Content).filter(Content.content_id == content_id).first()
+            content = await db.get(Content, content_id)
             if content:
                 contents.append(
                     {
@@ -285,36 +271,32 @@ def create_learning_path(
 
 
 @router.get("/paths")
-def get_learning_paths(
+async def get_learning_paths(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get learning paths with pagination"""
     learning_service = LearningService(db)
 
     skip = (page - 1) * per_page
-    paths, total = learning_service.get_learning_paths(skip, per_page)
+    paths, total = await learning_service.get_learning_paths(skip, per_page)
 
     # Convert to response format
     path_responses = []
     for path in paths:
         # Get path contents
-        path_contents = (
-            db.query(LearningPathContent)
-            .filter(LearningPathContent.path_id == path.path_id)
+        result = await db.execute(
+            select(LearningPathContent)
+            .where(LearningPathContent.path_id == path.path_id)
             .order_by(LearningPathContent.order_index)
-            .all()
         )
+        path_contents = result.scalars().all()
 
         contents = []
         for path_content in path_contents:
-            content = (
-                db.query(Content)
-                .filter(Content.content_id == path_content.content_id)
-                .first()
-            )
+            content = await db.get(Content, path_content.content_id)
             if content:
                 contents.append(
                     {
@@ -350,15 +332,15 @@ def get_learning_paths(
 
 
 @router.get("/paths/{path_id}/progress")
-def get_learning_path_progress(
+async def get_learning_path_progress(
     path_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get user progress for learning path"""
     learning_service = LearningService(db)
 
-    progress = learning_service.get_learning_path_progress(
+    progress = await learning_service.get_learning_path_progress(
         current_user.user_id, path_id
     )
 
@@ -2,17 +2,26 @@
 User API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from src.config.database import get_db
-from src.api.v1.deps import get_current_user, get_current_active_admin
+from src.api.v1.deps import (
+    get_current_user,
+    get_current_active_admin,
+    SessionReleasingRoute,
+)
+from src.schemas.imports import ImportResult
 from src.schemas.user import UserCreate, UserUpdate, UserResponse
+from src.services.user_import_service import UserImportService
 from src.services.user_service import UserService
+from src.utils.csv_import import CSVFormatError
 from src.models.user import User
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 @router.get("/", response_model=List[UserResponse])
@@ -20,7 +29,7 @@ async def get_users(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get all users (Admin only)"""
     user_service = UserService(db)
@@ -38,7 +47,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def get_user(
     user_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get user by ID (Admin only)"""
     user_service = UserService(db)
@@ -54,7 +63,7 @@ async def get_user(
 async def create_user(
     user_data: UserCreate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create new user (Admin only)"""
     user_service = UserService(db)
@@ -75,12 +84,30 @@ async def create_user(
     return user
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_users(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create or update users from a UTF-8 CSV file (Admin only)"""
+    import_service = UserImportService(db)
+    csv_file = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await import_service.import_csv(csv_file)
+    except CSVFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        # Leave the upload file to be closed by FastAPI
+        csv_file.detach()
+
+
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     user_id: str,
     user_data: UserUpdate,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update user (Admin only)"""
     user_service = UserService(db)
@@ -96,7 +123,7 @@ async def update_user(
 async def delete_user(
     user_id: str,
     current_user: User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete user (Admin only)"""
     user_service = UserService(db)
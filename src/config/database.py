@@ -2,34 +2,256 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+import asyncio
+import time
+from contextvars import ContextVar
+
+import structlog
+from sqlalchemy import Table, delete, event, exc, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from typing import AsyncGenerator, Callable, List, Optional, Sequence, Union
 
 from src.config.settings import settings
+from src.utils.db_instrumentation import InstrumentedAsyncQueuePool
+from src.utils.db_routing import RoutingSession
+from src.utils.metrics import registry
+
+logger = structlog.get_logger()
+
+# Async drivers used in place of the synchronous ones in DATABASE_URL.
+# Alembic and one-off scripts keep using the synchronous URL.
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: Union[str, URL]) -> URL:
+    """Return the URL with its driver replaced by the asyncio equivalent"""
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.drivername)
+    if drivername is None:
+        return url
+    return url.set(drivername=drivername)
+
+
+def ping_idle_connections(target_engine: AsyncEngine, idle_seconds: float) -> None:
+    """
+    Ping a pooled connection on checkout only if it sat idle for idle_seconds
+
+    Connections in steady use are handed out without the extra round trip
+    that pool_pre_ping costs on every checkout. A failed ping raises
+    DisconnectionError, so the pool discards the connection and retries.
+    """
+    sync_engine = target_engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.DEBUG,
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            raise exc.DisconnectionError(f"Idle connection failed ping: {e}") from e
+
+
+async def warm_up_pool(target_engine: AsyncEngine, connections: int) -> int:
+    """Open pooled connections ahead of the first requests"""
+    results = await asyncio.gather(
+        *(target_engine.connect().start() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    await asyncio.gather(*(connection.close() for connection in opened))
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning(
+            "Database pool warm-up failed",
+            opened=len(opened),
+            requested=connections,
+            error=str(errors[0]),
+        )
+    return len(opened)
+
+
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    """Create an async engine with the pool configured in settings"""
+    new_engine = create_async_engine(
+        async_database_url(url),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+        echo=settings.DEBUG,
+    )
+    if settings.DB_POOL_PRE_PING == "idle":
+        ping_idle_connections(new_engine, settings.DB_POOL_PING_IDLE_SECONDS)
+    return new_engine
+
+
+# Create SQLAlchemy async engines (primary and optional read replicas)
+engine = create_engine_from_settings(settings.DATABASE_URL)
+replica_engines = [
+    create_engine_from_settings(url) for url in settings.DATABASE_REPLICA_URLS
+]
+
+
+def _pool_connections():
+    pool = engine.pool
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("checked_in",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0),
+    }
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Connections in the primary pool by state",
+    ["state"],
+    callback=_pool_connections,
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create AsyncSessionLocal class. Objects stay loaded after commit so that
+# returning them never triggers an implicit (and in asyncio, illegal) refresh.
+# Read-only service methods are routed to a replica when one is configured.
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=[replica.sync_engine for replica in replica_engines],
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator:
+# Sessions opened by get_db while handling the current request
+_request_sessions: ContextVar[Optional[List[AsyncSession]]] = ContextVar(
+    "db_request_sessions", default=None
+)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database session dependency
+
+    The session checks out a connection on its first query only. Requests
+    handled under track_request_sessions() get it closed as soon as the
+    endpoint returns, before the response is serialized.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        sessions = _request_sessions.get()
+        if sessions is not None:
+            sessions.append(db)
         yield db
-    finally:
-        db.close()
+
+
+def track_request_sessions():
+    """Start tracking the sessions opened by get_db in the current context"""
+    return _request_sessions.set([])
+
+
+async def release_request_sessions(token=None) -> None:
+    """Close the tracked sessions, returning their connections to the pool"""
+    sessions = _request_sessions.get()
+    while sessions:
+        await sessions.pop().close()
+    if token is not None:
+        _request_sessions.reset(token)
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Session factory dependency for work that outlives the request"""
+    return AsyncSessionLocal
+
+
+async def count_rows(db: AsyncSession, statement) -> int:
+    """Count the rows returned by a SELECT statement"""
+    count_statement = select(func.count()).select_from(
+        statement.order_by(None).subquery()
+    )
+    return await db.scalar(count_statement)
+
+
+async def delete_in_batches(
+    db: AsyncSession,
+    key_column,
+    where,
+    batch_size: int,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Delete the rows matching where, batch_size rows per transaction
+
+    Each batch selects up to batch_size primary keys and deletes them by
+    key, then commits, so no transaction locks more than one batch of rows.
+    on_batch is called with the running total after every commit.
+    """
+    deleted = 0
+    while True:
+        result = await db.execute(select(key_column).where(where).limit(batch_size))
+        keys = list(result.scalars().all())
+        if not keys:
+            return deleted
+
+        await db.execute(
+            delete(key_column.table)
+            .where(key_column.in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += len(keys)
+        if on_batch:
+            on_batch(deleted)
+
+
+def upsert_statement(
+    db: AsyncSession,
+    table: Table,
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+):
+    """
+    INSERT that updates update_columns of rows that already exist
+
+    conflict_columns name the unique key rows are matched on. MySQL uses
+    ON DUPLICATE KEY UPDATE, which matches on any unique key, so the table
+    should have no other unique key the inserted rows can collide with.
+    Executed with a list of parameter sets, the driver sends a single
+    multi-row INSERT.
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update(
+            {column: statement.inserted[column] for column in update_columns}
+        )
+    if dialect_name == "sqlite":
+        statement = sqlite.insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_={column: statement.excluded[column] for column in update_columns},
+        )
+    raise NotImplementedError(f"Upsert is not supported for {dialect_name}")
@@ -0,0 +1,164 @@
+"""
+Structured logging configuration
+
+Log calls on the request path only build the event dict and put it on a
+bounded in-memory queue. JSON rendering and the actual write happen in a
+background writer thread, so slow stdout/disk never stalls a request.
+When the queue is full the record is dropped and counted instead of
+blocking the caller.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.utils.metrics import registry
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and counts records it had to drop"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # structlog records carry the event dict in ``msg`` and are rendered
+        # by the writer thread. Plain stdlib records are merged with their
+        # args here so later mutation of the args cannot change the message.
+        if record.args and not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class BackgroundLogListener(logging.handlers.QueueListener):
+    """QueueListener that reports dropped records and flushes on stop"""
+
+    def __init__(self, log_queue: queue.Queue, queue_handler, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.queue_handler = queue_handler
+        self._reported_dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        dropped = self.queue_handler.dropped
+        if dropped != self._reported_dropped:
+            self._report_dropped(dropped - self._reported_dropped)
+            self._reported_dropped = dropped
+
+    def _report_dropped(self, count: int) -> None:
+        record = logging.LogRecord(
+            name="src.logging",
+            level=logging.WARNING,
+            pathname=__file__,
+            lineno=0,
+            msg=f"Log queue full, dropped {count} records",
+            args=None,
+            exc_info=None,
+        )
+        super().handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        # Block instead of failing when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+
+_listener: Optional[BackgroundLogListener] = None
+
+
+def _shared_processors():
+    return [
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+    ]
+
+
+def setup_logging(stream=None) -> BackgroundLogListener:
+    """Configure structlog and stdlib logging with a background writer"""
+    global _listener
+
+    if _listener is not None:
+        start_logging()
+        return _listener
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            *_shared_processors(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    output_handler = logging.StreamHandler(stream or sys.stdout)
+    output_handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processor=structlog.processors.JSONRenderer(),
+            foreign_pre_chain=_shared_processors(),
+        )
+    )
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root_logger = logging.getLogger()
+    root_logger.handlers = [queue_handler]
+    root_logger.setLevel(settings.LOG_LEVEL)
+
+    _listener = BackgroundLogListener(log_queue, queue_handler, output_handler)
+    _listener.start()
+    return _listener
+
+
+def start_logging() -> None:
+    """Start the background writer (no-op if already running)"""
+    if _listener is not None and not _listener.is_running:
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer"""
+    if _listener is not None and _listener.is_running:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+
+
+def get_dropped_log_count() -> int:
+    """Number of log records dropped because the queue was full"""
+    if _listener is None:
+        return 0
+    return _listener.queue_handler.dropped
+
+
+registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    callback=lambda: {(): get_dropped_log_count()},
+)
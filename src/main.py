@@ -3,40 +3,68 @@ E-Learning System Backend API
 FastAPI application entry point
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 import structlog
 import time
 
 from src.api.v1.api import api_router
+from src.config.database import engine, replica_engines, warm_up_pool
+from src.config.logging_config import setup_logging, shutdown_logging, start_logging
 from src.config.settings import settings
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.request_logging import RequestLoggingMiddleware
+from src.services.cache import evict_local_copies
+from src.services.invalidation_bus import get_invalidation_bus
+from src.utils.loop_monitor import LoopLagMonitor
+from src.utils.metrics import registry
 
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+# Configure structured logging (rendered and written by a background thread)
+setup_logging()
 
 logger = structlog.get_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    start_logging()
+    if settings.METRICS_MULTIPROC_DIR:
+        registry.start_snapshot_writer(
+            settings.METRICS_MULTIPROC_DIR, settings.METRICS_SNAPSHOT_INTERVAL_SECONDS
+        )
+    if settings.DB_POOL_WARMUP_CONNECTIONS > 0:
+        await warm_up_pool(
+            engine, min(settings.DB_POOL_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+        )
+    loop_monitor = LoopLagMonitor()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    # Drop in-process copies of data changed through other workers
+    invalidation_bus = get_invalidation_bus()
+    invalidation_bus.subscribe(evict_local_copies)
+    await invalidation_bus.start()
+    yield
+    await invalidation_bus.stop()
+    await loop_monitor.stop()
+    for db_engine in (engine, *replica_engines):
+        await db_engine.dispose()
+    if settings.METRICS_MULTIPROC_DIR:
+        registry.stop_snapshot_writer(settings.METRICS_MULTIPROC_DIR)
+    # Flush buffered log records before the process exits
+    shutdown_logging()
+
+
 app = FastAPI(
     title="E-Learning System API",
     description="社内向けe-learningシステムのバックエンドAPI",
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # Encode responses with orjson; see src/utils/json_response.py
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -48,33 +76,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request logging middleware (pure ASGI)
+app.add_middleware(RequestLoggingMiddleware)
 
-@app.middleware("http")
-async def logging_middleware(request: Request, call_next):
-    """Request/Response logging middleware"""
-    start_time = time.time()
-
-    # Log request
-    logger.info(
-        "Request started",
-        method=request.method,
-        url=str(request.url),
-        client_ip=request.client.host if request.client else None,
-    )
-
-    response = await call_next(request)
-
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(
-        "Request completed",
-        method=request.method,
-        url=str(request.url),
-        status_code=response.status_code,
-        process_time=process_time,
-    )
-
-    return response
+# Request metrics middleware (pure ASGI)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -125,6 +131,15 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(
+        registry.render(settings.METRICS_MULTIPROC_DIR),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
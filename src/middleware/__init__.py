@@ -0,0 +1 @@
+"""ASGI Middleware Package"""
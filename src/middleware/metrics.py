@@ -0,0 +1,78 @@
+"""
+Request metrics middleware
+"""
+
+import time
+
+from src.config.settings import settings
+from src.middleware.request_logging import route_template
+from src.utils.db_instrumentation import (
+    DB_N_PLUS_ONE_TOTAL,
+    begin_request_stats,
+    current_request_stats,
+    end_request_stats,
+)
+from src.utils.metrics import (
+    DB_STATEMENTS_PER_REQUEST,
+    DB_TIME_PER_REQUEST_SECONDS,
+    HTTP_REQUEST_DURATION_SECONDS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_REQUESTS_TOTAL,
+)
+
+# Label used for requests that did not match any route, so that arbitrary
+# paths cannot create unbounded label values
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and DB usage
+
+    With ``debug`` enabled, the statement count and DB time of the request
+    are also returned in the X-DB-Statements and X-DB-Time-Ms headers.
+    """
+
+    def __init__(self, app, debug: bool = None):
+        self.app = app
+        self.debug = settings.DEBUG if debug is None else debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        stats_token = begin_request_stats(scope["path"])
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels()
+        in_progress.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug:
+                    stats = current_request_stats()
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-statements", str(stats.statements).encode()),
+                        (b"x-db-time-ms", f"{stats.duration * 1000:.3f}".encode()),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            in_progress.dec()
+            db_stats = end_request_stats(stats_token)
+
+            route = route_template(scope) or UNMATCHED_ROUTE
+            labels = (scope["method"], route, str(status_code))
+            HTTP_REQUESTS_TOTAL.labels(*labels).inc()
+            HTTP_REQUEST_DURATION_SECONDS.labels(*labels).observe(duration)
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(db_stats.statements)
+            DB_TIME_PER_REQUEST_SECONDS.labels(route).observe(db_stats.duration)
+            if db_stats.repeated_shapes:
+                DB_N_PLUS_ONE_TOTAL.labels(route).inc()
@@ -0,0 +1,73 @@
+"""
+Request logging and timing middleware
+"""
+
+import random
+import time
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """Return the matched route path template (e.g. /contents/{content_id})"""
+    route = scope.get("route")
+    if route is None:
+        return None
+    return getattr(route, "path", None)
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI middleware that emits one log line per request
+
+    Successful requests (status < 400) are sampled with ``sample_rate``;
+    client and server errors are always logged.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None, logger=None):
+        self.app = app
+        self.sample_rate = (
+            settings.LOG_SUCCESS_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.logger = logger or structlog.get_logger("src.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            if status_code >= 400 or self._sampled():
+                self._log(scope, status_code, duration)
+
+    def _sampled(self) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+    def _log(self, scope: dict, status_code: int, duration: float) -> None:
+        client = scope.get("client")
+        log = self.logger.warning if status_code >= 500 else self.logger.info
+        log(
+            "Request completed",
+            method=scope["method"],
+            route=route_template(scope) or scope["path"],
+            status_code=status_code,
+            duration_ms=round(duration * 1000, 3),
+            client_ip=client[0] if client else None,
+        )
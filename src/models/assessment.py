@@ -26,11 +26,17 @@ class Quiz(Base):
     created_by = Column(String(36), ForeignKey("users.user_id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)  # Set while related rows are purged
 
     # Relationships
     content = relationship("Content")
     creator = relationship("User")
-    questions = relationship("Question", back_populates="quiz")
+    # Loaded in a stable order, which the quiz response and its ETag follow
+    questions = relationship(
+        "Question",
+        back_populates="quiz",
+        order_by="(Question.order_index, Question.question_id)",
+    )
 
 
 class Question(Base):
@@ -49,7 +55,11 @@ class Question(Base):
 
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
-    choices = relationship("QuestionChoice", back_populates="question")
+    choices = relationship(
+        "QuestionChoice",
+        back_populates="question",
+        order_by="(QuestionChoice.order_index, QuestionChoice.choice_id)",
+    )
 
 
 class QuestionChoice(Base):
@@ -126,6 +136,7 @@ class Assessment(Base):
     created_by = Column(String(36), ForeignKey("users.user_id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    deleted_at = Column(DateTime, nullable=True)  # Set while related rows are purged
 
     # Relationships
     content = relationship("Content")
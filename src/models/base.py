@@ -2,20 +2,29 @@
 Base model for all database models
 """
 
-from sqlalchemy import Column, DateTime, func
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime
 from sqlalchemy.ext.declarative import declared_attr
 from src.config.database import Base
 
 
 class BaseModel(Base):
-    """Base model with common fields"""
+    """
+    Base model with common fields
+
+    Defaults are computed in Python rather than by the database, so a row
+    that has just been written is fully known without reading it back.
+    """
 
     __abstract__ = True
 
     @declared_attr
     def created_at(cls):
-        return Column(DateTime, default=func.now(), nullable=False)
+        return Column(DateTime, default=datetime.utcnow, nullable=False)
 
     @declared_attr
     def updated_at(cls):
-        return Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+        return Column(
+            DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        )
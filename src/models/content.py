@@ -2,10 +2,45 @@
 Content model
 """
 
-from sqlalchemy import Column, String, Text, Integer, Boolean, ForeignKey
+from sqlalchemy import (
+    DDL,
+    Column,
+    String,
+    Text,
+    Integer,
+    Boolean,
+    ForeignKey,
+    Index,
+    event,
+)
 from sqlalchemy.orm import relationship
 from src.models.base import BaseModel
 
+# Full-text index of content titles and descriptions used by search. MySQL
+# uses a FULLTEXT index with the ngram parser (needed for Japanese); SQLite
+# an FTS5 table with the trigram tokenizer, kept in sync by triggers.
+CONTENT_FTS_TABLE = "contents_fts"
+CONTENT_FTS_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {CONTENT_FTS_TABLE} USING fts5(
+        title, description, content='contents', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER contents_fts_insert AFTER INSERT ON contents BEGIN
+        INSERT INTO {CONTENT_FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER contents_fts_delete AFTER DELETE ON contents BEGIN
+        INSERT INTO {CONTENT_FTS_TABLE}({CONTENT_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER contents_fts_update AFTER UPDATE OF title, description
+    ON contents BEGIN
+        INSERT INTO {CONTENT_FTS_TABLE}({CONTENT_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {CONTENT_FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+)
+
 
 class Category(BaseModel):
     """Category model"""
@@ -17,12 +52,25 @@ class Category(BaseModel):
     description = Column(Text)
     parent_id = Column(String(36), ForeignKey("categories.category_id"))
     is_active = Column(Boolean, default=True, nullable=False)
+    # Published contents in this category, and in it and all categories
+    # below it; kept up to date by ContentService
+    content_count = Column(Integer, default=0, server_default="0", nullable=False)
+    total_content_count = Column(Integer, default=0, server_default="0", nullable=False)
 
 
 class Content(BaseModel):
     """Content model"""
 
     __tablename__ = "contents"
+    __table_args__ = (
+        Index(
+            "ix_contents_title_description_fulltext",
+            "title",
+            "description",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
 
     content_id = Column(String(36), primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -36,3 +84,14 @@ class Content(BaseModel):
 
     # Relationships
     learning_progress = relationship("LearningProgress", back_populates="content")
+
+
+for statement in CONTENT_FTS_DDL:
+    event.listen(
+        Content.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Content.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {CONTENT_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
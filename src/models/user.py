@@ -2,7 +2,7 @@
 User model
 """
 
-from sqlalchemy import Column, String, Boolean, Text
+from sqlalchemy import Column, String, Boolean
 from sqlalchemy.orm import relationship
 from src.models.base import BaseModel
 
@@ -22,7 +22,6 @@ class User(BaseModel):
     department = Column(String(100))
     position = Column(String(100))
     is_active = Column(Boolean, default=True, nullable=False)
-    refresh_token = Column(Text, nullable=True)  # Store refresh token
 
     # Relationships
     learning_progress = relationship("LearningProgress", back_populates="user")
@@ -52,6 +52,9 @@ class QuestionChoiceResponse(BaseModel):
     is_correct: bool
     order_index: int
 
+    class Config:
+        from_attributes = True
+
 
 # Question Schemas
 class QuestionCreate(BaseModel):
@@ -76,6 +79,20 @@ class QuestionResponse(BaseModel):
     is_required: bool
     choices: List[QuestionChoiceResponse] = []
 
+    class Config:
+        from_attributes = True
+
+
+class QuestionUpsert(QuestionCreate):
+    """Question create-or-update schema"""
+    # Existing question to update; created when omitted
+    question_id: Optional[str] = None
+
+
+class QuestionBulkUpsert(BaseModel):
+    """Bulk question upsert schema"""
+    questions: List[QuestionUpsert] = Field(..., min_items=1, max_items=500)
+
 
 # Quiz Schemas
 class QuizCreate(BaseModel):
@@ -116,6 +133,9 @@ class QuizResponse(BaseModel):
     updated_at: datetime
     questions: List[QuestionResponse] = []
 
+    class Config:
+        from_attributes = True
+
 
 # Quiz Answer Schemas
 class QuizAnswerSubmit(BaseModel):
@@ -140,6 +160,9 @@ class QuizAnswerResponse(BaseModel):
     points_earned: float
     answered_at: datetime
 
+    class Config:
+        from_attributes = True
+
 
 class QuizAttemptResponse(BaseModel):
     """Quiz attempt response schema"""
@@ -156,6 +179,9 @@ class QuizAttemptResponse(BaseModel):
     status: AttemptStatus
     answers: List[QuizAnswerResponse] = []
 
+    class Config:
+        from_attributes = True
+
 
 # Assessment Schemas
 class AssessmentCreate(BaseModel):
@@ -193,6 +219,9 @@ class AssessmentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        from_attributes = True
+
 
 # Assessment Submission Schemas
 class AssessmentSubmissionCreate(BaseModel):
@@ -221,6 +250,9 @@ class AssessmentSubmissionResponse(BaseModel):
     graded_at: Optional[datetime]
     status: SubmissionStatus
 
+    class Config:
+        from_attributes = True
+
 
 # List Response Schemas
 class QuizListResponse(BaseModel):
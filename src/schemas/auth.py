@@ -27,6 +27,7 @@ class TokenData(BaseModel):
 
     user_id: Optional[str] = None
     email: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class PasswordChangeRequest(BaseModel):
@@ -47,6 +47,8 @@ class CategoryResponse(CategoryBase):
 
     category_id: str
     is_active: bool
+    content_count: int = 0  # Published contents in the category itself
+    total_content_count: int = 0  # Including all categories below it
     created_at: datetime
     updated_at: datetime
 
@@ -54,6 +56,16 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+class CategoryBreadcrumb(BaseModel):
+    """Category breadcrumb entry schema"""
+
+    category_id: str
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
 # Content schemas
 class ContentBase(BaseModel):
     """Base content schema"""
@@ -84,6 +96,13 @@ class ContentUpdate(BaseModel):
     is_published: Optional[bool] = None
 
 
+class ContentHighlight(BaseModel):
+    """Search terms marked up in a content's title and description"""
+
+    title: str
+    description: Optional[str] = None  # Excerpt around the first match
+
+
 class ContentResponse(ContentBase):
     """Content response schema"""
 
@@ -92,6 +111,7 @@ class ContentResponse(ContentBase):
     created_by: Optional[str]
     created_at: datetime
     updated_at: datetime
+    highlight: Optional[ContentHighlight] = None  # Only in search results
 
     class Config:
         from_attributes = True
@@ -107,6 +127,13 @@ class ContentListResponse(BaseModel):
     total_pages: int
 
 
+class ContentSuggestResponse(BaseModel):
+    """Search-as-you-type response schema"""
+
+    query: str
+    content_ids: List[str]  # Best match first
+
+
 class CategoryListResponse(BaseModel):
     """Category list response schema"""
 
@@ -0,0 +1,50 @@
+"""
+Bulk import schemas
+"""
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ImportRowError(BaseModel):
+    """Row rejected by a bulk import"""
+
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    """Bulk import summary"""
+
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    skipped: int = 0  # Already imported before a resumed run's checkpoint
+    # Capped, see failed for the full count
+    errors: List[ImportRowError] = []
+
+
+class ProgressRecord(BaseModel):
+    """Historical learning progress row"""
+
+    email: str
+    content_title: str
+    progress_percentage: float = Field(..., ge=0.0, le=100.0)
+    time_spent_minutes: int = Field(0, ge=0)
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    last_accessed_at: Optional[datetime] = None
+
+
+class QuizAttemptRecord(BaseModel):
+    """Historical quiz attempt row"""
+
+    email: str
+    quiz_title: str
+    attempt_number: int = Field(..., ge=1)
+    started_at: datetime
+    completed_at: datetime
+    score: float = Field(..., ge=0.0, le=100.0)  # Percentage
+    max_score: float = Field(..., ge=0.0)
+    is_passed: Optional[bool] = None  # Derived from the quiz passing score if omitted
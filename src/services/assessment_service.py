@@ -3,10 +3,18 @@ Assessment and quiz service
 """
 
 import uuid
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from typing import Callable, List, Optional, Dict, Any, Sequence
+
+import structlog
+from sqlalchemy import func, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.config.database import count_rows, delete_in_batches
+from src.config.settings import settings
 
 from src.models.assessment import (
     Quiz,
@@ -22,23 +30,37 @@ from src.schemas.assessment import (
     QuizUpdate,
     QuestionCreate,
     QuestionChoiceCreate,
+    QuestionUpsert,
     QuizAttemptSubmit,
     AssessmentCreate,
     AssessmentUpdate,
     AssessmentSubmissionCreate,
     AssessmentSubmissionGrade,
 )
+from src.services.cache import JsonCodec, ModelCodec, cached, invalidate_tags
+from src.utils.db_routing import read_only
+
+logger = structlog.get_logger()
+
+_quiz_codec = ModelCodec(
+    Quiz, questions=ModelCodec(Question, choices=ModelCodec(QuestionChoice))
+)
+
+# Called with a table name and the rows deleted from it so far
+PurgeProgress = Callable[[str, int], None]
 
 
 class AssessmentService:
     """Service for assessment and quiz management"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     # Quiz Management
-    def create_quiz(self, quiz_data: QuizCreate, created_by: str) -> Quiz:
+    async def create_quiz(self, quiz_data: QuizCreate, created_by: str) -> Quiz:
         """Create a new quiz with questions"""
+        # Build the whole graph in memory so the flush inserts each table in
+        # one batch and the loaded collections can be returned as they are
         quiz = Quiz(
             quiz_id=str(uuid.uuid4()),
             title=quiz_data.title,
@@ -49,68 +71,81 @@ class AssessmentService:
             passing_score=quiz_data.passing_score,
             is_randomized=quiz_data.is_randomized,
             created_by=created_by,
+            questions=[
+                Question(
+                    question_id=str(uuid.uuid4()),
+                    question_text=question_data.question_text,
+                    question_type=question_data.question_type.value,
+                    points=question_data.points,
+                    order_index=question_data.order_index,
+                    explanation=question_data.explanation,
+                    is_required=question_data.is_required,
+                    # Choices for multiple choice questions
+                    choices=[
+                        QuestionChoice(
+                            choice_id=str(uuid.uuid4()),
+                            choice_text=choice_data.choice_text,
+                            is_correct=choice_data.is_correct,
+                            order_index=choice_data.order_index,
+                        )
+                        for choice_data in question_data.choices
+                    ],
+                )
+                for question_data in quiz_data.questions
+            ],
         )
 
         self.db.add(quiz)
-        self.db.flush()  # Get the quiz_id
-
-        # Add questions
-        for question_data in quiz_data.questions:
-            question = Question(
-                question_id=str(uuid.uuid4()),
-                quiz_id=quiz.quiz_id,
-                question_text=question_data.question_text,
-                question_type=question_data.question_type.value,
-                points=question_data.points,
-                order_index=question_data.order_index,
-                explanation=question_data.explanation,
-                is_required=question_data.is_required,
-            )
-
-            self.db.add(question)
-            self.db.flush()  # Get the question_id
-
-            # Add choices for multiple choice questions
-            for choice_data in question_data.choices:
-                choice = QuestionChoice(
-                    choice_id=str(uuid.uuid4()),
-                    question_id=question.question_id,
-                    choice_text=choice_data.choice_text,
-                    is_correct=choice_data.is_correct,
-                    order_index=choice_data.order_index,
-                )
-                self.db.add(choice)
-
-        self.db.commit()
-        self.db.refresh(quiz)
+        await self.db.commit()
         return quiz
 
-    def get_quiz(self, quiz_id: str) -> Optional[Quiz]:
+    @cached("quiz", _quiz_codec, lambda quiz_id: [f"quiz:{quiz_id}"])
+    @read_only
+    async def get_quiz(self, quiz_id: str) -> Optional[Quiz]:
         """Get quiz by ID with questions and choices"""
-        return (
-            self.db.query(Quiz)
-            .filter(Quiz.quiz_id == quiz_id)
-            .first()
+        result = await self.db.execute(
+            select(Quiz)
+            .options(selectinload(Quiz.questions).selectinload(Question.choices))
+            .where(Quiz.quiz_id == quiz_id, Quiz.deleted_at.is_(None))
         )
-
-    def get_quizzes(
-        self, skip: int = 0, limit: int = 100, content_id: str = None
+        return result.scalars().first()
+
+    @read_only
+    async def get_quizzes(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        content_id: str = None,
+        columns: Optional[Sequence[str]] = None,
     ) -> tuple[List[Quiz], int]:
-        """Get quizzes with pagination and optional content filter"""
-        query = self.db.query(Quiz)
+        """
+        Get quizzes with pagination and optional content filter
+
+        With columns, only those columns (and the primary key) are loaded.
+        """
+        # List views leave the questions out
+        query = (
+            select(Quiz)
+            .options(noload(Quiz.questions))
+            .where(Quiz.deleted_at.is_(None))
+        )
+        if columns:
+            query = query.options(
+                load_only(*(getattr(Quiz, column) for column in columns))
+            )
 
         if content_id:
-            query = query.filter(Quiz.content_id == content_id)
+            query = query.where(Quiz.content_id == content_id)
 
-        total = query.count()
-        quizzes = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return quizzes, total
+        return list(result.scalars().all()), total
 
-    def update_quiz(self, quiz_id: str, quiz_data: QuizUpdate) -> Optional[Quiz]:
+    async def update_quiz(self, quiz_id: str, quiz_data: QuizUpdate) -> Optional[Quiz]:
         """Update quiz"""
-        quiz = self.db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
-        if not quiz:
+        quiz = await self.db.get(Quiz, quiz_id, options=[noload(Quiz.questions)])
+        if not quiz or quiz.deleted_at:
             return None
 
         update_data = quiz_data.dict(exclude_unset=True)
@@ -118,71 +153,151 @@ class AssessmentService:
             setattr(quiz, field, value)
 
         quiz.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(quiz)
+        await self.db.commit()
+        await invalidate_tags(f"quiz:{quiz_id}")
         return quiz
 
-    def delete_quiz(self, quiz_id: str) -> bool:
-        """Delete quiz and related data"""
-        quiz = self.db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
+    async def upsert_questions(
+        self, quiz_id: str, questions_data: List[QuestionUpsert]
+    ) -> Optional[Quiz]:
+        """Create or update many questions of a quiz in one transaction"""
+        result = await self.db.execute(
+            select(Quiz)
+            .options(selectinload(Quiz.questions).selectinload(Question.choices))
+            .where(Quiz.quiz_id == quiz_id, Quiz.deleted_at.is_(None))
+        )
+        quiz = result.scalars().first()
         if not quiz:
-            return False
+            return None
 
-        # Delete related data (cascade should handle this, but being explicit)
-        self.db.query(QuizAnswer).filter(
-            QuizAnswer.attempt_id.in_(
-                self.db.query(QuizAttempt.attempt_id).filter(
-                    QuizAttempt.quiz_id == quiz_id
-                )
+        existing = {question.question_id: question for question in quiz.questions}
+        unknown_ids = [
+            question_data.question_id
+            for question_data in questions_data
+            if question_data.question_id and question_data.question_id not in existing
+        ]
+        if unknown_ids:
+            raise ValueError(f"Questions not found in quiz: {', '.join(unknown_ids)}")
+
+        # A question updated twice would have its new choices deleted again
+        id_counts = Counter(
+            question_data.question_id
+            for question_data in questions_data
+            if question_data.question_id
+        )
+        repeated_ids = [
+            question_id for question_id, count in id_counts.items() if count > 1
+        ]
+        if repeated_ids:
+            raise ValueError(
+                f"Questions listed more than once: {', '.join(repeated_ids)}"
             )
-        ).delete(synchronize_session=False)
 
-        self.db.query(QuizAttempt).filter(
-            QuizAttempt.quiz_id == quiz_id
-        ).delete()
-
-        self.db.query(QuestionChoice).filter(
-            QuestionChoice.question_id.in_(
-                self.db.query(Question.question_id).filter(
-                    Question.quiz_id == quiz_id
+        # Changes are collected on the loaded graph and written by a single
+        # flush, which batches the UPDATEs, DELETEs and INSERTs per table
+        for question_data in questions_data:
+            fields = question_data.dict(exclude={"question_id", "choices"})
+            fields["question_type"] = question_data.question_type.value
+            choices = [
+                QuestionChoice(choice_id=str(uuid.uuid4()), **choice_data.dict())
+                for choice_data in question_data.choices
+            ]
+
+            question = existing.get(question_data.question_id)
+            if question is None:
+                quiz.questions.append(
+                    Question(question_id=str(uuid.uuid4()), choices=choices, **fields)
                 )
-            )
-        ).delete(synchronize_session=False)
+                continue
+
+            for field, value in fields.items():
+                setattr(question, field, value)
+
+            # Choices are replaced as a whole
+            for choice in question.choices:
+                await self.db.delete(choice)
+            question.choices = choices
+
+        quiz.updated_at = datetime.utcnow()
+        await self.db.commit()
+        await invalidate_tags(f"quiz:{quiz_id}")
+        return quiz
+
+    async def delete_quiz(self, quiz_id: str) -> bool:
+        """
+        Mark quiz as deleted
 
-        self.db.query(Question).filter(Question.quiz_id == quiz_id).delete()
-        self.db.delete(quiz)
-        self.db.commit()
+        The quiz is hidden from every read at once; its questions, attempts
+        and answers are removed afterwards by purge_quiz.
+        """
+        quiz = await self.db.get(Quiz, quiz_id)
+        if not quiz or quiz.deleted_at:
+            return False
+
+        quiz.deleted_at = datetime.utcnow()
+        quiz.is_published = False
+        await self.db.commit()
+        await invalidate_tags(f"quiz:{quiz_id}")
         return True
 
-    def publish_quiz(self, quiz_id: str) -> Optional[Quiz]:
+    async def purge_quiz(
+        self, quiz_id: str, batch_size: int = None, progress: PurgeProgress = None
+    ) -> Optional[Dict[str, int]]:
+        """
+        Delete a quiz marked as deleted together with its related data
+
+        Rows are deleted in batches of batch_size, each in its own short
+        transaction, so exam traffic is never blocked for long. Returns the
+        number of rows deleted per table.
+        """
+        quiz = await self.db.get(Quiz, quiz_id)
+        if not quiz or not quiz.deleted_at:
+            return None
+
+        attempts = select(QuizAttempt.attempt_id).where(QuizAttempt.quiz_id == quiz_id)
+        questions = select(Question.question_id).where(Question.quiz_id == quiz_id)
+        return await self._purge(
+            [
+                (QuizAnswer.answer_id, QuizAnswer.attempt_id.in_(attempts)),
+                (QuizAttempt.attempt_id, QuizAttempt.quiz_id == quiz_id),
+                (QuestionChoice.choice_id, QuestionChoice.question_id.in_(questions)),
+                (Question.question_id, Question.quiz_id == quiz_id),
+                (Quiz.quiz_id, Quiz.quiz_id == quiz_id),
+            ],
+            batch_size,
+            progress,
+        )
+
+    async def publish_quiz(self, quiz_id: str) -> Optional[Quiz]:
         """Publish quiz"""
-        quiz = self.db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
-        if not quiz:
+        quiz = await self.db.get(Quiz, quiz_id)
+        if not quiz or quiz.deleted_at:
             return None
 
         quiz.is_published = True
         quiz.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(quiz)
+        await self.db.commit()
+        await invalidate_tags(f"quiz:{quiz_id}")
         return quiz
 
     # Quiz Attempt Management
-    def start_quiz_attempt(self, quiz_id: str, user_id: str) -> Optional[QuizAttempt]:
+    async def start_quiz_attempt(
+        self, quiz_id: str, user_id: str
+    ) -> Optional[QuizAttempt]:
         """Start a new quiz attempt"""
-        quiz = self.db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
-        if not quiz or not quiz.is_published:
+        quiz = await self.db.get(Quiz, quiz_id)
+        if not quiz or not quiz.is_published or quiz.deleted_at:
             return None
 
         # Check attempt limit
-        attempt_count = (
-            self.db.query(QuizAttempt)
-            .filter(
+        attempt_count = await count_rows(
+            self.db,
+            select(QuizAttempt).where(
                 and_(
                     QuizAttempt.quiz_id == quiz_id,
                     QuizAttempt.user_id == user_id,
                 )
-            )
-            .count()
+            ),
         )
 
         if attempt_count >= quiz.max_attempts:
@@ -190,9 +305,10 @@ class AssessmentService:
 
         # Calculate total possible points
         max_score = (
-            self.db.query(func.sum(Question.points))
-            .filter(Question.quiz_id == quiz_id)
-            .scalar() or 0
+            await self.db.scalar(
+                select(func.sum(Question.points)).where(Question.quiz_id == quiz_id)
+            )
+            or 0
         )
 
         attempt = QuizAttempt(
@@ -204,31 +320,33 @@ class AssessmentService:
         )
 
         self.db.add(attempt)
-        self.db.commit()
-        self.db.refresh(attempt)
+        await self.db.commit()
+        await invalidate_tags(f"quiz-statistics:{quiz_id}")
+        set_committed_value(attempt, "answers", [])
         return attempt
 
-    def submit_quiz_attempt(
+    async def submit_quiz_attempt(
         self, attempt_id: str, submission: QuizAttemptSubmit
     ) -> Optional[QuizAttempt]:
         """Submit quiz attempt with answers"""
-        attempt = (
-            self.db.query(QuizAttempt)
-            .filter(QuizAttempt.attempt_id == attempt_id)
-            .first()
+        result = await self.db.execute(
+            select(QuizAttempt)
+            .options(selectinload(QuizAttempt.quiz))
+            .where(QuizAttempt.attempt_id == attempt_id)
         )
-        if not attempt or attempt.status != "in_progress":
+        attempt = result.scalars().first()
+        if not attempt or attempt.status != "in_progress" or attempt.quiz.deleted_at:
             return None
 
+        answers = []
         total_points = 0.0
 
         # Process each answer
         for answer_data in submission.answers:
-            question = (
-                self.db.query(Question)
-                .filter(Question.question_id == answer_data.question_id)
-                .first()
+            result = await self.db.execute(
+                select(Question).where(Question.question_id == answer_data.question_id)
             )
+            question = result.scalars().first()
             if not question:
                 continue
 
@@ -238,16 +356,15 @@ class AssessmentService:
 
             if question.question_type == "multiple_choice":
                 if answer_data.selected_choices:
-                    correct_choices = (
-                        self.db.query(QuestionChoice.choice_id)
-                        .filter(
+                    result = await self.db.execute(
+                        select(QuestionChoice.choice_id).where(
                             and_(
                                 QuestionChoice.question_id == question.question_id,
                                 QuestionChoice.is_correct == True,
                             )
                         )
-                        .all()
                     )
+                    correct_choices = result.all()
                     correct_choice_ids = {choice.choice_id for choice in correct_choices}
                     selected_choice_ids = set(answer_data.selected_choices)
 
@@ -257,13 +374,12 @@ class AssessmentService:
 
             elif question.question_type == "true_false":
                 if answer_data.selected_choices and len(answer_data.selected_choices) == 1:
-                    selected_choice = (
-                        self.db.query(QuestionChoice)
-                        .filter(
+                    result = await self.db.execute(
+                        select(QuestionChoice).where(
                             QuestionChoice.choice_id == answer_data.selected_choices[0]
                         )
-                        .first()
                     )
+                    selected_choice = result.scalars().first()
                     if selected_choice and selected_choice.is_correct:
                         points_earned = question.points
                         is_correct = True
@@ -284,6 +400,7 @@ class AssessmentService:
                 points_earned=points_earned,
             )
             self.db.add(quiz_answer)
+            answers.append(quiz_answer)
             total_points += points_earned
 
         # Update attempt
@@ -296,28 +413,37 @@ class AssessmentService:
         time_diff = attempt.completed_at - attempt.started_at
         attempt.time_spent_minutes = int(time_diff.total_seconds() / 60)
 
-        self.db.commit()
-        self.db.refresh(attempt)
+        await self.db.commit()
+        await invalidate_tags(f"quiz-statistics:{attempt.quiz_id}")
+        # The attempt had no answers before this submission
+        set_committed_value(attempt, "answers", answers)
         return attempt
 
-    def get_quiz_attempts(
+    @read_only
+    async def get_quiz_attempts(
         self, quiz_id: str = None, user_id: str = None, skip: int = 0, limit: int = 100
     ) -> tuple[List[QuizAttempt], int]:
         """Get quiz attempts with optional filters"""
-        query = self.db.query(QuizAttempt)
+        # List views leave the answers out
+        query = (
+            select(QuizAttempt)
+            .join(QuizAttempt.quiz)
+            .options(noload(QuizAttempt.answers))
+            .where(Quiz.deleted_at.is_(None))
+        )
 
         if quiz_id:
-            query = query.filter(QuizAttempt.quiz_id == quiz_id)
+            query = query.where(QuizAttempt.quiz_id == quiz_id)
         if user_id:
-            query = query.filter(QuizAttempt.user_id == user_id)
+            query = query.where(QuizAttempt.user_id == user_id)
 
-        total = query.count()
-        attempts = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return attempts, total
+        return list(result.scalars().all()), total
 
     # Assessment Management
-    def create_assessment(
+    async def create_assessment(
         self, assessment_data: AssessmentCreate, created_by: str
     ) -> Assessment:
         """Create a new assessment"""
@@ -334,42 +460,38 @@ class AssessmentService:
         )
 
         self.db.add(assessment)
-        self.db.commit()
-        self.db.refresh(assessment)
+        await self.db.commit()
         return assessment
 
-    def get_assessment(self, assessment_id: str) -> Optional[Assessment]:
+    @read_only
+    async def get_assessment(self, assessment_id: str) -> Optional[Assessment]:
         """Get assessment by ID"""
-        return (
-            self.db.query(Assessment)
-            .filter(Assessment.assessment_id == assessment_id)
-            .first()
-        )
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or assessment.deleted_at:
+            return None
+        return assessment
 
-    def get_assessments(
+    @read_only
+    async def get_assessments(
         self, skip: int = 0, limit: int = 100, content_id: str = None
     ) -> tuple[List[Assessment], int]:
         """Get assessments with pagination and optional content filter"""
-        query = self.db.query(Assessment)
+        query = select(Assessment).where(Assessment.deleted_at.is_(None))
 
         if content_id:
-            query = query.filter(Assessment.content_id == content_id)
+            query = query.where(Assessment.content_id == content_id)
 
-        total = query.count()
-        assessments = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return assessments, total
+        return list(result.scalars().all()), total
 
-    def update_assessment(
+    async def update_assessment(
         self, assessment_id: str, assessment_data: AssessmentUpdate
     ) -> Optional[Assessment]:
         """Update assessment"""
-        assessment = (
-            self.db.query(Assessment)
-            .filter(Assessment.assessment_id == assessment_id)
-            .first()
-        )
-        if not assessment:
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or assessment.deleted_at:
             return None
 
         update_data = assessment_data.dict(exclude_unset=True)
@@ -377,56 +499,78 @@ class AssessmentService:
             setattr(assessment, field, value)
 
         assessment.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(assessment)
+        await self.db.commit()
         return assessment
 
-    def delete_assessment(self, assessment_id: str) -> bool:
-        """Delete assessment and related submissions"""
-        assessment = (
-            self.db.query(Assessment)
-            .filter(Assessment.assessment_id == assessment_id)
-            .first()
-        )
-        if not assessment:
+    async def delete_assessment(self, assessment_id: str) -> bool:
+        """Mark assessment as deleted; submissions are removed by purge_assessment"""
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or assessment.deleted_at:
             return False
 
-        # Delete related submissions
-        self.db.query(AssessmentSubmission).filter(
-            AssessmentSubmission.assessment_id == assessment_id
-        ).delete()
-
-        self.db.delete(assessment)
-        self.db.commit()
+        assessment.deleted_at = datetime.utcnow()
+        assessment.is_published = False
+        await self.db.commit()
         return True
 
-    def publish_assessment(self, assessment_id: str) -> Optional[Assessment]:
-        """Publish assessment"""
-        assessment = (
-            self.db.query(Assessment)
-            .filter(Assessment.assessment_id == assessment_id)
-            .first()
+    async def purge_assessment(
+        self, assessment_id: str, batch_size: int = None, progress: PurgeProgress = None
+    ) -> Optional[Dict[str, int]]:
+        """Delete an assessment marked as deleted and its submissions in batches"""
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or not assessment.deleted_at:
+            return None
+
+        return await self._purge(
+            [
+                (
+                    AssessmentSubmission.submission_id,
+                    AssessmentSubmission.assessment_id == assessment_id,
+                ),
+                (Assessment.assessment_id, Assessment.assessment_id == assessment_id),
+            ],
+            batch_size,
+            progress,
         )
-        if not assessment:
+
+    async def _purge(
+        self, steps, batch_size: Optional[int], progress: Optional[PurgeProgress]
+    ) -> Dict[str, int]:
+        """Delete the rows of each (key column, condition) step in order"""
+        deleted = {}
+        for key_column, where in steps:
+            table_name = key_column.table.name
+
+            def report(count: int, table_name: str = table_name) -> None:
+                progress(table_name, count)
+
+            deleted[table_name] = await delete_in_batches(
+                self.db,
+                key_column,
+                where,
+                batch_size or settings.DELETE_BATCH_SIZE,
+                on_batch=report if progress else None,
+            )
+        return deleted
+
+    async def publish_assessment(self, assessment_id: str) -> Optional[Assessment]:
+        """Publish assessment"""
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or assessment.deleted_at:
             return None
 
         assessment.is_published = True
         assessment.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(assessment)
+        await self.db.commit()
         return assessment
 
     # Assessment Submission Management
-    def submit_assessment(
+    async def submit_assessment(
         self, assessment_id: str, user_id: str, submission_data: AssessmentSubmissionCreate
     ) -> Optional[AssessmentSubmission]:
         """Submit assessment"""
-        assessment = (
-            self.db.query(Assessment)
-            .filter(Assessment.assessment_id == assessment_id)
-            .first()
-        )
-        if not assessment or not assessment.is_published:
+        assessment = await self.db.get(Assessment, assessment_id)
+        if not assessment or not assessment.is_published or assessment.deleted_at:
             return None
 
         submission = AssessmentSubmission(
@@ -438,19 +582,22 @@ class AssessmentService:
         )
 
         self.db.add(submission)
-        self.db.commit()
-        self.db.refresh(submission)
+        await self.db.commit()
         return submission
 
-    def grade_submission(
+    async def grade_submission(
         self, submission_id: str, grade_data: AssessmentSubmissionGrade, graded_by: str
     ) -> Optional[AssessmentSubmission]:
         """Grade assessment submission"""
-        submission = (
-            self.db.query(AssessmentSubmission)
-            .filter(AssessmentSubmission.submission_id == submission_id)
-            .first()
+        result = await self.db.execute(
+            select(AssessmentSubmission)
+            .join(AssessmentSubmission.assessment)
+            .where(
+                AssessmentSubmission.submission_id == submission_id,
+                Assessment.deleted_at.is_(None),
+            )
         )
+        submission = result.scalars().first()
         if not submission:
             return None
 
@@ -460,38 +607,48 @@ class AssessmentService:
         submission.graded_at = datetime.utcnow()
         submission.status = "graded"
 
-        self.db.commit()
-        self.db.refresh(submission)
+        await self.db.commit()
         return submission
 
-    def get_assessment_submissions(
+    @read_only
+    async def get_assessment_submissions(
         self, assessment_id: str = None, user_id: str = None, skip: int = 0, limit: int = 100
     ) -> tuple[List[AssessmentSubmission], int]:
         """Get assessment submissions with optional filters"""
-        query = self.db.query(AssessmentSubmission)
+        query = (
+            select(AssessmentSubmission)
+            .join(AssessmentSubmission.assessment)
+            .where(Assessment.deleted_at.is_(None))
+        )
 
         if assessment_id:
-            query = query.filter(AssessmentSubmission.assessment_id == assessment_id)
+            query = query.where(AssessmentSubmission.assessment_id == assessment_id)
         if user_id:
-            query = query.filter(AssessmentSubmission.user_id == user_id)
+            query = query.where(AssessmentSubmission.user_id == user_id)
 
-        total = query.count()
-        submissions = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return submissions, total
+        return list(result.scalars().all()), total
 
     # Statistics
-    def get_quiz_statistics(self, quiz_id: str) -> Dict[str, Any]:
+    # Started, submitted and imported attempts invalidate quiz-statistics:<id>
+    @cached(
+        "quiz_statistics",
+        JsonCodec(),
+        lambda quiz_id: [f"quiz:{quiz_id}", f"quiz-statistics:{quiz_id}"],
+    )
+    @read_only
+    async def get_quiz_statistics(self, quiz_id: str) -> Dict[str, Any]:
         """Get quiz statistics"""
-        quiz = self.db.query(Quiz).filter(Quiz.quiz_id == quiz_id).first()
-        if not quiz:
+        quiz = await self.db.get(Quiz, quiz_id)
+        if not quiz or quiz.deleted_at:
             return None
 
-        attempts = (
-            self.db.query(QuizAttempt)
-            .filter(QuizAttempt.quiz_id == quiz_id)
-            .all()
+        result = await self.db.execute(
+            select(QuizAttempt).where(QuizAttempt.quiz_id == quiz_id)
         )
+        attempts = result.scalars().all()
 
         completed_attempts = [a for a in attempts if a.status == "completed"]
         total_attempts = len(attempts)
@@ -523,18 +680,18 @@ class AssessmentService:
             "average_time_minutes": round(average_time),
         }
 
-    def get_user_quiz_statistics(self, user_id: str) -> Dict[str, Any]:
+    @read_only
+    async def get_user_quiz_statistics(self, user_id: str) -> Dict[str, Any]:
         """Get user quiz statistics"""
-        attempts = (
-            self.db.query(QuizAttempt)
-            .filter(
+        result = await self.db.execute(
+            select(QuizAttempt).where(
                 and_(
                     QuizAttempt.user_id == user_id,
                     QuizAttempt.status == "completed",
                 )
             )
-            .all()
         )
+        attempts = result.scalars().all()
 
         if not attempts:
             return {
@@ -556,4 +713,35 @@ class AssessmentService:
             "total_quizzes_passed": passed_quizzes,
             "average_score": round(average_score, 2),
             "total_time_spent_minutes": total_time,
-        } 
\ No newline at end of file
+        } 
+
+
+async def purge_deleted(
+    session_factory: async_sessionmaker, kind: str, object_id: str
+) -> None:
+    """
+    Background task purging a quiz or assessment marked as deleted
+
+    Failures are logged rather than raised; purge_deleted_records.py removes
+    whatever a failed or interrupted purge left behind.
+    """
+
+    def log_progress(table: str, deleted: int) -> None:
+        logger.info(
+            "Purging deleted records",
+            kind=kind,
+            id=object_id,
+            table=table,
+            deleted=deleted,
+        )
+
+    async with session_factory() as db:
+        service = AssessmentService(db)
+        purge = service.purge_quiz if kind == "quiz" else service.purge_assessment
+        try:
+            deleted = await purge(object_id, progress=log_progress)
+        except Exception:
+            logger.exception("Purge of deleted records failed", kind=kind, id=object_id)
+            return
+
+    logger.info("Purged deleted records", kind=kind, id=object_id, deleted=deleted)
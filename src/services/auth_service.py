@@ -7,24 +7,30 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+import structlog
 
 from src.config.settings import settings
 from src.models.user import User
 from src.schemas.auth import TokenData, UserRegistration
+from src.services.session_store import SessionStore, get_session_store
 from src.services.user_service import UserService
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+logger = structlog.get_logger()
+
 
 class AuthService:
     """Authentication service class"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, session_store: Optional[SessionStore] = None):
         self.db = db
         self.user_service = UserService(db)
+        self.session_store = session_store or get_session_store()
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
@@ -53,15 +59,35 @@ class AuthService:
         )
         return encoded_jwt
 
-    def create_refresh_token(self, user_id: str) -> str:
-        """Create refresh token"""
+    def create_refresh_token(self, user_id: str, session_id: str, token_id: str) -> str:
+        """Create refresh token bound to a session"""
         data = {
             "sub": user_id,
             "type": "refresh",
-            "exp": datetime.utcnow() + timedelta(days=30),  # 30 days
+            "sid": session_id,
+            "jti": token_id,
+            "exp": datetime.utcnow()
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
         }
         return jwt.encode(data, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+    def _create_token_pair(self, user: User, session_id: str, token_id: str) -> dict:
+        """Create access and refresh tokens for a session"""
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = self.create_access_token(
+            data={"sub": user.user_id, "email": user.email, "sid": session_id},
+            expires_delta=access_token_expires,
+        )
+
+        return {
+            "access_token": access_token,
+            "refresh_token": self.create_refresh_token(
+                user.user_id, session_id, token_id
+            ),
+            "token_type": "bearer",
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
     def verify_token(self, token: str) -> Optional[TokenData]:
         """Verify and decode JWT token"""
         try:
@@ -72,7 +98,7 @@ class AuthService:
             if user_id is None:
                 return None
 
-            token_data = TokenData(user_id=user_id)
+            token_data = TokenData(user_id=user_id, session_id=payload.get("sid"))
             return token_data
         except JWTError:
             return None
@@ -86,7 +112,10 @@ class AuthService:
         if not user.password_hash:
             return None  # User registered via OAuth, no password set
 
-        if not self.verify_password(password, user.password_hash):
+        # bcrypt is CPU bound; keep it off the event loop
+        if not await run_in_threadpool(
+            self.verify_password, password, user.password_hash
+        ):
             return None
 
         return user
@@ -102,7 +131,9 @@ class AuthService:
             )
 
         # Hash password
-        password_hash = self.get_password_hash(user_data.password)
+        password_hash = await run_in_threadpool(
+            self.get_password_hash, user_data.password
+        )
 
         # Create user
         user_id = str(uuid.uuid4())
@@ -117,8 +148,7 @@ class AuthService:
         )
 
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
         return user
 
     async def login_user(self, email: str, password: str) -> dict:
@@ -136,79 +166,79 @@ class AuthService:
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
             )
 
-        # Create tokens
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = self.create_access_token(
-            data={"sub": user.user_id, "email": user.email},
-            expires_delta=access_token_expires,
+        session_id = str(uuid.uuid4())
+        token_id = str(uuid.uuid4())
+        await self.session_store.create_session(
+            session_id, user.user_id, token_id, self._refresh_ttl_seconds()
         )
 
-        refresh_token = self.create_refresh_token(user.user_id)
-
-        # Store refresh token in database
-        user.refresh_token = refresh_token
-        self.db.commit()
-
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_type": "bearer",
-            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        }
+        return self._create_token_pair(user, session_id, token_id)
 
     async def refresh_access_token(self, refresh_token: str) -> dict:
-        """Refresh access token using refresh token"""
+        """Rotate a refresh token and return a new token pair"""
+        invalid_token = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
         try:
             payload = jwt.decode(
                 refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
             )
-            user_id: str = payload.get("sub")
-            token_type: str = payload.get("type")
-
-            if user_id is None or token_type != "refresh":
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid refresh token",
-                )
-
         except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+            raise invalid_token
+
+        user_id: str = payload.get("sub")
+        session_id: str = payload.get("sid")
+        token_id: str = payload.get("jti")
+        if (
+            user_id is None
+            or session_id is None
+            or token_id is None
+            or payload.get("type") != "refresh"
+        ):
+            raise invalid_token
+
+        session = await self.session_store.get_session(session_id)
+        if session is None or session["user_id"] != user_id:
+            raise invalid_token
+
+        new_token_id = str(uuid.uuid4())
+        rotated = await self.session_store.rotate_session(
+            session_id, token_id, new_token_id, self._refresh_ttl_seconds()
+        )
+        if not rotated:
+            # An already rotated token was presented again: the token has
+            # leaked, so the whole session is revoked.
+            await self.session_store.revoke_session(session_id)
+            logger.warning(
+                "Refresh token reuse detected", user_id=user_id, session_id=session_id
             )
+            raise invalid_token
 
-        # Verify refresh token exists in database
         user = await self.user_service.get_user_by_id(user_id)
-        if not user or user.refresh_token != refresh_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
-            )
+        if not user:
+            await self.session_store.revoke_session(session_id)
+            raise invalid_token
 
         if not user.is_active:
+            await self.session_store.revoke_session(session_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
             )
 
-        # Create new access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = self.create_access_token(
-            data={"sub": user.user_id, "email": user.email},
-            expires_delta=access_token_expires,
-        )
+        return self._create_token_pair(user, session_id, new_token_id)
 
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        }
+    async def logout_user(self, user_id: str, session_id: Optional[str] = None) -> bool:
+        """Logout user by revoking the current session (or all sessions)"""
+        if session_id is None:
+            await self.session_store.revoke_user_sessions(user_id)
+            return True
 
-    async def logout_user(self, user_id: str) -> bool:
-        """Logout user by invalidating refresh token"""
-        user = await self.user_service.get_user_by_id(user_id)
-        if not user:
+        session = await self.session_store.get_session(session_id)
+        if session is None or session["user_id"] != user_id:
             return False
 
-        user.refresh_token = None
-        self.db.commit()
+        await self.session_store.revoke_session(session_id)
         return True
 
     async def change_password(
@@ -225,17 +255,24 @@ class AuthService:
                 detail="User registered via OAuth, cannot change password",
             )
 
-        if not self.verify_password(current_password, user.password_hash):
+        if not await run_in_threadpool(
+            self.verify_password, current_password, user.password_hash
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect",
             )
 
         # Hash new password
-        user.password_hash = self.get_password_hash(new_password)
+        user.password_hash = await run_in_threadpool(
+            self.get_password_hash, new_password
+        )
 
-        # Invalidate refresh token to force re-login
-        user.refresh_token = None
+        await self.db.commit()
 
-        self.db.commit()
+        # Revoke all sessions to force re-login
+        await self.session_store.revoke_user_sessions(user_id)
         return True
+
+    def _refresh_ttl_seconds(self) -> int:
+        return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
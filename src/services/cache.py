@@ -0,0 +1,634 @@
+"""
+Read-through cache for service reads
+
+Service read methods decorated with ``@cached`` keep their result under a
+key made of the cache name and the method's arguments, together with tags
+naming the rows the result was built from (e.g. ``content:<id>``). Write
+methods call invalidate_tags() after committing, which drops every entry
+carrying one of the tags.
+
+Results are stored encoded by a codec rather than as live ORM objects, so
+every hit returns fresh detached instances with the same column values and
+loaded relationships as the query returned. Write methods load the rows
+they change from their own session instead of through cached reads.
+
+Backends, chosen by CACHE_BACKEND:
+
+- "memory": LRU with per-entry TTL inside the worker (single worker, tests)
+- "redis": shared by all workers; each tag is a Redis set of entry keys
+- "none": caching disabled
+
+A failing backend is logged and treated as a miss, so reads fall back to
+the database.
+
+Popular entries are protected from stampedes when they expire:
+
+- Single flight: callers of a worker missing a key that is being computed
+  wait for that computation instead of starting their own. If it fails,
+  one of them computes again for all of them.
+- Stale-while-revalidate: an entry stays stored CACHE_STALE_SECONDS past
+  its TTL. One caller refreshes an expired entry and the others are served
+  the expired one meanwhile; with Redis, a lock picks that caller among all
+  workers.
+- Probabilistic early refresh: before expiry, a caller is picked at random
+  to refresh the entry, the likelier the closer the expiry and the longer
+  the computation took, so a hot entry is usually refreshed before anyone
+  finds it expired.
+
+Misses and refreshes read from the primary, even in read_only methods: an
+entry filled from a lagging replica would keep serving the old rows after
+the write that invalidated it. Each invalidation also bumps a version of
+its tags, and a result is only stored if the versions of its tags are
+still those read before computing it, so a computation racing a write
+does not store what the write made stale.
+
+invalidate_tags() also publishes the tags on the invalidation bus, and
+evict_local_copies() drops what other workers invalidated from this
+worker's in-process copies.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import DateTime
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.config.settings import settings
+from src.services.category_tree import CATEGORY_TREE_TAG, category_tree
+from src.services.content_suggest import suggest_index
+from src.services.invalidation_bus import ALL_TAGS, get_invalidation_bus
+from src.utils.db_routing import primary_reads
+from src.utils.metrics import (
+    record_cache_eviction,
+    record_cache_lookup,
+    record_cache_refresh,
+)
+
+logger = structlog.get_logger()
+
+
+def _cache_name(key: str) -> str:
+    return key.partition(":")[0]
+
+
+class Cache:
+    """Base class for cache backends"""
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, or None"""
+        raise NotImplementedError
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ttl_seconds: float,
+        tags: Iterable[str] = (),
+        versions: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        """
+        Store value under key for ttl_seconds, tagged with tags
+
+        With versions, as returned by tag_versions(tags) before the value
+        was computed, nothing is stored if one of tags was invalidated since.
+        """
+        raise NotImplementedError
+
+    async def tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Versions of tags, which change whenever they are invalidated"""
+        raise NotImplementedError
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying one of tags and return how many"""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Drop every entry"""
+        raise NotImplementedError
+
+    async def acquire_refresh(self, key: str, ttl_seconds: float) -> bool:
+        """
+        Whether this caller should refresh the entry under key; only one
+        caller in all workers gets True within ttl_seconds
+        """
+        # Within a worker, refreshes are already single flight
+        return True
+
+
+class NullCache(Cache):
+    """Cache that stores nothing"""
+
+    async def get(self, key: str) -> Optional[str]:
+        return None
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ttl_seconds: float,
+        tags: Iterable[str] = (),
+        versions: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        pass
+
+    async def tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return ()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        return 0
+
+    async def clear(self) -> None:
+        pass
+
+
+class InMemoryCache(Cache):
+    """Process-local LRU cache with a TTL per entry"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = (
+            settings.CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        # key -> (value, expires_at, tags), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, float, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._tagged: Dict[str, Set[str]] = {}
+        # Invalidations per tag; clear() bumps the epoch, which covers all
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._drop(key)
+                record_cache_eviction(_cache_name(key), "expired")
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._versions.get(tag, 0) for tag in tags))
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ttl_seconds: float,
+        tags: Iterable[str] = (),
+        versions: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if versions is not None and versions != self._tag_versions(tags):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl_seconds, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                record_cache_eviction(_cache_name(oldest), "capacity")
+
+    async def tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return self._tag_versions(tags)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tagged.get(tag, ()))
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            for key in keys:
+                self._drop(key)
+                record_cache_eviction(_cache_name(key), "invalidated")
+            return len(keys)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+            self._versions.clear()
+            self._epoch += 1
+
+
+# Lifetime of the Redis keys holding tag versions
+_VERSION_TTL_SECONDS = 24 * 60 * 60
+
+
+class RedisCache(Cache):
+    """Redis-backed cache shared by all workers"""
+
+    def __init__(self, redis_client, key_prefix: str = "cache"):
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}-tag:{tag}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.key_prefix}-version:{tag}"
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis.get(self._key(key))
+        return _decode(value) if value is not None else None
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ttl_seconds: float,
+        tags: Iterable[str] = (),
+        versions: Optional[Tuple[int, ...]] = None,
+    ) -> None:
+        from redis.exceptions import WatchError
+
+        tags = list(tags)
+        ttl = max(int(ttl_seconds), 1)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # No tag can invalidate an untagged entry, and a bare WATCH is
+            # an error
+            if versions is not None and tags:
+                # The transaction fails if a tag is invalidated after the check
+                await pipe.watch(*(self._version_key(tag) for tag in tags))
+                if await self._tag_versions(pipe, tags) != versions:
+                    return
+                pipe.multi()
+            pipe.set(self._key(key), value, ex=ttl)
+            for tag in tags:
+                # A tag set lives as long as the newest entry it lists
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), ttl)
+            try:
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def _tag_versions(self, client, tags: List[str]) -> Tuple[int, ...]:
+        if not tags:
+            return ()
+        values = await client.mget([self._version_key(tag) for tag in tags])
+        return tuple(int(value) if value is not None else 0 for value in values)
+
+    async def tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return await self._tag_versions(self.redis, list(tags))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        if not tags:
+            return 0
+
+        # Read and drop the tag sets atomically; entries tagged afterwards
+        # start new sets
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for tag in tags:
+                pipe.smembers(self._tag_key(tag))
+                pipe.delete(self._tag_key(tag))
+                pipe.incr(self._version_key(tag))
+                # Kept well past any computation that read the old version
+                pipe.expire(self._version_key(tag), _VERSION_TTL_SECONDS)
+            results = await pipe.execute()
+
+        keys = {_decode(key) for members in results[::4] for key in members}
+        if not keys:
+            return 0
+        deleted = await self.redis.delete(*(self._key(key) for key in keys))
+        for key in keys:
+            record_cache_eviction(_cache_name(key), "invalidated")
+        return deleted
+
+    async def acquire_refresh(self, key: str, ttl_seconds: float) -> bool:
+        return bool(
+            await self.redis.set(
+                f"{self.key_prefix}-lock:{key}", 1, nx=True, ex=max(int(ttl_seconds), 1)
+            )
+        )
+
+    async def clear(self) -> None:
+        for kind in ("", "-tag", "-lock", "-version"):
+            pattern = f"{self.key_prefix}{kind}:*"
+            keys = [key async for key in self.redis.scan_iter(match=pattern)]
+            if keys:
+                await self.redis.delete(*keys)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@lru_cache()
+def get_cache() -> Cache:
+    """Return the process-wide cache configured in settings"""
+    if settings.CACHE_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisCache(aioredis.from_url(settings.REDIS_URL))
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+
+    return InMemoryCache()
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Drop the cached reads depending on the given tags, in every worker"""
+    if not tags:
+        return
+    try:
+        await get_cache().invalidate_tags(tags)
+    except Exception:
+        # Entries left behind expire after CACHE_TTL_SECONDS
+        logger.exception("Cache invalidation failed", tags=list(tags))
+    try:
+        await get_invalidation_bus().publish(tags)
+    except Exception:
+        logger.exception("Invalidation publish failed", tags=list(tags))
+
+
+async def evict_local_copies(tags: List[str]) -> None:
+    """Drop this worker's copies of the data another worker invalidated"""
+    everything = ALL_TAGS in tags
+    cache = get_cache()
+    # A shared cache was already invalidated by the writing worker
+    if isinstance(cache, InMemoryCache):
+        if everything:
+            await cache.clear()
+        else:
+            await cache.invalidate_tags(tags)
+
+    tree_changed = everything or CATEGORY_TREE_TAG in tags
+    if tree_changed:
+        category_tree.invalidate()
+    # Category names are indexed along with the contents
+    if tree_changed or any(tag.startswith("content:") for tag in tags):
+        suggest_index.mark_stale()
+
+
+class ModelCodec:
+    """
+    Encode ORM instances as JSON, with the given relationships
+
+    Decoded instances are detached: their column values and relationships
+    are loaded, and adding one to a session merges it instead of inserting.
+    """
+
+    def __init__(self, model, **relationships: "ModelCodec"):
+        self.model = model
+        self.relationships = relationships
+        self._columns: Optional[List[str]] = None
+
+    def _inspect(self) -> None:
+        # On first use, once every model has been imported and the mappers
+        # can be configured
+        mapper = sa_inspect(self.model)
+        self._datetimes = {
+            attr.key
+            for attr in mapper.column_attrs
+            if isinstance(attr.columns[0].type, DateTime)
+        }
+        self._uselist = {
+            key: mapper.relationships[key].uselist for key in self.relationships
+        }
+        self._columns = [attr.key for attr in mapper.column_attrs]
+
+    def encode(self, instance) -> Dict[str, Any]:
+        if self._columns is None:
+            self._inspect()
+        data = {key: getattr(instance, key) for key in self._columns}
+        for key in self._datetimes:
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        for key, codec in self.relationships.items():
+            value = getattr(instance, key)
+            if self._uselist[key]:
+                data[key] = [codec.encode(item) for item in value]
+            else:
+                data[key] = codec.encode(value) if value is not None else None
+        return data
+
+    def decode(self, data: Dict[str, Any]):
+        if self._columns is None:
+            self._inspect()
+        instance = self.model()
+        for key in self._columns:
+            value = data.get(key)
+            if key in self._datetimes and value is not None:
+                value = datetime.fromisoformat(value)
+            set_committed_value(instance, key, value)
+        for key, codec in self.relationships.items():
+            value = data.get(key)
+            if self._uselist[key]:
+                value = [codec.decode(item) for item in value]
+            elif value is not None:
+                value = codec.decode(value)
+            set_committed_value(instance, key, value)
+        make_transient_to_detached(instance)
+        return instance
+
+    def dumps(self, instance) -> str:
+        return json.dumps(self.encode(instance))
+
+    def loads(self, value: str):
+        return self.decode(json.loads(value))
+
+
+class JsonCodec:
+    """Encode results made of plain JSON types, such as statistics"""
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value)
+
+    def loads(self, value: str) -> Any:
+        return json.loads(value)
+
+
+class PageCodec:
+    """Encode the (items, total) pairs returned by list methods"""
+
+    def __init__(self, item_codec: ModelCodec):
+        self.item_codec = item_codec
+
+    def dumps(self, page: Tuple[List[Any], int]) -> str:
+        items, total = page
+        return json.dumps(
+            {"items": [self.item_codec.encode(item) for item in items], "total": total}
+        )
+
+    def loads(self, value: str) -> Tuple[List[Any], int]:
+        data = json.loads(value)
+        return [self.item_codec.decode(item) for item in data["items"]], data["total"]
+
+
+# Computations in progress in this worker by key; callers missing the same
+# key meanwhile wait for their encoded result
+_in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+class _Failed:
+    """Result of a computation that raised, handed to its waiters"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _pack(fresh_until: float, duration: float, value: str) -> str:
+    return f"{fresh_until:.3f} {duration:.4f} {value}"
+
+
+def _unpack(entry: str) -> Tuple[float, float, str]:
+    fresh_until, duration, value = entry.split(" ", 2)
+    return float(fresh_until), float(duration), value
+
+
+def _refresh_early(fresh_until: float, duration: float, now: float) -> bool:
+    # XFetch: -log(u) is exponentially distributed, so the head start taken
+    # is usually around duration * beta and rarely much longer
+    beta = settings.CACHE_EARLY_REFRESH_BETA
+    return now - duration * beta * math.log(1.0 - random.random()) >= fresh_until
+
+
+def cached(
+    name: str,
+    codec,
+    tags: Callable[..., Iterable[str]],
+    ttl_seconds: Optional[float] = None,
+):
+    """
+    Serve an async service method through the cache
+
+    The key is name followed by the method's arguments; tags is called with
+    the same arguments, self excluded. None results are not cached. The
+    entry is fresh for ttl_seconds (CACHE_TTL_SECONDS by default), then
+    served stale for CACHE_STALE_SECONDS while it is refreshed.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        async def compute(self, args, kwargs, key, arguments, reason):
+            future = asyncio.get_running_loop().create_future()
+            _in_flight[key] = future
+            record_cache_refresh(name, reason)
+            cache = get_cache()
+            entry_tags = list(tags(*arguments))
+            try:
+                try:
+                    versions = await cache.tag_versions(entry_tags)
+                except Exception:
+                    logger.exception("Cache read failed", key=key)
+                    versions = None
+                started = time.monotonic()
+                with primary_reads():
+                    result = await func(self, *args, **kwargs)
+                duration = time.monotonic() - started
+                value = codec.dumps(result) if result is not None else None
+            except BaseException as e:
+                del _in_flight[key]
+                future.set_result(_Failed(e))
+                raise
+            future.set_result(value)
+
+            ttl = settings.CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+            try:
+                # Without the versions, a racing write could not be detected
+                if value is not None and versions is not None:
+                    await cache.set(
+                        key,
+                        _pack(time.time() + ttl, duration, value),
+                        ttl + settings.CACHE_STALE_SECONDS,
+                        entry_tags,
+                        versions,
+                    )
+            except Exception:
+                logger.exception("Cache write failed", key=key)
+            finally:
+                del _in_flight[key]
+            return result
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.values())[1:]
+            key = ":".join([name, *map(str, arguments)])
+            cache = get_cache()
+
+            try:
+                entry = await cache.get(key)
+                stored = _unpack(entry) if entry is not None else None
+            except Exception:
+                logger.exception("Cache read failed", key=key)
+                stored = None
+            record_cache_lookup(name, stored is not None)
+
+            if stored is None:
+                retried = False
+                while key in _in_flight:
+                    value = await asyncio.shield(_in_flight[key])
+                    if not isinstance(value, _Failed):
+                        return codec.loads(value) if value is not None else None
+                    # The first waiter to wake computes again and the others
+                    # wait for it. A retry failing too is not retried, unless
+                    # the computation was cancelled rather than failed.
+                    if retried and not isinstance(value.error, asyncio.CancelledError):
+                        raise value.error
+                    retried = True
+                return await compute(self, args, kwargs, key, arguments, "miss")
+
+            fresh_until, duration, value = stored
+            now = time.time()
+            if now < fresh_until and not _refresh_early(fresh_until, duration, now):
+                return codec.loads(value)
+
+            # Expired or picked to refresh early: one caller refreshes while
+            # the others are served this entry
+            if key not in _in_flight:
+                try:
+                    leader = await cache.acquire_refresh(
+                        f"{key}@{fresh_until:.3f}", settings.CACHE_STALE_SECONDS
+                    )
+                except Exception:
+                    logger.exception("Cache refresh lock failed", key=key)
+                    leader = True
+                if leader and key not in _in_flight:
+                    reason = "stale" if now >= fresh_until else "early"
+                    return await compute(self, args, kwargs, key, arguments, reason)
+            return codec.loads(value)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,155 @@
+"""
+Cached category tree
+
+Categories form a tree through parent_id. CategoryTree is a snapshot of
+every category, active or not, with the path from its root precomputed,
+so ancestors and breadcrumbs are an O(depth) lookup and the descendants
+of a category are a stored set; nothing needs a query once the snapshot
+is loaded.
+
+Each worker caches one snapshot in category_tree. ContentService
+invalidates it on category writes and publishes CATEGORY_TREE_TAG so the
+other workers invalidate theirs; it is also reloaded once older than
+CATEGORY_TREE_TTL_SECONDS in case a worker missed the message.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.models.content import Category
+
+# Cache tag published on writes changing the tree
+CATEGORY_TREE_TAG = "category-tree"
+
+
+class CategoryNode(NamedTuple):
+    category_id: str
+    name: str
+    parent_id: Optional[str]
+    is_active: bool
+
+
+class CategoryTree:
+    """Immutable snapshot of the category hierarchy"""
+
+    def __init__(self, nodes: Iterable[CategoryNode]):
+        self._nodes: Dict[str, CategoryNode] = {
+            node.category_id: node for node in nodes
+        }
+        self._children: Dict[str, List[str]] = defaultdict(list)
+        for node in self._nodes.values():
+            if node.parent_id in self._nodes:
+                self._children[node.parent_id].append(node.category_id)
+
+        # Root first, ending with the category itself
+        self._paths: Dict[str, Tuple[str, ...]] = {}
+        for category_id in self._nodes:
+            self._add_path(category_id)
+
+        self._descendants: Dict[str, Set[str]] = defaultdict(set)
+        for category_id, path in self._paths.items():
+            for ancestor_id in path[:-1]:
+                self._descendants[ancestor_id].add(category_id)
+
+    def _add_path(self, category_id: str) -> None:
+        # Walk up to a category whose path is known; a parent_id cycle is
+        # cut where it closes, so every path stays finite
+        chain = []
+        current = category_id
+        while (
+            current in self._nodes
+            and current not in self._paths
+            and current not in chain
+        ):
+            chain.append(current)
+            current = self._nodes[current].parent_id
+
+        path = self._paths.get(current, ())
+        for node_id in reversed(chain):
+            path += (node_id,)
+            self._paths[node_id] = path
+
+    def __contains__(self, category_id: str) -> bool:
+        return category_id in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, category_id: str) -> Optional[CategoryNode]:
+        return self._nodes.get(category_id)
+
+    def children(self, category_id: str) -> List[CategoryNode]:
+        return [self._nodes[child] for child in self._children.get(category_id, ())]
+
+    def breadcrumbs(self, category_id: str) -> List[CategoryNode]:
+        """Categories from the root down to category_id, both included"""
+        return [self._nodes[node] for node in self._paths.get(category_id, ())]
+
+    def ancestors(self, category_id: str) -> List[CategoryNode]:
+        """Categories from the root down to the parent of category_id"""
+        return self.breadcrumbs(category_id)[:-1]
+
+    def descendants(self, category_id: str) -> FrozenSet[str]:
+        """Ids of all categories below category_id"""
+        return frozenset(self._descendants.get(category_id, ()))
+
+
+class CategoryTreeCache:
+    """Process-wide cached CategoryTree"""
+
+    def __init__(self):
+        self._tree: Optional[CategoryTree] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        # Bumped by invalidate() so a load racing a write is not kept
+        self._generation = 0
+
+    def _is_fresh(self, category_id: Optional[str]) -> bool:
+        return (
+            self._tree is not None
+            and time.monotonic() - self._loaded_at < settings.CATEGORY_TREE_TTL_SECONDS
+            and (category_id is None or category_id in self._tree)
+        )
+
+    async def get(
+        self, db: AsyncSession, category_id: Optional[str] = None
+    ) -> CategoryTree:
+        """
+        The cached tree, loaded first if there is none or it has expired
+
+        With a category_id missing from the cached tree, the tree is loaded
+        again in case the category was created through another worker.
+        """
+        if self._is_fresh(category_id):
+            return self._tree
+
+        async with self._lock:
+            if not self._is_fresh(category_id):
+                generation = self._generation
+                result = await db.execute(
+                    select(
+                        Category.category_id,
+                        Category.name,
+                        Category.parent_id,
+                        Category.is_active,
+                    )
+                )
+                tree = CategoryTree(CategoryNode(*row) for row in result.all())
+                if generation != self._generation:
+                    return tree
+                self._tree = tree
+                self._loaded_at = time.monotonic()
+        return self._tree
+
+    def invalidate(self) -> None:
+        self._tree = None
+        self._generation += 1
+
+
+category_tree = CategoryTreeCache()
@@ -0,0 +1,156 @@
+"""
+Content search backends
+
+ContentService hands the search parameter of get_contents to a
+ContentSearch chosen from the database dialect:
+
+- MySQL: FULLTEXT index on title and description using the ngram parser,
+  queried in boolean mode and ranked by relevance
+- SQLite (tests and local development): FTS5 table using the trigram
+  tokenizer, ranked by bm25
+- anything else: LIKE on both columns, unranked
+
+Highlight snippets are built from the loaded rows, so they look the same
+whichever backend matched them.
+"""
+
+import html
+import re
+from typing import List, Optional
+
+from sqlalchemy import Select, column, func, literal_column, or_, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.content import CONTENT_FTS_TABLE, Content
+from src.schemas.content import ContentHighlight
+
+# Characters with a meaning in MySQL boolean mode or FTS5 query syntax
+_QUERY_SYNTAX = re.compile(r'["*+\-<>()~@^:]')
+
+# Characters of description kept around the first match in a snippet
+SNIPPET_LENGTH = 120
+
+_content_fts = table(CONTENT_FTS_TABLE, column("rowid"), column(CONTENT_FTS_TABLE))
+
+
+def search_terms(search: str) -> List[str]:
+    """Split a search string on whitespace, dropping query syntax characters"""
+    return _QUERY_SYNTAX.sub(" ", search).split()
+
+
+class ContentSearch:
+    """Match every term in the title or description with LIKE"""
+
+    # Shorter terms cannot be found through the index and fall back to LIKE
+    min_term_length = 1
+
+    def apply(self, query: Select, terms: List[str]) -> Select:
+        """Restrict query to contents matching all terms, best matches first"""
+        indexed_terms = []
+        for term in terms:
+            if len(term) < self.min_term_length:
+                query = query.where(self._like(term))
+            else:
+                indexed_terms.append(term)
+
+        if indexed_terms:
+            query = self.match(query, indexed_terms)
+        return query
+
+    def match(self, query: Select, terms: List[str]) -> Select:
+        """Add the index lookup and relevance order for terms to query"""
+        for term in terms:
+            query = query.where(self._like(term))
+        return query
+
+    @staticmethod
+    def _like(term: str):
+        return or_(
+            Content.title.contains(term, autoescape=True),
+            Content.description.contains(term, autoescape=True),
+        )
+
+
+class MySQLContentSearch(ContentSearch):
+    """FULLTEXT search with the ngram parser (ngram_token_size=2)"""
+
+    min_term_length = 2
+
+    def match(self, query: Select, terms: List[str]) -> Select:
+        # Every term is required and matched as a phrase of ngrams
+        relevance = match(
+            Content.title,
+            Content.description,
+            against=" ".join(f'+"{term}"' for term in terms),
+        ).in_boolean_mode()
+        return query.where(relevance).order_by(relevance.desc())
+
+
+class SQLiteContentSearch(ContentSearch):
+    """FTS5 search with the trigram tokenizer"""
+
+    min_term_length = 3
+
+    def match(self, query: Select, terms: List[str]) -> Select:
+        fts_column = _content_fts.c[CONTENT_FTS_TABLE]
+        return (
+            query.join(
+                _content_fts, _content_fts.c.rowid == literal_column("contents.rowid")
+            )
+            .where(fts_column.op("MATCH")(" ".join(f'"{term}"' for term in terms)))
+            .order_by(func.bm25(fts_column))
+        )
+
+
+def content_search_for(db: AsyncSession) -> ContentSearch:
+    """Search backend for the database the session is bound to"""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "mysql":
+        return MySQLContentSearch()
+    if dialect_name == "sqlite":
+        return SQLiteContentSearch()
+    return ContentSearch()
+
+
+def highlight(
+    text: Optional[str], terms: List[str], length: Optional[int] = None
+) -> Optional[str]:
+    """
+    HTML-escaped text with the terms wrapped in <mark>
+
+    With a length, only an excerpt of about that many characters around the
+    first match is kept.
+    """
+    if not text or not terms:
+        return html.escape(text) if text else text
+
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE,
+    )
+    prefix = suffix = ""
+    if length is not None and len(text) > length:
+        first = pattern.search(text)
+        start = max(first.start() - length // 4, 0) if first else 0
+        end = start + length
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        text = text[start:end]
+
+    parts = []
+    position = 0
+    for found in pattern.finditer(text):
+        parts.append(html.escape(text[position : found.start()]))
+        parts.append(f"<mark>{html.escape(found.group())}</mark>")
+        position = found.end()
+    parts.append(html.escape(text[position:]))
+    return prefix + "".join(parts) + suffix
+
+
+def highlight_content(content: Content, terms: List[str]) -> ContentHighlight:
+    """Highlighted title and description snippet of a search result"""
+    return ContentHighlight(
+        title=highlight(content.title, terms),
+        description=highlight(content.description, terms, SNIPPET_LENGTH),
+    )
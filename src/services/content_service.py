@@ -3,11 +3,14 @@ Content service layer
 """
 
 import uuid
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional, Tuple
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Optional, Sequence, Set, Tuple
 from fastapi import HTTPException, status
 
+from src.config.database import count_rows
 from src.models.content import Content, Category
 from src.schemas.content import (
     ContentCreate,
@@ -15,13 +18,27 @@ from src.schemas.content import (
     CategoryCreate,
     CategoryUpdate,
 )
+from src.services.cache import ModelCodec, cached, invalidate_tags
+from src.services.category_tree import CATEGORY_TREE_TAG, CategoryNode, category_tree
+from src.services.content_search import ContentSearch, content_search_for, search_terms
+from src.services.content_suggest import suggest_index
+from src.utils.db_routing import read_only
+
+logger = structlog.get_logger()
+
+_category_codec = ModelCodec(Category)
+_content_codec = ModelCodec(Content)
 
 
 class ContentService:
     """Content service class"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, search: Optional[ContentSearch] = None):
         self.db = db
+        # Defaults to the full-text search of the session's database
+        self.search = search
+        # Cache tags of the rows changed by the current transaction
+        self._stale_tags: Set[str] = set()
 
     # Category methods
     async def create_category(
@@ -30,7 +47,7 @@ class ContentService:
         """Create a new category"""
         # Check if parent category exists
         if category_data.parent_id:
-            parent = await self.get_category_by_id(category_data.parent_id)
+            parent = await self.db.get(Category, category_data.parent_id)
             if not parent:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -40,10 +57,11 @@ class ContentService:
         category = Category(category_id=str(uuid.uuid4()), **category_data.model_dump())
 
         self.db.add(category)
-        self.db.commit()
-        self.db.refresh(category)
+        await self._commit(CATEGORY_TREE_TAG)
+        category_tree.invalidate()
         return category
 
+    @read_only
     async def get_categories(
         self,
         skip: int = 0,
@@ -52,76 +70,106 @@ class ContentService:
         parent_id: Optional[str] = None,
     ) -> Tuple[List[Category], int]:
         """Get categories with pagination and filters"""
-        query = self.db.query(Category)
+        query = select(Category)
 
         # Apply filters
         if is_active is not None:
-            query = query.filter(Category.is_active == is_active)
+            query = query.where(Category.is_active == is_active)
 
         if parent_id is not None:
-            query = query.filter(Category.parent_id == parent_id)
+            query = query.where(Category.parent_id == parent_id)
 
-        total = query.count()
-        categories = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return categories, total
+        return list(result.scalars().all()), total
 
+    @cached(
+        "category", _category_codec, lambda category_id: [f"category:{category_id}"]
+    )
     async def get_category_by_id(self, category_id: str) -> Optional[Category]:
         """Get category by ID"""
-        return (
-            self.db.query(Category).filter(Category.category_id == category_id).first()
+        result = await self.db.execute(
+            select(Category).where(Category.category_id == category_id)
         )
+        return result.scalars().first()
+
+    @read_only
+    async def get_category_breadcrumbs(
+        self, category_id: str
+    ) -> Optional[List[CategoryNode]]:
+        """Categories from the root down to category_id, or None if not found"""
+        tree = await category_tree.get(self.db, category_id)
+        if category_id not in tree:
+            return None
+        return tree.breadcrumbs(category_id)
 
     async def update_category(
         self, category_id: str, category_data: CategoryUpdate
     ) -> Optional[Category]:
         """Update category"""
-        category = await self.get_category_by_id(category_id)
+        category = await self.db.get(Category, category_id)
         if not category:
             return None
 
         # Check if parent category exists (if being updated)
         if category_data.parent_id and category_data.parent_id != category.parent_id:
-            parent = await self.get_category_by_id(category_data.parent_id)
+            parent = await self.db.get(Category, category_data.parent_id)
             if not parent:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Parent category not found",
                 )
 
+            # A category moved below itself would make a cycle. The cached
+            # tree may miss moves made through other workers.
+            category_tree.invalidate()
+            tree = await category_tree.get(self.db)
+            if category_data.parent_id == category_id or (
+                category_data.parent_id in tree.descendants(category_id)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Category cannot be moved under itself or its descendants",
+                )
+
         # Update fields
         update_data = category_data.model_dump(exclude_unset=True)
+        if update_data.get("parent_id", category.parent_id) != category.parent_id:
+            # The published contents of the subtree move to the new ancestors
+            count = category.total_content_count
+            await self._add_content_count(category.parent_id, -count, direct=False)
+            await self._add_content_count(update_data["parent_id"], count, direct=False)
+
         for field, value in update_data.items():
             setattr(category, field, value)
 
-        self.db.commit()
-        self.db.refresh(category)
+        await self._commit(f"category:{category_id}", CATEGORY_TREE_TAG)
+        category_tree.invalidate()
         return category
 
     async def delete_category(self, category_id: str) -> bool:
         """Delete category (soft delete by setting is_active=False)"""
-        category = await self.get_category_by_id(category_id)
+        category = await self.db.get(Category, category_id)
         if not category:
             return False
 
-        # Check if category has child categories
-        child_categories = (
-            self.db.query(Category)
-            .filter(Category.parent_id == category_id, Category.is_active.is_(True))
-            .count()
-        )
-
-        if child_categories > 0:
+        # Check if category has child categories, which the cached tree may
+        # miss when they were added through another worker
+        category_tree.invalidate()
+        tree = await category_tree.get(self.db, category_id)
+        if any(child.is_active for child in tree.children(category_id)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot delete category with active child categories",
             )
 
         # Check if category has contents
-        contents_count = (
-            self.db.query(Content)
-            .filter(Content.category_id == category_id, Content.is_published.is_(True))
-            .count()
+        contents_count = await count_rows(
+            self.db,
+            select(Content).where(
+                Content.category_id == category_id, Content.is_published.is_(True)
+            ),
         )
 
         if contents_count > 0:
@@ -131,7 +179,8 @@ class ContentService:
             )
 
         category.is_active = False
-        self.db.commit()
+        await self._commit(f"category:{category_id}", CATEGORY_TREE_TAG)
+        category_tree.invalidate()
         return True
 
     # Content methods
@@ -141,7 +190,7 @@ class ContentService:
         """Create a new content"""
         # Check if category exists
         if content_data.category_id:
-            category = await self.get_category_by_id(content_data.category_id)
+            category = await self.db.get(Category, content_data.category_id)
             if not category or not category.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -155,10 +204,12 @@ class ContentService:
         )
 
         self.db.add(content)
-        self.db.commit()
-        self.db.refresh(content)
+        await self._move_content_count(None, content)
+        await self._commit(f"content:{content.content_id}")
+        await self._update_suggest_index(content)
         return content
 
+    @read_only
     async def get_contents(
         self,
         skip: int = 0,
@@ -167,49 +218,70 @@ class ContentService:
         content_type: Optional[str] = None,
         is_published: Optional[bool] = None,
         search: Optional[str] = None,
+        include_descendants: bool = False,
+        columns: Optional[Sequence[str]] = None,
     ) -> Tuple[List[Content], int]:
-        """Get contents with pagination and filters"""
-        query = self.db.query(Content)
+        """
+        Get contents with pagination and filters
+
+        With include_descendants, contents of the categories below
+        category_id are returned too. With search, only contents matching
+        every search term are returned, the most relevant first when the
+        search backend ranks matches. With columns, only those columns
+        (and the primary key) are loaded.
+        """
+        query = select(Content)
+        if columns:
+            query = query.options(
+                load_only(*(getattr(Content, column) for column in columns))
+            )
 
         # Apply filters
-        if category_id:
-            query = query.filter(Content.category_id == category_id)
+        if category_id and include_descendants:
+            tree = await category_tree.get(self.db, category_id)
+            query = query.where(
+                Content.category_id.in_([category_id, *tree.descendants(category_id)])
+            )
+        elif category_id:
+            query = query.where(Content.category_id == category_id)
 
         if content_type:
-            query = query.filter(Content.content_type == content_type)
+            query = query.where(Content.content_type == content_type)
 
         if is_published is not None:
-            query = query.filter(Content.is_published == is_published)
+            query = query.where(Content.is_published == is_published)
 
         if search:
-            search_filter = or_(
-                Content.title.contains(search), Content.description.contains(search)
-            )
-            query = query.filter(search_filter)
+            search_backend = self.search or content_search_for(self.db)
+            query = search_backend.apply(query, search_terms(search))
 
         # Order by creation date (newest first)
         query = query.order_by(Content.created_at.desc())
 
-        total = query.count()
-        contents = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return contents, total
+        return list(result.scalars().all()), total
 
+    @cached("content", _content_codec, lambda content_id: [f"content:{content_id}"])
     async def get_content_by_id(self, content_id: str) -> Optional[Content]:
         """Get content by ID"""
-        return self.db.query(Content).filter(Content.content_id == content_id).first()
+        result = await self.db.execute(
+            select(Content).where(Content.content_id == content_id)
+        )
+        return result.scalars().first()
 
     async def update_content(
         self, content_id: str, content_data: ContentUpdate
     ) -> Optional[Content]:
         """Update content"""
-        content = await self.get_content_by_id(content_id)
+        content = await self.db.get(Content, content_id)
         if not content:
             return None
 
         # Check if category exists (if being updated)
         if content_data.category_id and content_data.category_id != content.category_id:
-            category = await self.get_category_by_id(content_data.category_id)
+            category = await self.db.get(Category, content_data.category_id)
             if not category or not category.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -217,42 +289,164 @@ class ContentService:
                 )
 
         # Update fields
+        counted_in = self._counted_in(content)
         update_data = content_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(content, field, value)
 
-        self.db.commit()
-        self.db.refresh(content)
+        await self._move_content_count(counted_in, content)
+        await self._commit(f"content:{content_id}")
+        await self._update_suggest_index(content)
         return content
 
     async def delete_content(self, content_id: str) -> bool:
         """Delete content"""
-        content = await self.get_content_by_id(content_id)
+        content = await self.db.get(Content, content_id)
         if not content:
             return False
 
-        self.db.delete(content)
-        self.db.commit()
+        await self._add_content_count(self._counted_in(content), -1)
+        await self.db.delete(content)
+        await self._commit(f"content:{content_id}")
+        suggest_index.remove(content_id)
         return True
 
     async def publish_content(self, content_id: str) -> Optional[Content]:
         """Publish content"""
-        content = await self.get_content_by_id(content_id)
+        content = await self.db.get(Content, content_id)
         if not content:
             return None
 
+        counted_in = self._counted_in(content)
         content.is_published = True
-        self.db.commit()
-        self.db.refresh(content)
+        await self._move_content_count(counted_in, content)
+        await self._commit(f"content:{content_id}")
+        await self._update_suggest_index(content)
         return content
 
     async def unpublish_content(self, content_id: str) -> Optional[Content]:
         """Unpublish content"""
-        content = await self.get_content_by_id(content_id)
+        content = await self.db.get(Content, content_id)
         if not content:
             return None
 
+        counted_in = self._counted_in(content)
         content.is_published = False
-        self.db.commit()
-        self.db.refresh(content)
+        await self._move_content_count(counted_in, content)
+        await self._commit(f"content:{content_id}")
+        await self._update_suggest_index(content)
         return content
+
+    async def _update_suggest_index(self, content: Content) -> None:
+        """Apply a written content to this worker's suggest index"""
+        if not suggest_index.tracking:
+            return
+
+        category = None
+        if content.is_published and content.category_id:
+            category = await self.db.get(Category, content.category_id)
+        suggest_index.update(content, category.name if category else None)
+
+    async def _commit(self, *tags: str) -> None:
+        """Commit, then drop the cached reads of the rows that changed"""
+        await self.db.commit()
+        await invalidate_tags(*tags, *self._stale_tags)
+        self._stale_tags.clear()
+
+    # Published content counts
+    @staticmethod
+    def _counted_in(content: Content) -> Optional[str]:
+        """Category whose counts include the content, if any"""
+        return content.category_id if content.is_published else None
+
+    async def _move_content_count(
+        self, counted_in: Optional[str], content: Content
+    ) -> None:
+        """Update the counts after a write moved content out of counted_in"""
+        now_counted_in = self._counted_in(content)
+        if now_counted_in != counted_in:
+            await self._add_content_count(counted_in, -1)
+            await self._add_content_count(now_counted_in, 1)
+
+    async def _add_content_count(
+        self, category_id: Optional[str], delta: int, direct: bool = True
+    ) -> None:
+        """
+        Add delta to the total count of a category and its ancestors
+
+        With direct, the content_count of the category itself changes too;
+        moving a whole category leaves it alone.
+        """
+        if not category_id or not delta:
+            return
+
+        tree = await category_tree.get(self.db, category_id)
+        ancestor_ids = [node.category_id for node in tree.ancestors(category_id)]
+        self._stale_tags.update(
+            f"category:{changed_id}" for changed_id in (category_id, *ancestor_ids)
+        )
+
+        values = {"total_content_count": Category.total_content_count + delta}
+        if direct:
+            values["content_count"] = Category.content_count + delta
+        await self.db.execute(
+            update(Category).where(Category.category_id == category_id).values(**values)
+        )
+
+        if ancestor_ids:
+            await self.db.execute(
+                update(Category)
+                .where(Category.category_id.in_(ancestor_ids))
+                .values(total_content_count=Category.total_content_count + delta)
+            )
+
+    async def reconcile_category_counts(self) -> int:
+        """
+        Recount the published contents of every category and fix the
+        stored counts that drifted; returns the number of fixed categories
+        """
+        result = await self.db.execute(
+            select(Content.category_id, func.count())
+            .where(Content.is_published.is_(True), Content.category_id.isnot(None))
+            .group_by(Content.category_id)
+        )
+        counts = dict(result.all())
+
+        category_tree.invalidate()
+        tree = await category_tree.get(self.db)
+        result = await self.db.execute(
+            select(
+                Category.category_id,
+                Category.content_count,
+                Category.total_content_count,
+            )
+        )
+
+        fixed = 0
+        for category_id, content_count, total_content_count in result.all():
+            expected = counts.get(category_id, 0)
+            expected_total = expected + sum(
+                counts.get(descendant_id, 0)
+                for descendant_id in tree.descendants(category_id)
+            )
+            if (content_count, total_content_count) == (expected, expected_total):
+                continue
+
+            logger.warning(
+                "Category content counts drifted",
+                category_id=category_id,
+                content_count=content_count,
+                expected_content_count=expected,
+                total_content_count=total_content_count,
+                expected_total_content_count=expected_total,
+            )
+            await self.db.execute(
+                update(Category)
+                .where(Category.category_id == category_id)
+                .values(content_count=expected, total_content_count=expected_total)
+            )
+            self._stale_tags.add(f"category:{category_id}")
+            fixed += 1
+
+        await self._commit()
+        return fixed
@@ -0,0 +1,154 @@
+"""
+Search-as-you-type suggestions for published contents
+
+Each worker keeps an NgramIndex of the titles, descriptions and category
+names of published contents. It is loaded on the first suggest request,
+kept current by ContentService for changes made in this process, and
+rebuilt in the background once changes made through other workers are
+received on the invalidation bus, or once older than
+SUGGEST_INDEX_REFRESH_SECONDS in case a worker missed them.
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+import structlog
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config.settings import settings
+from src.models.content import Category, Content
+from src.utils.ngram_index import NgramIndex
+
+logger = structlog.get_logger()
+
+# Weight of a matching bigram in each field
+SUGGEST_FIELD_WEIGHTS = {"title": 3, "category": 2, "description": 1}
+
+
+def _fields(
+    title: str, description: Optional[str], category_name: Optional[str]
+) -> dict:
+    return {"title": title, "category": category_name, "description": description}
+
+
+class ContentSuggestIndex:
+    """Process-wide n-gram index of published contents"""
+
+    def __init__(self):
+        self.index = NgramIndex(SUGGEST_FIELD_WEIGHTS)
+        self.loaded_at: Optional[float] = None
+        # Set when another worker changed published contents
+        self._stale = False
+        self._lock = asyncio.Lock()
+        # Changes made while a new index is being built, replayed on it
+        self._pending: Optional[List[Callable[[NgramIndex], None]]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def tracking(self) -> bool:
+        """Whether changes are applied, i.e. the index is loaded or loading"""
+        return self.loaded or self._pending is not None
+
+    def is_stale(self) -> bool:
+        return (
+            self.loaded_at is None
+            or self._stale
+            or time.monotonic() - self.loaded_at
+            > settings.SUGGEST_INDEX_REFRESH_SECONDS
+        )
+
+    async def load(self, db: AsyncSession) -> None:
+        """Build the index from the database, replacing the current one"""
+        async with self._lock:
+            await self._build(db)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the index unless it is loaded; concurrent callers share one build"""
+        if self.loaded:
+            return
+        async with self._lock:
+            # Another request may have loaded it while this one waited
+            if not self.loaded:
+                await self._build(db)
+
+    async def _build(self, db: AsyncSession) -> None:
+        self._pending = []
+        # Later changes from other workers mark the new index stale again
+        self._stale = False
+        result = await db.execute(
+            select(
+                Content.content_id,
+                Content.title,
+                Content.description,
+                Category.name,
+            )
+            .outerjoin(Category, Content.category_id == Category.category_id)
+            .where(Content.is_published.is_(True))
+        )
+        documents = [
+            (content_id, _fields(title, description, category_name))
+            for content_id, title, description, category_name in result.all()
+        ]
+        # Building takes long enough to stall the event loop
+        try:
+            index = await run_in_threadpool(
+                NgramIndex.build, SUGGEST_FIELD_WEIGHTS, documents
+            )
+            for change in self._pending:
+                change(index)
+        finally:
+            self._pending = None
+        self.index = index
+        self.loaded_at = time.monotonic()
+
+    async def refresh(self, session_factory: async_sessionmaker) -> None:
+        """Background task reloading a stale index"""
+        if self._lock.locked() or not self.is_stale():
+            return
+        try:
+            async with session_factory() as db:
+                await self.load(db)
+        except Exception:
+            logger.exception("Suggest index refresh failed")
+
+    def update(self, content: Content, category_name: Optional[str]) -> None:
+        """Index a written content, or drop it when it is not published"""
+        if not content.is_published:
+            self.remove(content.content_id)
+            return
+
+        content_id = content.content_id
+        fields = _fields(content.title, content.description, category_name)
+        self._apply(lambda index: index.add(content_id, fields))
+
+    def remove(self, content_id: str) -> None:
+        self._apply(lambda index: index.remove(content_id))
+
+    def _apply(self, change: Callable[[NgramIndex], None]) -> None:
+        if self._pending is not None:
+            self._pending.append(change)
+        if self.loaded:
+            change(self.index)
+
+    def suggest(self, query: str, limit: int = 10) -> List[str]:
+        """Ids of the best matching published contents"""
+        return [content_id for content_id, _ in self.index.search(query, limit)]
+
+    def mark_stale(self) -> None:
+        """Rebuild the index on the next suggest request"""
+        self._stale = True
+
+    def reset(self) -> None:
+        """Forget the index; the next suggest request loads it again"""
+        self.index = NgramIndex(SUGGEST_FIELD_WEIGHTS)
+        self.loaded_at = None
+        self._stale = False
+
+
+suggest_index = ContentSuggestIndex()
@@ -0,0 +1,229 @@
+"""
+Cross-worker invalidation bus
+
+Every worker keeps in-process copies of shared data: the in-memory cache
+of service reads, the category tree and the suggest index. A write drops
+the copies of the worker that made it, then publishes the cache tags it
+invalidated on the bus; every other worker receives them and drops its
+own copies through the handlers subscribed to the bus.
+
+Backends, chosen by INVALIDATION_BUS_BACKEND:
+
+- "none": a single worker, nothing to tell
+- "redis": Redis pub/sub on INVALIDATION_BUS_CHANNEL
+- "socket": a Unix datagram socket per worker in INVALIDATION_BUS_SOCKET_DIR,
+  for workers on one host without Redis
+
+Delivery is at most once. Staleness is bounded as follows:
+
+- A delivered message is applied within the delivery latency, normally
+  milliseconds.
+- A message lost while a worker is unsubscribed is made up for when it
+  subscribes again: it drops all of its copies (ALL_TAGS).
+- A message lost otherwise (a full socket buffer, a crash between commit
+  and publish) leaves copies no older than their own TTL:
+  CACHE_TTL_SECONDS, CATEGORY_TREE_TTL_SECONDS and
+  SUGGEST_INDEX_REFRESH_SECONDS.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, List, Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.utils.metrics import record_invalidation_message
+
+logger = structlog.get_logger()
+
+# Received in place of the tags when a worker may have missed messages
+ALL_TAGS = "*"
+
+# Tags per message, keeping each message well inside a datagram
+MAX_TAGS_PER_MESSAGE = 500
+
+Handler = Callable[[List[str]], Awaitable[None]]
+
+
+class InvalidationBus:
+    """Base class for invalidation buses"""
+
+    def __init__(self):
+        # Identifies this worker's own messages, which it skips
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        """Call handler with the tags invalidated by other workers"""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    async def publish(self, tags: Iterable[str]) -> None:
+        """Send tags to every other worker"""
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Start receiving the messages of other workers"""
+
+    async def stop(self) -> None:
+        """Stop receiving messages"""
+
+    def _messages(self, tags: Iterable[str]) -> Iterator[bytes]:
+        tags = list(tags)
+        for start in range(0, len(tags), MAX_TAGS_PER_MESSAGE):
+            chunk = tags[start : start + MAX_TAGS_PER_MESSAGE]
+            yield json.dumps({"origin": self.origin, "tags": chunk}).encode()
+
+    async def _receive(self, message: bytes) -> None:
+        try:
+            data = json.loads(message)
+            origin, tags = data["origin"], data["tags"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed invalidation message ignored")
+            return
+        if origin == self.origin:
+            return
+        record_invalidation_message("received")
+        await self._apply(tags)
+
+    async def _apply(self, tags: List[str]) -> None:
+        for handler in self._handlers:
+            try:
+                await handler(tags)
+            except Exception:
+                logger.exception("Invalidation handler failed", tags=tags)
+
+
+class NullInvalidationBus(InvalidationBus):
+    """Bus of a single worker, which has no one to tell"""
+
+    async def publish(self, tags: Iterable[str]) -> None:
+        pass
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Invalidation bus over Redis pub/sub"""
+
+    def __init__(self, redis_client, channel: str):
+        super().__init__()
+        self.redis = redis_client
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, tags: Iterable[str]) -> None:
+        for message in self._messages(tags):
+            await self.redis.publish(self.channel, message)
+            record_invalidation_message("published")
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # Messages published while unsubscribed are lost
+                await self._apply([ALL_TAGS])
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self._receive(message["data"])
+            except Exception:
+                logger.exception("Invalidation bus subscription lost")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(settings.INVALIDATION_BUS_RECONNECT_SECONDS)
+
+
+class SocketInvalidationBus(InvalidationBus):
+    """
+    Invalidation bus over Unix datagram sockets, one per worker
+
+    Each worker binds a socket in directory and publishing sends the
+    message to every other socket found there, so the workers must share
+    the host. Sockets left behind by workers that exited are removed by
+    the first worker failing to send to them.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory)
+        self.path = self.directory / f"{self.origin}.sock"
+        self._socket: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, tags: Iterable[str]) -> None:
+        if self._sender is None:
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+
+        peers = [path for path in self.directory.glob("*.sock") if path != self.path]
+        for message in self._messages(tags):
+            for path in peers:
+                try:
+                    self._sender.sendto(message, str(path))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    # A full buffer: the worker keeps its copies until they
+                    # expire
+                    logger.warning("Invalidation message dropped", peer=path.name)
+            record_invalidation_message("published")
+
+    async def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.bind(str(self.path))
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for sock in (self._socket, self._sender):
+            if sock is not None:
+                sock.close()
+        self._socket = self._sender = None
+        self.path.unlink(missing_ok=True)
+
+    async def _listen(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.sock_recv(self._socket, 65536)
+            await self._receive(message)
+
+
+@lru_cache()
+def get_invalidation_bus() -> InvalidationBus:
+    """Return the process-wide invalidation bus configured in settings"""
+    if settings.INVALIDATION_BUS_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisInvalidationBus(
+            aioredis.from_url(settings.REDIS_URL), settings.INVALIDATION_BUS_CHANNEL
+        )
+    if settings.INVALIDATION_BUS_BACKEND == "socket":
+        return SocketInvalidationBus(settings.INVALIDATION_BUS_SOCKET_DIR)
+
+    return NullInvalidationBus()
@@ -4,9 +4,11 @@ Learning service for managing user progress and analytics
 
 import uuid
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from typing import List, Optional, Sequence
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import count_rows
 
 from src.models.learning import (
     LearningProgress,
@@ -20,43 +22,68 @@ from src.schemas.learning import (
     AssignmentCreate,
     LearningPathCreate,
 )
+from src.services.cache import ModelCodec, PageCodec, cached, invalidate_tags
+from src.utils.db_routing import read_only
+
+_learning_paths_codec = PageCodec(ModelCodec(LearningPath))
 
 
 class LearningService:
     """Service for learning progress management"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_progress(
+    @read_only
+    async def get_user_progress(
         self, user_id: str, content_id: str = None
     ) -> Optional[LearningProgress]:
         """Get user learning progress for specific content or all"""
-        query = self.db.query(LearningProgress).filter(
-            LearningProgress.user_id == user_id
-        )
+        query = select(LearningProgress).where(LearningProgress.user_id == user_id)
 
         if content_id:
-            query = query.filter(LearningProgress.content_id == content_id)
-            return query.first()
-
-        return query.all()
+            query = query.where(LearningProgress.content_id == content_id)
+            result = await self.db.execute(query)
+            return result.scalars().first()
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    @read_only
+    async def get_user_progress_rows(self, user_id: str, fields: Sequence[str]) -> list:
+        """
+        Get user learning progress on every content as rows of fields
+
+        fields are columns of learning_progress and content_title, the title
+        of the content; only those are selected. Progress on contents that no
+        longer exist is left out.
+        """
+        selectable = {
+            column.key: getattr(LearningProgress, column.key)
+            for column in LearningProgress.__table__.columns
+        }
+        selectable["content_title"] = Content.title
+        result = await self.db.execute(
+            select(*(selectable[field].label(field) for field in fields))
+            .join(Content, Content.content_id == LearningProgress.content_id)
+            .where(LearningProgress.user_id == user_id)
+        )
+        return list(result.all())
 
-    def update_progress(
+    async def update_progress(
         self, user_id: str, content_id: str, progress_data: ProgressUpdate
     ) -> LearningProgress:
         """Update user progress for content"""
         # Get or create progress record
-        progress = (
-            self.db.query(LearningProgress)
-            .filter(
+        result = await self.db.execute(
+            select(LearningProgress).where(
                 and_(
                     LearningProgress.user_id == user_id,
                     LearningProgress.content_id == content_id,
                 )
             )
-            .first()
         )
+        progress = result.scalars().first()
 
         if not progress:
             progress = LearningProgress(
@@ -80,18 +107,17 @@ class LearningService:
             progress.is_completed = True
             progress.completed_at = datetime.utcnow()
 
-        self.db.commit()
-        self.db.refresh(progress)
+        await self.db.commit()
         return progress
 
-    def get_user_progress_summary(self, user_id: str) -> dict:
+    @read_only
+    async def get_user_progress_summary(self, user_id: str) -> dict:
         """Get user progress summary statistics"""
         # Get all progress records for user
-        progress_records = (
-            self.db.query(LearningProgress)
-            .filter(LearningProgress.user_id == user_id)
-            .all()
+        result = await self.db.execute(
+            select(LearningProgress).where(LearningProgress.user_id == user_id)
         )
+        progress_records = result.scalars().all()
 
         total_contents = len(progress_records)
         completed_contents = sum(1 for p in progress_records if p.is_completed)
@@ -110,19 +136,20 @@ class LearningService:
             "completion_rate": round(completion_rate, 2),
         }
 
-    def get_content_progress_stats(self, content_id: str) -> dict:
+    @read_only
+    async def get_content_progress_stats(self, content_id: str) -> dict:
         """Get progress statistics for specific content"""
         # Get all progress records for content
-        progress_records = (
-            self.db.query(LearningProgress)
-            .filter(LearningProgress.content_id == content_id)
-            .all()
+        result = await self.db.execute(
+            select(LearningProgress).where(LearningProgress.content_id == content_id)
         )
+        progress_records = result.scalars().all()
 
         # Get content info
-        content = (
-            self.db.query(Content).filter(Content.content_id == content_id).first()
+        result = await self.db.execute(
+            select(Content).where(Content.content_id == content_id)
         )
+        content = result.scalars().first()
         if not content:
             return None
 
@@ -152,7 +179,7 @@ class LearningService:
             "completion_rate": round(completion_rate, 2),
         }
 
-    def create_assignment(
+    async def create_assignment(
         self, assignment_data: AssignmentCreate, assigned_by: str
     ) -> LearningAssignment:
         """Create learning assignment"""
@@ -167,24 +194,22 @@ class LearningService:
         )
 
         self.db.add(assignment)
-        self.db.commit()
-        self.db.refresh(assignment)
+        await self.db.commit()
         return assignment
 
-    def get_user_assignments(
+    @read_only
+    async def get_user_assignments(
         self, user_id: str, skip: int = 0, limit: int = 100
     ) -> tuple[List[LearningAssignment], int]:
         """Get assignments for user with pagination"""
-        query = self.db.query(LearningAssignment).filter(
-            LearningAssignment.user_id == user_id
-        )
+        query = select(LearningAssignment).where(LearningAssignment.user_id == user_id)
 
-        total = query.count()
-        assignments = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return assignments, total
+        return list(result.scalars().all()), total
 
-    def create_learning_path(
+    async def create_learning_path(
         self, path_data: LearningPathCreate, created_by: str
     ) -> LearningPath:
         """Create learning path with contents"""
@@ -197,7 +222,6 @@ class LearningService:
         )
 
         self.db.add(path)
-        self.db.flush()  # Get the path_id
 
         # Add contents to path
         for index, content_id in enumerate(path_data.content_ids):
@@ -210,35 +234,41 @@ class LearningService:
             )
             self.db.add(path_content)
 
-        self.db.commit()
-        self.db.refresh(path)
+        await self.db.commit()
+        await invalidate_tags("learning_paths")
         return path
 
-    def get_learning_paths(
+    @cached(
+        "learning_paths", _learning_paths_codec, lambda skip, limit: ["learning_paths"]
+    )
+    @read_only
+    async def get_learning_paths(
         self, skip: int = 0, limit: int = 100
     ) -> tuple[List[LearningPath], int]:
         """Get learning paths with pagination"""
-        query = self.db.query(LearningPath).filter(LearningPath.is_active)
+        query = select(LearningPath).where(LearningPath.is_active)
 
-        total = query.count()
-        paths = query.offset(skip).limit(limit).all()
+        total = await count_rows(self.db, query)
+        result = await self.db.execute(query.offset(skip).limit(limit))
 
-        return paths, total
+        return list(result.scalars().all()), total
 
-    def get_learning_path_progress(self, user_id: str, path_id: str) -> dict:
+    @read_only
+    async def get_learning_path_progress(self, user_id: str, path_id: str) -> dict:
         """Get user progress for learning path"""
         # Get path contents
-        path_contents = (
-            self.db.query(LearningPathContent)
-            .filter(LearningPathContent.path_id == path_id)
+        result = await self.db.execute(
+            select(LearningPathContent)
+            .where(LearningPathContent.path_id == path_id)
             .order_by(LearningPathContent.order_index)
-            .all()
         )
+        path_contents = result.scalars().all()
 
         # Get path info
-        path = (
-            self.db.query(LearningPath).filter(LearningPath.path_id == path_id).first()
+        result = await self.db.execute(
+            select(LearningPath).where(LearningPath.path_id == path_id)
         )
+        path = result.scalars().first()
         if not path:
             return None
 
@@ -247,17 +277,16 @@ class LearningService:
 
         # Check progress for each content
         for path_content in path_contents:
-            progress = (
-                self.db.query(LearningProgress)
-                .filter(
+            result = await self.db.execute(
+                select(LearningProgress).where(
                     and_(
                         LearningProgress.user_id == user_id,
                         LearningProgress.content_id == path_content.content_id,
                         LearningProgress.is_completed,
                     )
                 )
-                .first()
             )
+            progress = result.scalars().first()
             if progress:
                 completed_contents += 1
 
@@ -0,0 +1,237 @@
+"""
+Refresh token session store
+
+Each login creates a session keyed by a random session id. The session
+remembers the id (jti) of the only refresh token that is currently valid
+for it, so rotation is a compare-and-set and presenting an already-rotated
+token is detected as reuse. Revoking a session is a single key delete.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from src.config.settings import settings
+
+
+class SessionStore(ABC):
+    """Base class for refresh token session stores"""
+
+    @abstractmethod
+    async def create_session(
+        self, session_id: str, user_id: str, token_id: str, ttl_seconds: int
+    ) -> None:
+        """Create a new session whose current refresh token is token_id"""
+
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[Dict[str, str]]:
+        """Return {"user_id", "token_id"} for a live session, or None"""
+
+    @abstractmethod
+    async def rotate_session(
+        self,
+        session_id: str,
+        expected_token_id: str,
+        new_token_id: str,
+        ttl_seconds: int,
+    ) -> bool:
+        """Atomically replace the current token id if it equals expected_token_id"""
+
+    @abstractmethod
+    async def revoke_session(self, session_id: str) -> None:
+        """Revoke a single session"""
+
+    @abstractmethod
+    async def revoke_user_sessions(self, user_id: str) -> int:
+        """Revoke every session of a user and return how many were revoked"""
+
+    @abstractmethod
+    async def get_user_session_ids(self, user_id: str) -> List[str]:
+        """List live session ids of a user"""
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local session store (single worker and tests)"""
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, object]] = {}
+        self._user_sessions: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, session_id: str) -> Optional[Dict[str, object]]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if session["expires_at"] <= time.monotonic():
+            self._drop(session_id)
+            return None
+        return session
+
+    def _drop(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            user_sessions = self._user_sessions.get(session["user_id"])
+            if user_sessions is not None:
+                user_sessions.discard(session_id)
+                if not user_sessions:
+                    del self._user_sessions[session["user_id"]]
+
+    async def create_session(
+        self, session_id: str, user_id: str, token_id: str, ttl_seconds: int
+    ) -> None:
+        with self._lock:
+            self._sessions[session_id] = {
+                "user_id": user_id,
+                "token_id": token_id,
+                "expires_at": time.monotonic() + ttl_seconds,
+            }
+            self._user_sessions.setdefault(user_id, set()).add(session_id)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return None
+            return {"user_id": session["user_id"], "token_id": session["token_id"]}
+
+    async def rotate_session(
+        self,
+        session_id: str,
+        expected_token_id: str,
+        new_token_id: str,
+        ttl_seconds: int,
+    ) -> bool:
+        with self._lock:
+            session = self._live(session_id)
+            if session is None or session["token_id"] != expected_token_id:
+                return False
+            session["token_id"] = new_token_id
+            session["expires_at"] = time.monotonic() + ttl_seconds
+            return True
+
+    async def revoke_session(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+
+    async def revoke_user_sessions(self, user_id: str) -> int:
+        with self._lock:
+            session_ids = list(self._user_sessions.get(user_id, ()))
+            # Expired sessions are dropped too but, as in Redis, not counted
+            live = [sid for sid in session_ids if self._live(sid) is not None]
+            for session_id in live:
+                self._drop(session_id)
+            return len(live)
+
+    async def get_user_session_ids(self, user_id: str) -> List[str]:
+        with self._lock:
+            session_ids = list(self._user_sessions.get(user_id, ()))
+            return [sid for sid in session_ids if self._live(sid) is not None]
+
+
+# KEYS[1] = session hash, KEYS[2] = the user's session set,
+# ARGV = expected token id, new token id, ttl seconds, session id
+_ROTATE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'token_id')
+if (not current) or current ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'token_id', ARGV[2])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+-- The set must outlive the session, or revoking the user's sessions misses it
+redis.call('SADD', KEYS[2], ARGV[4])
+if redis.call('TTL', KEYS[2]) < tonumber(ARGV[3]) then
+    redis.call('EXPIRE', KEYS[2], tonumber(ARGV[3]))
+end
+return 1
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """Redis-backed session store shared by all workers"""
+
+    def __init__(self, redis_client, key_prefix: str = "auth"):
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._rotate = self.redis.register_script(_ROTATE_SCRIPT)
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:user_sessions:{user_id}"
+
+    async def create_session(
+        self, session_id: str, user_id: str, token_id: str, ttl_seconds: int
+    ) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._session_key(session_id),
+                mapping={"user_id": user_id, "token_id": token_id},
+            )
+            pipe.expire(self._session_key(session_id), ttl_seconds)
+            pipe.sadd(self._user_key(user_id), session_id)
+            pipe.expire(self._user_key(user_id), ttl_seconds)
+            await pipe.execute()
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, str]]:
+        data = await self.redis.hgetall(self._session_key(session_id))
+        if not data:
+            return None
+        data = {_decode(k): _decode(v) for k, v in data.items()}
+        return {"user_id": data["user_id"], "token_id": data["token_id"]}
+
+    async def rotate_session(
+        self,
+        session_id: str,
+        expected_token_id: str,
+        new_token_id: str,
+        ttl_seconds: int,
+    ) -> bool:
+        user_id = await self.redis.hget(self._session_key(session_id), "user_id")
+        if user_id is None:
+            return False
+        result = await self._rotate(
+            keys=[self._session_key(session_id), self._user_key(_decode(user_id))],
+            args=[expected_token_id, new_token_id, ttl_seconds, session_id],
+        )
+        return int(result) == 1
+
+    async def revoke_session(self, session_id: str) -> None:
+        key = self._session_key(session_id)
+        user_id = await self.redis.hget(key, "user_id")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if user_id is not None:
+                pipe.srem(self._user_key(_decode(user_id)), session_id)
+            await pipe.execute()
+
+    async def revoke_user_sessions(self, user_id: str) -> int:
+        session_ids = await self.get_user_session_ids(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for session_id in session_ids:
+                pipe.delete(self._session_key(session_id))
+            pipe.delete(self._user_key(user_id))
+            deleted = await pipe.execute()
+        # The set may still list sessions that expired on their own
+        return sum(deleted[: len(session_ids)])
+
+    async def get_user_session_ids(self, user_id: str) -> List[str]:
+        members = await self.redis.smembers(self._user_key(user_id))
+        return [_decode(member) for member in members]
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@lru_cache()
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store configured in settings"""
+    if settings.SESSION_STORE_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisSessionStore(aioredis.from_url(settings.REDIS_URL))
+
+    return InMemorySessionStore()
@@ -0,0 +1,266 @@
+"""
+Training record import service
+
+Imports learning progress and quiz attempts kept before the system went
+live. Users, contents and quizzes are referred to by email and title and
+resolved through lookup maps loaded once per import.
+"""
+
+import uuid
+from typing import Callable, Dict, Optional, Sequence, Set, TextIO, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import upsert_statement
+from src.config.settings import settings
+from src.models.assessment import Quiz, QuizAttempt
+from src.models.content import Content
+from src.models.learning import LearningProgress
+from src.models.user import User
+from src.schemas.imports import ImportResult, ProgressRecord, QuizAttemptRecord
+from src.services.cache import invalidate_tags
+from src.utils.csv_import import (
+    ImportCheckpoint,
+    add_row_error,
+    iter_csv_chunks,
+    present_values,
+    validation_message,
+)
+
+# Namespace for ids of imported rows, so importing a record again (after an
+# interrupted run) updates the row written the first time
+TRAINING_RECORD_NAMESPACE = uuid.UUID("6f1c2a64-1f4e-4d55-9a51-3d0f3c7c8b1e")
+
+
+class RecordLookupError(ValueError):
+    """A row refers to a user, content or quiz that cannot be resolved"""
+
+
+def _unique_map(pairs) -> Dict[str, Optional[str]]:
+    """Map keys to ids, with None for keys shared by several rows"""
+    mapping: Dict[str, Optional[str]] = {}
+    for key, value in pairs:
+        mapping[key] = None if key in mapping else value
+    return mapping
+
+
+class TrainingRecordImportService:
+    """Bulk import of historical learning progress and quiz attempts"""
+
+    def __init__(self, db: AsyncSession, chunk_size: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.user_ids: Dict[str, str] = {}
+        self.content_ids: Dict[str, Optional[str]] = {}
+        self.quizzes: Dict[str, Optional[Tuple[str, float]]] = {}
+        # Quizzes whose attempts were imported, for their cached statistics
+        self.imported_quiz_ids: Set[str] = set()
+
+    async def import_progress_csv(
+        self, csv_file: TextIO, checkpoint: Optional[ImportCheckpoint] = None
+    ) -> ImportResult:
+        """
+        Import learning progress rows
+
+        Columns: email, content_title, progress_percentage, started_at and
+        optionally time_spent_minutes, completed_at, last_accessed_at. Like
+        update_progress there is one row per user and content; a later row
+        for the same pair replaces the earlier one.
+        """
+        await self._load_users()
+        result = await self.db.execute(select(Content.title, Content.content_id))
+        self.content_ids = _unique_map(result.all())
+
+        return await self._import(
+            csv_file,
+            checkpoint,
+            ProgressRecord,
+            self._progress_row,
+            LearningProgress.__table__,
+            "progress_id",
+            ("user_id", "content_id"),
+        )
+
+    async def import_quiz_attempts_csv(
+        self, csv_file: TextIO, checkpoint: Optional[ImportCheckpoint] = None
+    ) -> ImportResult:
+        """
+        Import completed quiz attempts
+
+        Columns: email, quiz_title, attempt_number, started_at, completed_at,
+        score (percentage), max_score and optionally is_passed. Attempts are
+        matched on user, quiz and attempt number.
+        """
+        await self._load_users()
+        result = await self.db.execute(
+            select(Quiz.title, Quiz.quiz_id, Quiz.passing_score)
+        )
+        self.quizzes = _unique_map(
+            (title, (quiz_id, passing_score))
+            for title, quiz_id, passing_score in result.all()
+        )
+
+        self.imported_quiz_ids = set()
+        try:
+            return await self._import(
+                csv_file,
+                checkpoint,
+                QuizAttemptRecord,
+                self._quiz_attempt_row,
+                QuizAttempt.__table__,
+                "attempt_id",
+                ("user_id", "quiz_id", "attempt_number"),
+            )
+        finally:
+            await invalidate_tags(
+                *(f"quiz-statistics:{quiz_id}" for quiz_id in self.imported_quiz_ids)
+            )
+
+    async def _load_users(self) -> None:
+        result = await self.db.execute(select(User.email, User.user_id))
+        self.user_ids = {email.lower(): user_id for email, user_id in result.all()}
+
+    def _user_id(self, email: str) -> str:
+        user_id = self.user_ids.get(email.lower())
+        if user_id is None:
+            raise RecordLookupError(f"email: unknown user {email}")
+        return user_id
+
+    def _progress_row(self, record: ProgressRecord) -> Dict:
+        if record.content_title not in self.content_ids:
+            raise RecordLookupError(
+                f"content_title: unknown content {record.content_title}"
+            )
+        content_id = self.content_ids[record.content_title]
+        if content_id is None:
+            raise RecordLookupError(
+                f"content_title: several contents are titled {record.content_title}"
+            )
+
+        is_completed = record.progress_percentage >= 100.0
+        completed_at = record.completed_at if is_completed else None
+        return {
+            "user_id": self._user_id(record.email),
+            "content_id": content_id,
+            "progress_percentage": record.progress_percentage,
+            "time_spent_minutes": record.time_spent_minutes,
+            "is_completed": is_completed,
+            "started_at": record.started_at,
+            "completed_at": completed_at,
+            "last_accessed_at": record.last_accessed_at
+            or completed_at
+            or record.started_at,
+        }
+
+    def _quiz_attempt_row(self, record: QuizAttemptRecord) -> Dict:
+        if record.quiz_title not in self.quizzes:
+            raise RecordLookupError(f"quiz_title: unknown quiz {record.quiz_title}")
+        quiz = self.quizzes[record.quiz_title]
+        if quiz is None:
+            raise RecordLookupError(
+                f"quiz_title: several quizzes are titled {record.quiz_title}"
+            )
+
+        quiz_id, passing_score = quiz
+        self.imported_quiz_ids.add(quiz_id)
+        time_spent = record.completed_at - record.started_at
+        return {
+            "user_id": self._user_id(record.email),
+            "quiz_id": quiz_id,
+            "attempt_number": record.attempt_number,
+            "started_at": record.started_at,
+            "completed_at": record.completed_at,
+            "time_spent_minutes": max(int(time_spent.total_seconds() / 60), 0),
+            "score": record.score,
+            "max_score": record.max_score,
+            "is_passed": (
+                record.score >= passing_score
+                if record.is_passed is None
+                else record.is_passed
+            ),
+            "status": "completed",
+        }
+
+    async def _import(
+        self,
+        csv_file: TextIO,
+        checkpoint: Optional[ImportCheckpoint],
+        schema: type[BaseModel],
+        to_row: Callable[[BaseModel], Dict],
+        table: Table,
+        id_column: str,
+        key_columns: Sequence[str],
+    ) -> ImportResult:
+        result = ImportResult()
+        resume_after = checkpoint.line if checkpoint else 0
+        columns = list(schema.model_fields)
+        required_columns = [
+            name for name, field in schema.model_fields.items() if field.is_required()
+        ]
+        # created_at records when the row first appeared, so a re-import keeps it
+        update_columns = [
+            column.name
+            for column in table.columns
+            if column.name not in (id_column, "created_at")
+            and column.name not in key_columns
+        ]
+        statement = upsert_statement(self.db, table, [id_column], update_columns)
+
+        async for chunk in iter_csv_chunks(csv_file, self.chunk_size, required_columns):
+            rows: Dict[Tuple, Dict] = {}
+            for line, raw_row in chunk:
+                if line <= resume_after:
+                    result.skipped += 1
+                    continue
+
+                result.processed += 1
+                try:
+                    row = to_row(schema(**present_values(raw_row, columns)))
+                except ValidationError as e:
+                    add_row_error(result, line, validation_message(e))
+                    continue
+                except RecordLookupError as e:
+                    add_row_error(result, line, str(e))
+                    continue
+
+                # A later row for the same record replaces the earlier one
+                rows[tuple(row[column] for column in key_columns)] = row
+
+            if rows:
+                await self._assign_ids(table, id_column, key_columns, rows)
+                await self.db.execute(statement, list(rows.values()))
+                await self.db.commit()
+                result.imported += len(rows)
+
+            if checkpoint:
+                checkpoint.save(chunk[-1][0])
+
+        if checkpoint:
+            checkpoint.clear()
+        return result
+
+    async def _assign_ids(
+        self,
+        table: Table,
+        id_column: str,
+        key_columns: Sequence[str],
+        rows: Dict[Tuple, Dict],
+    ) -> None:
+        """Reuse the id of existing rows, derive a stable id for new ones"""
+        key = tuple_(*(table.c[column] for column in key_columns))
+        result = await self.db.execute(
+            select(
+                table.c[id_column], *(table.c[column] for column in key_columns)
+            ).where(key.in_(list(rows)))
+        )
+        existing = {tuple(found[1:]): found[0] for found in result.all()}
+
+        for row_key, row in rows.items():
+            row[id_column] = existing.get(row_key) or str(
+                uuid.uuid5(
+                    TRAINING_RECORD_NAMESPACE,
+                    f"{table.name}:" + ":".join(str(part) for part in row_key),
+                )
+            )
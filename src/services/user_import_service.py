@@ -0,0 +1,68 @@
+"""
+Bulk user import service
+"""
+
+import uuid
+from typing import Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.database import upsert_statement
+from src.config.settings import settings
+from src.models.user import User
+from src.schemas.imports import ImportResult
+from src.schemas.user import UserCreate
+from src.utils.csv_import import (
+    add_row_error,
+    clean_row,
+    iter_csv_chunks,
+    validation_message,
+)
+
+USER_CSV_COLUMNS = ("email", "display_name", "department", "position")
+REQUIRED_USER_CSV_COLUMNS = ("email", "display_name")
+
+# Columns overwritten when a user with the same email already exists
+USER_UPSERT_COLUMNS = ("display_name", "department", "position", "updated_at")
+
+
+class UserImportService:
+    """Create or update users from CSV files"""
+
+    def __init__(self, db: AsyncSession, chunk_size: Optional[int] = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+
+    async def import_csv(self, csv_file: TextIO) -> ImportResult:
+        """
+        Upsert users by email from a CSV file with a header row
+
+        Every chunk of valid rows is written with one multi-row upsert and
+        committed on its own. Rows are matched by email, so an interrupted
+        import can simply be run again.
+        """
+        result = ImportResult()
+        statement = upsert_statement(
+            self.db, User.__table__, ["email"], USER_UPSERT_COLUMNS
+        )
+
+        async for chunk in iter_csv_chunks(
+            csv_file, self.chunk_size, REQUIRED_USER_CSV_COLUMNS
+        ):
+            rows = []
+            for line, row in chunk:
+                result.processed += 1
+                try:
+                    user_data = UserCreate(**clean_row(row, USER_CSV_COLUMNS))
+                except ValidationError as e:
+                    add_row_error(result, line, validation_message(e))
+                    continue
+                rows.append({"user_id": str(uuid.uuid4()), **user_data.model_dump()})
+
+            if rows:
+                await self.db.execute(statement, rows)
+                await self.db.commit()
+                result.imported += len(rows)
+
+        return result
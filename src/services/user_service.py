@@ -2,37 +2,42 @@
 User service layer
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from src.models.user import User
 from src.schemas.user import UserCreate, UserUpdate
+from src.utils.db_routing import read_only
 
 
 class UserService:
     """User service class"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
+    @read_only
     async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Get all users with pagination"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+        result = await self.db.execute(select(User).offset(skip).limit(limit))
+        return list(result.scalars().all())
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        return self.db.query(User).filter(User.user_id == user_id).first()
+        result = await self.db.execute(select(User).where(User.user_id == user_id))
+        return result.scalars().first()
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        return self.db.query(User).filter(User.email == email).first()
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
 
     async def create_user(self, user_id: str, user_data: UserCreate) -> User:
         """Create new user"""
         db_user = User(user_id=user_id, **user_data.model_dump())
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
         return db_user
 
     async def update_user(self, user_id: str, user_data: UserUpdate) -> Optional[User]:
@@ -45,8 +50,7 @@ class UserService:
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
         return db_user
 
     async def delete_user(self, user_id: str) -> bool:
@@ -56,5 +60,5 @@ class UserService:
             return False
 
         db_user.is_active = False
-        self.db.commit()
+        await self.db.commit()
         return True
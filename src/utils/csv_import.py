@@ -0,0 +1,108 @@
+"""
+Helpers for streaming CSV imports
+
+Rows are read a chunk at a time in the thread pool, so the whole file is
+never held in memory and reading it never blocks the event loop.
+"""
+
+import csv
+import os
+from typing import AsyncIterator, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from src.schemas.imports import ImportResult, ImportRowError
+
+# Row errors listed in an ImportResult; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class CSVFormatError(ValueError):
+    """The file is not a readable CSV with the expected columns"""
+
+
+class ImportCheckpoint:
+    """
+    Last committed line of an import, kept in a file so a run can resume
+
+    The file is replaced atomically after each committed chunk and removed
+    once the import finishes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.line = 0
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.line = int(checkpoint_file.read().strip() or 0)
+
+    def save(self, line: int) -> None:
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            checkpoint_file.write(str(line))
+        os.replace(temporary_path, self.path)
+        self.line = line
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.line = 0
+
+
+def _read_chunk(reader: csv.DictReader, size: int) -> List[Tuple[int, Dict]]:
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+async def iter_csv_chunks(
+    csv_file: TextIO, chunk_size: int, required_columns: Iterable[str]
+) -> AsyncIterator[List[Tuple[int, Dict]]]:
+    """Yield (line number, row) pairs of a CSV with a header row in chunks"""
+    reader = csv.DictReader(csv_file)
+    try:
+        fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+        missing = set(required_columns) - set(fieldnames or [])
+        if missing:
+            raise CSVFormatError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        while True:
+            chunk = await run_in_threadpool(_read_chunk, reader, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise CSVFormatError(f"Invalid CSV: {e}") from e
+
+
+def clean_row(row: Dict, columns: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Pick columns from a CSV row, turning blank cells into None"""
+    return {column: (row.get(column) or "").strip() or None for column in columns}
+
+
+def present_values(row: Dict, columns: Iterable[str]) -> Dict[str, str]:
+    """Pick the non-blank columns of a CSV row, so schema defaults apply"""
+    return {
+        column: value
+        for column, value in clean_row(row, columns).items()
+        if value is not None
+    }
+
+
+def add_row_error(result: ImportResult, line: int, error: str) -> None:
+    """Count a rejected row and list it while under MAX_REPORTED_ERRORS"""
+    result.failed += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(ImportRowError(line=line, error=error))
+
+
+def validation_message(error: ValidationError) -> str:
+    """One-line summary of a pydantic validation error"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
@@ -0,0 +1,196 @@
+"""
+SQLAlchemy instrumentation for per-request statistics and pool metrics
+
+Every statement executed while serving a request is counted and timed, and
+statements are grouped by shape (the SQL text with literal lists collapsed)
+so that a query repeated in a loop (N+1) is reported once it runs more than
+N_PLUS_ONE_THRESHOLD times in one request.
+
+The same counters are available to tests::
+
+    with assert_max_statements(3):
+        client.get("/api/v1/learning/progress", headers=headers)
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, List, Optional
+
+import structlog
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.config.settings import settings
+from src.utils.metrics import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CHECKOUT_TIMEOUTS_TOTAL,
+    registry,
+)
+
+logger = structlog.get_logger()
+
+DB_N_PLUS_ONE_TOTAL = registry.counter(
+    "db_repeated_statements_total",
+    "Requests in which one statement shape exceeded N_PLUS_ONE_THRESHOLD",
+    ["route"],
+)
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_POSTCOMPILE = re.compile(r"\(\s*__\[POSTCOMPILE_\w+\]\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeated queries compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _POSTCOMPILE.sub("(?)", shape)
+    return _IN_LIST.sub("(?)", shape)
+
+
+class RequestDBStats:
+    """Database statistics collected while serving one request (or test)"""
+
+    __slots__ = (
+        "path",
+        "statements",
+        "duration",
+        "shapes",
+        "repeated_shapes",
+        "recorded",
+        "_lock",
+    )
+
+    def __init__(self, path: Optional[str] = None, record: bool = False):
+        self.path = path
+        self.statements = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self.repeated_shapes: List[str] = []
+        # Full statement list, only kept for tests
+        self.recorded: Optional[List[str]] = [] if record else None
+        self._lock = threading.Lock()
+
+    def add(self, statement: str, duration: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.statements += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            count = self.shapes[shape]
+            if self.recorded is not None:
+                self.recorded.append(statement)
+
+        if count == settings.N_PLUS_ONE_THRESHOLD + 1:
+            self.repeated_shapes.append(shape)
+            logger.warning(
+                "Repeated SQL statement (possible N+1)",
+                path=self.path,
+                statement=shape[:500],
+                threshold=settings.N_PLUS_ONE_THRESHOLD,
+            )
+
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "db_request_stats", default=None
+)
+
+# Collectors that see every statement regardless of context (tests)
+_global_collectors: List[RequestDBStats] = []
+
+
+def begin_request_stats(path: Optional[str] = None) -> Token:
+    """Start collecting statistics for the current request context"""
+    return _request_stats.set(RequestDBStats(path))
+
+
+def end_request_stats(token: Token) -> RequestDBStats:
+    """Stop collecting and return the statistics of the current request"""
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    return _request_stats.get()
+
+
+@contextmanager
+def count_statements() -> Iterator[RequestDBStats]:
+    """
+    Count every statement executed inside the block, in any thread
+
+    Intended for tests: TestClient runs the application in another thread,
+    so this does not rely on the request context.
+    """
+    stats = RequestDBStats(record=True)
+    _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _global_collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_statements(max_statements: int) -> Iterator[RequestDBStats]:
+    """Fail if more than max_statements statements run inside the block"""
+    with count_statements() as stats:
+        yield stats
+
+    if stats.statements > max_statements:
+        executed = "\n".join(
+            f"  {index}. {statement_shape(statement)}"
+            for index, statement in enumerate(stats.recorded, start=1)
+        )
+        raise AssertionError(
+            f"Expected at most {max_statements} SQL statements, "
+            f"{stats.statements} were executed:\n{executed}"
+        )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    # The stats object is shared with the request context even when the
+    # handler runs in the thread pool (contextvars are copied, not reset)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add(statement, duration)
+    for collector in _global_collectors:
+        collector.add(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None:
+        start_times = connection.info.get("query_start_time")
+        if start_times:
+            start_times.pop()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS_TOTAL.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start_time)
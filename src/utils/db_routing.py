@@ -0,0 +1,205 @@
+"""
+Read replica routing
+
+Service methods decorated with ``@read_only`` (list endpoints, statistics,
+reports) may be served by a replica. Everything else, and every statement
+issued by a session that has already written, goes to the primary.
+
+Replicas lag behind the primary, so a user who has just written is pinned
+to the primary for DB_REPLICA_STICKY_SECONDS (read-your-writes). Pins are
+kept where DB_REPLICA_STICKINESS_BACKEND says: "memory" in the worker
+process, enough for a single worker, or "redis", shared by every worker so
+the user's next request is pinned whichever worker serves it.
+
+A request looks its user's pin up once, when the user is known
+(set_current_user), and publishes its own writes before the response is
+sent (publish_writes), so the next request already finds the pin.
+
+Statements run inside primary_reads() go to the primary even from a
+read_only method; the cache fills its misses this way, since an entry read
+from a lagging replica would outlive the lag.
+"""
+
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+
+logger = structlog.get_logger()
+
+_read_only: ContextVar[bool] = ContextVar("db_read_only", default=False)
+_primary_reads: ContextVar[bool] = ContextVar("db_primary_reads", default=False)
+
+
+@dataclass
+class RequestUser:
+    """The user making the current request, as far as routing is concerned"""
+
+    user_id: str
+    # Pinned to the primary for the whole request
+    sticky: bool = False
+    # Committed a write not yet published to the stickiness store
+    wrote: bool = False
+
+
+_current_user: ContextVar[Optional[RequestUser]] = ContextVar(
+    "db_current_user", default=None
+)
+
+
+def read_only(func):
+    """Allow the statements of an async service method to run on a replica"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Run the statements issued inside on the primary, read_only or not"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+async def set_current_user(user_id: Optional[str]) -> None:
+    """Remember who is making the request and whether they recently wrote"""
+    if user_id is None:
+        _current_user.set(None)
+        return
+    sticky = await get_replica_stickiness().is_sticky(user_id)
+    _current_user.set(RequestUser(user_id, sticky=sticky))
+
+
+async def publish_writes() -> None:
+    """Pin the current user to the primary if the request committed a write"""
+    user = _current_user.get()
+    if user is not None and user.wrote:
+        user.wrote = False
+        try:
+            await get_replica_stickiness().mark(user.user_id)
+        except Exception:
+            # The write itself succeeded; the user may read a lagging replica
+            logger.exception("Replica pin not published", user_id=user.user_id)
+
+
+class ReplicaStickiness:
+    """Users that recently wrote and must read from the primary, per worker"""
+
+    def __init__(self, window_seconds: Optional[float] = None):
+        self.window_seconds = (
+            settings.DB_REPLICA_STICKY_SECONDS
+            if window_seconds is None
+            else window_seconds
+        )
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def mark(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + self.window_seconds
+            # Drop expired entries so the map only holds recent writers
+            if len(self._until) > 1000:
+                self._until = {
+                    key: until for key, until in self._until.items() if until > now
+                }
+
+    async def is_sticky(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+class RedisReplicaStickiness(ReplicaStickiness):
+    """Pins shared by every worker, as keys expiring with the window"""
+
+    def __init__(self, redis_client, window_seconds: Optional[float] = None):
+        super().__init__(window_seconds)
+        self.redis = redis_client
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"replica-sticky:{user_id}"
+
+    async def mark(self, user_id: str) -> None:
+        await self.redis.set(
+            self._key(user_id), 1, px=max(int(self.window_seconds * 1000), 1)
+        )
+
+    async def is_sticky(self, user_id: str) -> bool:
+        return bool(await self.redis.exists(self._key(user_id)))
+
+
+@lru_cache()
+def get_replica_stickiness() -> ReplicaStickiness:
+    """Return the process-wide stickiness store configured in settings"""
+    if settings.DB_REPLICA_STICKINESS_BACKEND == "redis":
+        from redis import asyncio as aioredis
+
+        return RedisReplicaStickiness(aioredis.from_url(settings.REDIS_URL))
+
+    return ReplicaStickiness()
+
+
+def _pinned() -> bool:
+    user = _current_user.get()
+    return user is not None and user.sticky
+
+
+class RoutingSession(Session):
+    """Session that sends read-only work to a replica engine"""
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        # One replica per session, so a unit of work sees a single snapshot
+        self.replica = random.choice(replicas) if replicas else None
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if getattr(clause, "is_dml", False):
+            self.wrote = True
+        elif (
+            self.replica is not None
+            and not self.wrote
+            and not self._flushing
+            and _read_only.get()
+            and not _primary_reads.get()
+            and not _pinned()
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session.wrote = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    user = _current_user.get()
+    if session.wrote and user is not None:
+        # Later sessions of this request read from the primary too, and the
+        # pin is published for the next requests by publish_writes()
+        user.sticky = user.wrote = True
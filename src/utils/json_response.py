@@ -0,0 +1,36 @@
+"""
+Fast JSON responses
+
+FastAPI validates whatever an endpoint returns against the route's
+response_model, then encodes the result with the stdlib json module. For
+output built from our own rows the validation is redundant, so those
+endpoints build their response model once (model_validate from the ORM
+rows) and return json_response(), which dumps it and encodes it with
+orjson. FastAPI passes a returned response through untouched;
+response_model stays on the route for the OpenAPI schema.
+"""
+
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> ORJSONResponse:
+    """
+    Encode content, a response model or plain data, as a JSON response
+
+    Headers and status code set on the endpoint's injected response (the
+    ETag of a conditional GET, say) are carried over, as FastAPI would do
+    for a returned model.
+    """
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+
+    encoded = ORJSONResponse(content)
+    if response is not None:
+        if response.status_code:
+            encoded.status_code = response.status_code
+        encoded.headers.raw.extend(response.headers.raw)
+    return encoded
@@ -0,0 +1,140 @@
+"""
+Event loop lag monitor
+
+A background task sleeps for a fixed interval and measures how late it
+wakes up. The delay is time during which some other code held the event
+loop without yielding, which never shows up in per-request timings of the
+requests that were merely waiting. Every measurement is recorded in the
+``event_loop_lag_seconds`` histogram and stalls longer than
+LOOP_BLOCK_THRESHOLD_MS are counted and logged.
+
+With stack capture enabled (the default in DEBUG) a watchdog thread samples
+the stack of the event loop thread while it is blocked, so the warning
+names the function that did the blocking work.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+import structlog
+
+from src.config.settings import settings
+from src.utils.metrics import registry
+
+EVENT_LOOP_LAG_SECONDS = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the event loop monitor",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+EVENT_LOOP_BLOCKED_TOTAL = registry.counter(
+    "event_loop_blocked_total",
+    "Event loop stalls longer than LOOP_BLOCK_THRESHOLD_MS",
+)
+
+# Innermost frames kept from the stack of a blocked loop
+STACK_DEPTH = 30
+
+
+class LoopLagMonitor:
+    """Measure event loop scheduling delay and report blocking calls"""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold_ms: Optional[float] = None,
+        capture_stacks: Optional[bool] = None,
+        logger=None,
+    ):
+        self.interval = (
+            settings.LOOP_MONITOR_INTERVAL_SECONDS if interval is None else interval
+        )
+        self.threshold_ms = (
+            settings.LOOP_BLOCK_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        )
+        self.capture_stacks = (
+            settings.DEBUG if capture_stacks is None else capture_stacks
+        )
+        self.logger = logger or structlog.get_logger()
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._expected_wakeup = 0.0
+        self._blocked_stack: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop"""
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wakeup = time.perf_counter() + self.interval
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        if self.capture_stacks:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the monitor task and the watchdog thread"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._watchdog is not None:
+            self._stopped.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            self._expected_wakeup = start + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(max(time.perf_counter() - self._expected_wakeup, 0.0))
+
+    def _record(self, lag: float) -> None:
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+        stack, self._blocked_stack = self._blocked_stack, None
+        if lag * 1000 < self.threshold_ms:
+            return
+
+        EVENT_LOOP_BLOCKED_TOTAL.inc()
+        self.logger.warning(
+            "Event loop blocked",
+            lag_ms=round(lag * 1000, 1),
+            threshold_ms=self.threshold_ms,
+            stack=stack,
+        )
+
+    def _watch(self) -> None:
+        # Check a few times per threshold so the stack is taken while the
+        # loop is still blocked, not after it has moved on.
+        check_interval = max(self.threshold_ms / 1000 / 4, 0.001)
+        while not self._stopped.wait(check_interval):
+            overdue = time.perf_counter() - self._expected_wakeup
+            if overdue * 1000 < self.threshold_ms or self._blocked_stack is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._blocked_stack = "".join(
+                    traceback.format_stack(frame, limit=STACK_DEPTH)
+                )
@@ -0,0 +1,483 @@
+"""
+In-process metrics with Prometheus text exposition
+
+Metrics are pre-aggregated in memory (counters, gauges and fixed-bucket
+histograms), so recording a sample is a dict lookup plus a few additions.
+
+With several workers, set METRICS_MULTIPROC_DIR: every worker periodically
+writes a snapshot of its metrics to ``<dir>/metrics_<pid>.json`` and the
+worker serving /metrics merges all snapshots. Counters and histograms of
+exited workers are kept, their gauges are dropped.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Metric:
+    """Base class for metrics"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Return the child metric for the given label values"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[LabelValues, object]:
+        """Return {label values: value} for every child"""
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing counter
+
+    ``callback`` may return {label values: value} to read values that are
+    tracked elsewhere at collection time.
+    """
+
+    type_name = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        values = {labels: child.value for labels, child in list(self._children.items())}
+        if self.callback is not None:
+            values.update(self.callback())
+        return values
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus the +Inf bucket
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Histogram with fixed buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def snapshot(self) -> Dict[LabelValues, List[float]]:
+        # [bucket counts..., +Inf count, sum]
+        return {
+            labels: [*child.counts, child.sum]
+            for labels, child in list(self._children.items())
+        }
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._derived: List[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=(), callback=None):
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name: str, documentation: str, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def add_derived(self, derive: Callable[[dict], None]) -> None:
+        """Register a function that adds metrics computed from merged values"""
+        self._derived.append(derive)
+
+    # Snapshots
+    def snapshot(self) -> dict:
+        """Serializable snapshot of every metric"""
+        data = {}
+        for metric in list(self._metrics.values()):
+            data[metric.name] = {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": [
+                    [list(labels), value] for labels, value in metric.snapshot().items()
+                ],
+            }
+        return data
+
+    def write_snapshot(self, directory: str) -> None:
+        """Atomically write this worker's snapshot to the multiprocess dir"""
+        path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def start_snapshot_writer(self, directory: str, interval: float) -> None:
+        """Periodically write snapshots from a daemon thread"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.write_snapshot(directory)
+
+        self._writer = threading.Thread(
+            target=run, name="metrics-snapshot-writer", daemon=True
+        )
+        self._writer.start()
+
+    def stop_snapshot_writer(self, directory: Optional[str] = None) -> None:
+        self._stop.set()
+        if directory:
+            self.write_snapshot(directory)
+
+    # Rendering
+    def render(self, multiproc_dir: Optional[str] = None) -> str:
+        """Render metrics in the Prometheus text exposition format"""
+        snapshots = [self.snapshot()]
+        if multiproc_dir:
+            snapshots.extend(_load_worker_snapshots(multiproc_dir))
+        merged = _merge(snapshots)
+        for derive in self._derived:
+            derive(merged)
+        return _render(merged)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_worker_snapshots(directory: str) -> Iterable[dict]:
+    own_pid = os.getpid()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    snapshots = []
+    for file_name in names:
+        if not (file_name.startswith("metrics_") and file_name.endswith(".json")):
+            continue
+        pid = int(file_name[len("metrics_") : -len(".json")])
+        if pid == own_pid:
+            continue
+        try:
+            with open(os.path.join(directory, file_name)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _pid_alive(pid):
+            snapshot = {
+                name: metric
+                for name, metric in snapshot.items()
+                if metric["type"] != "gauge"
+            }
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _merge(snapshots: List[dict]) -> dict:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "values": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    current = target["values"].get(key)
+                    target["values"][key] = (
+                        list(value)
+                        if current is None
+                        else [a + b for a, b in zip(current, value)]
+                    )
+                else:
+                    target["values"][key] = target["values"].get(key, 0.0) + value
+    return merged
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    rendered = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _render(metrics: dict) -> str:
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in sorted(metrics[name]["values"].items()):
+            if metric["type"] != "histogram":
+                lines.append(
+                    f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+                )
+                continue
+
+            *counts, total = value
+            cumulative = 0
+            for upper_bound, count in zip([*metric["buckets"], float("inf")], counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    labelnames, labels, [("le", _format_value(upper_bound))]
+                )
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            label_str = _format_labels(labelnames, labels)
+            lines.append(f"{name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{name}_count{label_str} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP metrics
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served"
+)
+
+# Database metrics
+DB_POOL_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS_TOTAL = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT seconds",
+)
+DB_STATEMENTS_PER_REQUEST = registry.histogram(
+    "db_statements_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST_SECONDS = registry.histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements per HTTP request",
+    ["route"],
+)
+
+# Cache metrics
+CACHE_REQUESTS_TOTAL = registry.counter(
+    "cache_requests_total", "Cache lookups by result", ["cache", "result"]
+)
+CACHE_EVICTIONS_TOTAL = registry.counter(
+    "cache_evictions_total",
+    "Cache entries dropped by reason (capacity, expired, invalidated)",
+    ["cache", "reason"],
+)
+CACHE_REFRESHES_TOTAL = registry.counter(
+    "cache_refreshes_total",
+    "Cached results computed by reason (miss, stale, early)",
+    ["cache", "reason"],
+)
+INVALIDATION_MESSAGES_TOTAL = registry.counter(
+    "invalidation_messages_total",
+    "Invalidation bus messages by direction (published, received)",
+    ["direction"],
+)
+
+
+def _cache_hit_ratio(metrics: dict) -> None:
+    """Derive cache_hit_ratio from the merged cache_requests_total"""
+    lookups = metrics.get(CACHE_REQUESTS_TOTAL.name)
+    if lookups is None:
+        return
+
+    totals: Dict[LabelValues, List[float]] = {}
+    for (cache, result), value in lookups["values"].items():
+        hits_and_lookups = totals.setdefault((cache,), [0.0, 0.0])
+        hits_and_lookups[1] += value
+        if result == "hit":
+            hits_and_lookups[0] += value
+
+    metrics["cache_hit_ratio"] = {
+        "type": "gauge",
+        "help": "Cache hits divided by lookups",
+        "labelnames": ["cache"],
+        "buckets": [],
+        "values": {
+            labels: hits / total for labels, (hits, total) in totals.items() if total
+        },
+    }
+
+
+registry.add_derived(_cache_hit_ratio)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Record a cache hit or miss for the given cache name"""
+    CACHE_REQUESTS_TOTAL.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_cache_eviction(cache: str, reason: str, count: int = 1) -> None:
+    """Record entries of the given cache name dropped before being read again"""
+    CACHE_EVICTIONS_TOTAL.labels(cache, reason).inc(count)
+
+
+def record_cache_refresh(cache: str, reason: str) -> None:
+    """Record a cached result computed for the given cache name"""
+    CACHE_REFRESHES_TOTAL.labels(cache, reason).inc()
+
+
+def record_invalidation_message(direction: str) -> None:
+    """Record an invalidation bus message published or received"""
+    INVALIDATION_MESSAGES_TOTAL.labels(direction).inc()
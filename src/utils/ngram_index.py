@@ -0,0 +1,234 @@
+"""
+In-memory character n-gram inverted index
+
+Text is NFKC-normalized, lower-cased and split into overlapping character
+bigrams within each whitespace-separated word, which suits Japanese text
+that has no spaces between words. Every field keeps its own postings, one
+per bigram, in whichever form is smaller:
+
+- a compact array of document numbers, for rare bigrams
+- an int used as a bitmask over document numbers, for bigrams found in
+  more than one document in 32
+
+A search returns the documents containing every bigram of the query,
+ranked by how many of them each field contains weighted by the field's
+integer weight. Matching and scoring are done on bitmasks, so their cost
+grows with the size of the catalog in machine words rather than with the
+number of matches: the weighted counts are added up in bit slices (one
+bitmask per bit of the score) and the best documents are picked from the
+slices, highest bit first.
+
+Replacing or removing a document only clears its bit in the mask of live
+documents; the postings are compacted once dead numbers exceed a quarter
+of the total.
+"""
+
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+Posting = Union[array, int]
+
+
+def ngrams(text: str, n: int = 2) -> Set[str]:
+    """Distinct n-grams of the words in text, after normalization"""
+    grams = set()
+    for word in unicodedata.normalize("NFKC", text).lower().split():
+        grams.update(word[i : i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def _members(mask: int, limit: Optional[int] = None) -> List[int]:
+    """Numbers of the bits set in mask, lowest first, up to limit of them"""
+    bits = f"{mask:b}"[::-1]
+    members: List[int] = []
+    position = bits.find("1")
+    while position != -1 and len(members) != limit:
+        members.append(position)
+        position = bits.find("1", position + 1)
+    return members
+
+
+def _add_slices(slices: List[int], mask: int, value: int) -> None:
+    """Add value to the bit-sliced counters of the documents in mask"""
+    bit = 0
+    while value:
+        if value & 1:
+            carry = mask
+            position = bit
+            while carry:
+                while position >= len(slices):
+                    slices.append(0)
+                slices[position], carry = (
+                    slices[position] ^ carry,
+                    slices[position] & carry,
+                )
+                position += 1
+        value >>= 1
+        bit += 1
+
+
+class NgramIndex:
+    """Weighted n-gram index over the text fields of documents"""
+
+    def __init__(self, weights: Mapping[str, int], n: int = 2):
+        self.weights = dict(weights)
+        self.n = n
+        self._postings: Dict[str, Dict[str, Posting]] = {
+            field: {} for field in self.weights
+        }
+        self._doc_ids: List[Optional[str]] = []  # None for dead numbers
+        self._numbers: Dict[str, int] = {}
+        self._live = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._numbers
+
+    def add(self, doc_id: str, fields: Mapping[str, Optional[str]]) -> None:
+        """Index a document, replacing any earlier version of it"""
+        self.remove(doc_id)
+        number = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._numbers[doc_id] = number
+        self._live |= 1 << number
+
+        for field, text in fields.items():
+            if not text:
+                continue
+            postings = self._postings[field]
+            for gram in ngrams(text, self.n):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = array("i", (number,))
+                elif isinstance(posting, int):
+                    postings[gram] = posting | (1 << number)
+                else:
+                    posting.append(number)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document; unknown ids are ignored"""
+        number = self._numbers.pop(doc_id, None)
+        if number is None:
+            return
+
+        self._doc_ids[number] = None
+        self._live &= ~(1 << number)
+        self._dead += 1
+        if self._dead * 4 > len(self._doc_ids):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Renumber the live documents, drop dead numbers from postings and
+        store each posting in its smaller form
+        """
+        renumbered = {}
+        doc_ids = []
+        for number, doc_id in enumerate(self._doc_ids):
+            if doc_id is not None:
+                renumbered[number] = len(doc_ids)
+                doc_ids.append(doc_id)
+
+        # A bitmask takes len(doc_ids) / 8 bytes, an array 4 bytes a number
+        dense = len(doc_ids) // 32
+        for field, postings in self._postings.items():
+            compacted: Dict[str, Posting] = {}
+            for gram, posting in postings.items():
+                numbers = _members(posting) if isinstance(posting, int) else posting
+                if self._dead:
+                    numbers = [renumbered[n] for n in numbers if n in renumbered]
+                if len(numbers) > dense:
+                    compacted[gram] = self._mask(numbers, len(doc_ids))
+                elif numbers:
+                    compacted[gram] = array("i", numbers)
+            self._postings[field] = compacted
+
+        self._doc_ids = doc_ids
+        self._numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+        self._live = (1 << len(doc_ids)) - 1
+        self._dead = 0
+
+    @staticmethod
+    def _mask(numbers: Iterable[int], size: int) -> int:
+        bits = bytearray((size + 7) // 8)
+        for number in numbers:
+            bits[number >> 3] |= 1 << (number & 7)
+        return int.from_bytes(bits, "little")
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Best matching (document id, score) pairs, highest score first"""
+        grams = ngrams(query, self.n)
+        if not grams or limit < 1:
+            return []
+
+        size = len(self._doc_ids)
+        matching = self._live
+        hits: List[Tuple[int, int]] = []
+        for gram in grams:
+            gram_mask = 0
+            for field, weight in self.weights.items():
+                posting = self._postings[field].get(gram)
+                if posting is None:
+                    continue
+                if not isinstance(posting, int):
+                    posting = self._mask(posting, size)
+                hits.append((weight, posting))
+                gram_mask |= posting
+            matching &= gram_mask
+            if not matching:
+                return []
+
+        slices: List[int] = []
+        for weight, mask in hits:
+            _add_slices(slices, mask & matching, weight)
+
+        # Highest slice first: keep every document with the bit set while
+        # they fit in the limit, otherwise narrow the candidates down to them
+        selected = 0
+        candidates = matching
+        for bit_slice in reversed(slices):
+            with_bit = candidates & bit_slice
+            count = (selected | with_bit).bit_count()
+            if count > limit:
+                candidates = with_bit
+            else:
+                selected |= with_bit
+                candidates &= ~bit_slice
+                if count == limit:
+                    break
+
+        # Candidates left over all have the same score; ties go to the
+        # document indexed first
+        numbers = _members(selected)
+        numbers.extend(_members(candidates, limit - len(numbers)))
+
+        results = [
+            (
+                number,
+                sum(
+                    ((bit_slice >> number) & 1) << bit
+                    for bit, bit_slice in enumerate(slices)
+                ),
+            )
+            for number in numbers
+        ]
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return [(self._doc_ids[number], score) for number, score in results]
+
+    @classmethod
+    def build(
+        cls,
+        weights: Mapping[str, int],
+        documents: Iterable[Tuple[str, Mapping[str, Optional[str]]]],
+        n: int = 2,
+    ) -> "NgramIndex":
+        """Index (document id, fields) pairs"""
+        index = cls(weights, n)
+        for doc_id, fields in documents:
+            index.add(doc_id, fields)
+        index.compact()
+        return index
@@ -0,0 +1,48 @@
+"""
+Sparse fieldsets
+
+List endpoints take a fields= query parameter naming the fields of each
+item to return, e.g. fields=content_id,title,is_published. The names are
+checked against the endpoint's allow-list, the fields of its response
+model that come straight from table columns (or are cheap to derive from
+them). The service then reads only those columns (load_only or a column
+select) and the items are encoded as plain dicts of those fields, so the
+database transfer, the ORM hydration and the payload shrink together.
+
+Without fields= the endpoints return every field as before.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+FIELDS_DESCRIPTION = "Comma-separated fields of each item to return (all by default)"
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Names listed in a fields= parameter, in the order given without
+    duplicates, or None when the parameter is absent
+
+    Raises a 400 naming the unknown fields and the allowed ones.
+    """
+    if fields is None:
+        return None
+
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",")))
+    requested = [name for name in requested if name]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Unknown fields: {', '.join(unknown) or '(none given)'}; "
+                f"allowed: {', '.join(allowed)}"
+            ),
+        )
+    return requested
+
+
+def project(item: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    """The named attributes of an ORM instance or row as a dict"""
+    return {field: getattr(item, field) for field in fields}
@@ -2,61 +2,81 @@
 Pytest configuration and fixtures
 """
 
+import asyncio
+import os
+from functools import partial
+
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from src.main import app
-from src.config.database import get_db, Base
+# Tests use their own engine, so the application pool is not warmed up
+os.environ.setdefault("DB_POOL_WARMUP_CONNECTIONS", "0")
+
+from src.main import app  # noqa: E402
+from src.config.database import get_db, get_session_factory, Base  # noqa: E402
+from src.services.cache import get_cache  # noqa: E402
+from src.services.category_tree import category_tree  # noqa: E402
 
 
 # Create test database engine
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = async_sessionmaker(
+    class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
+async def _create_tables():
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
 
-def override_get_db():
-    """Override database dependency for testing"""
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+
+async def _drop_tables():
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
 
 
 @pytest.fixture(scope="session")
 def db_engine():
     """Create test database engine"""
-    Base.metadata.create_all(bind=engine)
+    asyncio.run(_create_tables())
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    asyncio.run(_drop_tables())
 
 
-@pytest.fixture(scope="function")
-def db_session(db_engine):
+@pytest_asyncio.fixture(scope="function")
+async def db_session(db_engine):
     """Create test database session"""
-    connection = db_engine.connect()
-    transaction = connection.begin()
+    connection = await db_engine.connect()
+    transaction = await connection.begin()
     session = TestingSessionLocal(bind=connection)
 
     yield session
 
-    session.close()
-    transaction.rollback()
-    connection.close()
+    await session.close()
+    await transaction.rollback()
+    await connection.close()
+    # Cached from data that has just been rolled back
+    category_tree.invalidate()
+    await get_cache().clear()
 
 
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create test client"""
     app.dependency_overrides[get_db] = lambda: db_session
+    # Background tasks get sessions on the test transaction's connection
+    app.dependency_overrides[get_session_factory] = lambda: partial(
+        TestingSessionLocal, bind=db_session.bind
+    )
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
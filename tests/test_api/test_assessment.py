@@ -4,6 +4,8 @@ Tests for assessment and quiz API endpoints
 
 from fastapi.testclient import TestClient
 
+from src.utils.db_instrumentation import assert_max_statements
+
 
 class TestAssessmentAPI:
     """Test assessment and quiz API endpoints"""
@@ -73,6 +75,187 @@ class TestAssessmentAPI:
         assert len(data["questions"]) == 2
         assert data["max_attempts"] == 3
 
+    def test_create_quiz_statement_count(self, client: TestClient, admin_token: str):
+        """Test that creating a quiz inserts each table once and reads nothing back"""
+        content_response = client.post(
+            "/api/v1/contents/",
+            json={"title": "Quiz Content", "content_type": "quiz"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        content_id = content_response.json()["content_id"]
+
+        quiz_data = {
+            "title": "Large Quiz",
+            "content_id": content_id,
+            "questions": [
+                {
+                    "question_text": f"Question {index}",
+                    "question_type": "multiple_choice",
+                    "order_index": index,
+                    "choices": [
+                        {"choice_text": "A", "is_correct": True, "order_index": 0},
+                        {"choice_text": "B", "is_correct": False, "order_index": 1},
+                    ],
+                }
+                for index in range(10)
+            ],
+        }
+
+        # User lookup plus one INSERT each for quizzes, questions and choices
+        with assert_max_statements(4):
+            response = client.post(
+                "/api/v1/assessment/quizzes",
+                json=quiz_data,
+                headers={"Authorization": f"Bearer {admin_token}"},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["questions"]) == 10
+        choices = data["questions"][0]["choices"]
+        assert [choice["choice_text"] for choice in choices] == ["A", "B"]
+        assert data["created_at"] is not None
+
+    def test_upsert_questions(self, client: TestClient, admin_token: str):
+        """Test updating and adding many questions in one request"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        content_response = client.post(
+            "/api/v1/contents/",
+            json={"title": "Quiz Content", "content_type": "quiz"},
+            headers=headers,
+        )
+        quiz_data = {
+            "title": "Editable Quiz",
+            "content_id": content_response.json()["content_id"],
+            "questions": [
+                {
+                    "question_text": f"Question {index}",
+                    "question_type": "true_false",
+                    "order_index": index,
+                    "choices": [
+                        {"choice_text": "True", "is_correct": True, "order_index": 0},
+                        {"choice_text": "False", "is_correct": False, "order_index": 1},
+                    ],
+                }
+                for index in range(3)
+            ],
+        }
+        quiz = client.post(
+            "/api/v1/assessment/quizzes", json=quiz_data, headers=headers
+        ).json()
+        question_ids = [question["question_id"] for question in quiz["questions"]]
+
+        upsert_data = {
+            "questions": [
+                {
+                    "question_id": question_id,
+                    "question_text": f"Edited {index}",
+                    "question_type": "multiple_choice",
+                    "points": 2.0,
+                    "order_index": index,
+                    "choices": [
+                        {"choice_text": "A", "is_correct": False, "order_index": 0},
+                        {"choice_text": "B", "is_correct": True, "order_index": 1},
+                        {"choice_text": "C", "is_correct": False, "order_index": 2},
+                    ],
+                }
+                for index, question_id in enumerate(question_ids)
+            ] + [
+                {
+                    "question_text": "New question",
+                    "question_type": "short_answer",
+                    "order_index": 3,
+                },
+            ],
+        }
+
+        # Quiz graph load, then one batched statement per table and operation
+        with assert_max_statements(9):
+            response = client.put(
+                f"/api/v1/assessment/quizzes/{quiz['quiz_id']}/questions",
+                json=upsert_data,
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [question["question_text"] for question in data["questions"]] == [
+            "Edited 0", "Edited 1", "Edited 2", "New question",
+        ]
+        assert data["questions"][0]["question_id"] == question_ids[0]
+
+        stored = client.get(
+            f"/api/v1/assessment/quizzes/{quiz['quiz_id']}", headers=headers
+        ).json()
+        assert len(stored["questions"]) == 4
+        for question in stored["questions"]:
+            if question["question_id"] in question_ids:
+                assert question["points"] == 2.0
+                choice_texts = sorted(
+                    choice["choice_text"] for choice in question["choices"]
+                )
+                assert choice_texts == ["A", "B", "C"]
+
+    def test_upsert_questions_invalid_ids(
+        self, client: TestClient, admin_token: str
+    ):
+        """Test that question ids from outside the quiz or repeated are rejected"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        content_response = client.post(
+            "/api/v1/contents/",
+            json={"title": "Quiz Content", "content_type": "quiz"},
+            headers=headers,
+        )
+        quiz_data = {
+            "title": "Small Quiz",
+            "content_id": content_response.json()["content_id"],
+            "questions": [
+                {
+                    "question_text": "Question",
+                    "question_type": "short_answer",
+                    "order_index": 0,
+                },
+            ],
+        }
+        quiz = client.post(
+            "/api/v1/assessment/quizzes", json=quiz_data, headers=headers
+        ).json()
+
+        response = client.put(
+            f"/api/v1/assessment/quizzes/{quiz['quiz_id']}/questions",
+            json={
+                "questions": [
+                    {
+                        "question_id": "missing-question",
+                        "question_text": "Edited",
+                        "question_type": "short_answer",
+                        "order_index": 0,
+                    },
+                ],
+            },
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+        assert "missing-question" in response.json()["detail"]
+
+        question_id = quiz["questions"][0]["question_id"]
+        edit = {
+            "question_id": question_id,
+            "question_text": "Edited",
+            "question_type": "multiple_choice",
+            "order_index": 0,
+            "choices": [{"choice_text": "A", "order_index": 0}],
+        }
+        response = client.put(
+            f"/api/v1/assessment/quizzes/{quiz['quiz_id']}/questions",
+            json={"questions": [edit, edit]},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+        assert question_id in response.json()["detail"]
+
     def test_get_quizzes(self, client: TestClient, user_token: str):
         """Test getting quizzes list"""
         response = client.get(
@@ -196,6 +379,93 @@ class TestAssessmentAPI:
         assert data["attempt_number"] == 1
         assert data["status"] == "in_progress"
 
+    def test_quiz_responses(
+        self, client: TestClient, user_token: str, admin_token: str
+    ):
+        """Test quiz responses built from the rows and encoded directly"""
+        admin = {"Authorization": f"Bearer {admin_token}"}
+        user = {"Authorization": f"Bearer {user_token}"}
+        content_response = client.post(
+            "/api/v1/contents/",
+            json={"title": "Response Quiz Content", "content_type": "quiz"},
+            headers=admin,
+        )
+        content_id = content_response.json()["content_id"]
+
+        quiz_data = {
+            "title": "Response Quiz",
+            "content_id": content_id,
+            "questions": [
+                {
+                    "question_text": "Sample question",
+                    "question_type": "multiple_choice",
+                    "order_index": 0,
+                    "explanation": "Option A is right",
+                    "choices": [
+                        {
+                            "choice_text": "Option A",
+                            "is_correct": True,
+                            "order_index": 0,
+                        },
+                        {
+                            "choice_text": "Option B",
+                            "is_correct": False,
+                            "order_index": 1,
+                        },
+                    ],
+                }
+            ],
+        }
+        quiz = client.post(
+            "/api/v1/assessment/quizzes", json=quiz_data, headers=admin
+        ).json()
+        quiz_id = quiz["quiz_id"]
+        question = quiz["questions"][0]
+        assert question["explanation"] == "Option A is right"
+        assert [choice["is_correct"] for choice in question["choices"]] == [True, False]
+
+        # Answers are hidden when the quiz is read
+        response = client.get(f"/api/v1/assessment/quizzes/{quiz_id}", headers=user)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"]
+        question = response.json()["questions"][0]
+        assert question["question_type"] == "multiple_choice"
+        assert question["explanation"] is None
+        hidden = [choice["is_correct"] for choice in question["choices"]]
+        assert hidden == [False, False]
+
+        response = client.put(
+            f"/api/v1/assessment/quizzes/{quiz_id}",
+            json={"title": "Renamed Quiz"},
+            headers=admin,
+        )
+        assert response.json()["title"] == "Renamed Quiz"
+
+        response = client.get(
+            "/api/v1/assessment/quizzes",
+            params={"content_id": content_id},
+            headers=user,
+        )
+        data = response.json()
+        assert data["total"] == 1
+        assert data["quizzes"][0]["title"] == "Renamed Quiz"
+
+        # Only the fields asked for
+        response = client.get(
+            "/api/v1/assessment/quizzes",
+            params={"content_id": content_id, "fields": "quiz_id,title,is_published"},
+            headers=user,
+        )
+        assert response.json()["quizzes"] == [
+            {"quiz_id": quiz_id, "title": "Renamed Quiz", "is_published": False}
+        ]
+
+        response = client.get(
+            "/api/v1/assessment/quizzes", params={"fields": "questions"}, headers=user
+        )
+        assert response.status_code == 400
+
     def test_submit_quiz_attempt(self, client: TestClient, user_token: str, admin_token: str):
         """Test submitting a quiz attempt"""
         # Create and publish a quiz first
@@ -276,6 +546,92 @@ class TestAssessmentAPI:
         assert data["score"] == 100.0  # Should be 100% for correct answer
         assert data["is_passed"] is True
 
+    def test_delete_quiz(self, client: TestClient, user_token: str, admin_token: str):
+        """Test that a deleted quiz is hidden at once and its data purged"""
+        content_response = client.post(
+            "/api/v1/contents/",
+            json={"title": "Delete Quiz Content", "content_type": "quiz"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        quiz_data = {
+            "title": "Delete Quiz",
+            "content_id": content_response.json()["content_id"],
+            "questions": [
+                {
+                    "question_text": "Sample question",
+                    "question_type": "true_false",
+                    "order_index": 0,
+                    "choices": [
+                        {"choice_text": "True", "is_correct": True, "order_index": 0},
+                        {"choice_text": "False", "is_correct": False, "order_index": 1},
+                    ],
+                }
+            ],
+        }
+        quiz_response = client.post(
+            "/api/v1/assessment/quizzes",
+            json=quiz_data,
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        quiz_id = quiz_response.json()["quiz_id"]
+        client.post(
+            f"/api/v1/assessment/quizzes/{quiz_id}/publish",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        attempt_response = client.post(
+            f"/api/v1/assessment/quizzes/{quiz_id}/attempts",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert attempt_response.status_code == 200
+
+        response = client.delete(
+            f"/api/v1/assessment/quizzes/{quiz_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert response.status_code == 200
+        response = client.get(
+            f"/api/v1/assessment/quizzes/{quiz_id}",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.status_code == 404
+        response = client.get(
+            "/api/v1/assessment/attempts",
+            params={"quiz_id": quiz_id},
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert response.json()["total"] == 0
+        response = client.delete(
+            f"/api/v1/assessment/quizzes/{quiz_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 404
+
+    def test_delete_assessment(self, client: TestClient, admin_token: str):
+        """Test deleting an assessment"""
+        assessment_response = client.post(
+            "/api/v1/assessment/assessments",
+            json={
+                "title": "Delete Me",
+                "assessment_type": "exam",
+                "total_points": 10.0,
+            },
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assessment_id = assessment_response.json()["assessment_id"]
+
+        response = client.delete(
+            f"/api/v1/assessment/assessments/{assessment_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert response.status_code == 200
+        response = client.get(
+            f"/api/v1/assessment/assessments/{assessment_id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 404
+
     def test_create_assessment(self, client: TestClient, admin_token: str):
         """Test creating an assessment"""
         assessment_data = {
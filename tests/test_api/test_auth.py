@@ -164,3 +164,66 @@ class TestAuthAPI:
 
         assert response.status_code == 200
         assert "Successfully logged out" in response.json()["message"]
+
+    def test_refresh_rotates_token(self, client: TestClient):
+        """Test refresh token rotation and reuse detection"""
+        user_data = {
+            "email": "rotate@example.com",
+            "password": "testpassword123",
+            "display_name": "Rotate User",
+        }
+        client.post("/api/v1/auth/register", json=user_data)
+
+        login_response = client.post(
+            "/api/v1/auth/login",
+            json={"email": "rotate@example.com", "password": "testpassword123"},
+        )
+        first_refresh = login_response.json()["refresh_token"]
+
+        # Refresh returns a new refresh token
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": first_refresh}
+        )
+        assert response.status_code == 200
+        second_refresh = response.json()["refresh_token"]
+        assert second_refresh != first_refresh
+
+        # Reusing the rotated token is rejected and revokes the session
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": first_refresh}
+        )
+        assert response.status_code == 401
+
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": second_refresh}
+        )
+        assert response.status_code == 401
+
+    def test_multiple_sessions(self, client: TestClient):
+        """Test that logging out one session keeps the others"""
+        user_data = {
+            "email": "sessions@example.com",
+            "password": "testpassword123",
+            "display_name": "Sessions User",
+        }
+        client.post("/api/v1/auth/register", json=user_data)
+
+        login_data = {"email": "sessions@example.com", "password": "testpassword123"}
+        first = client.post("/api/v1/auth/login", json=login_data).json()
+        second = client.post("/api/v1/auth/login", json=login_data).json()
+
+        response = client.post(
+            "/api/v1/auth/logout",
+            headers={"Authorization": f"Bearer {first['access_token']}"},
+        )
+        assert response.status_code == 200
+
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": first["refresh_token"]}
+        )
+        assert response.status_code == 401
+
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": second["refresh_token"]}
+        )
+        assert response.status_code == 200
@@ -5,6 +5,8 @@ Tests for content API endpoints
 from fastapi.testclient import TestClient
 
 from src.schemas.content import ContentType
+from src.services.content_suggest import suggest_index
+from src.utils.db_instrumentation import assert_max_statements, count_statements
 
 
 class TestContentAPI:
@@ -39,6 +41,72 @@ class TestContentAPI:
         assert "total" in data
         assert "page" in data
 
+    def test_category_subtree(
+        self, client: TestClient, user_token: str, admin_token: str
+    ):
+        """Test breadcrumbs, subtree listing and counts of a category tree"""
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        parent_id = None
+        category_ids = []
+        for name in ("IT", "プログラミング", "Python"):
+            response = client.post(
+                "/api/v1/contents/categories",
+                json={"name": name, "parent_id": parent_id},
+                headers=admin_headers,
+            )
+            parent_id = response.json()["category_id"]
+            category_ids.append(parent_id)
+        for category_id in category_ids[1:]:
+            response = client.post(
+                "/api/v1/contents/",
+                json={
+                    "title": category_id,
+                    "content_type": ContentType.VIDEO.value,
+                    "category_id": category_id,
+                },
+                headers=admin_headers,
+            )
+            client.post(
+                f"/api/v1/contents/{response.json()['content_id']}/publish",
+                headers=admin_headers,
+            )
+
+        headers = {"Authorization": f"Bearer {user_token}"}
+        response = client.get(
+            f"/api/v1/contents/categories/{category_ids[2]}/breadcrumbs",
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert [crumb["name"] for crumb in response.json()] == [
+            "IT",
+            "プログラミング",
+            "Python",
+        ]
+
+        response = client.get(
+            "/api/v1/contents/",
+            params={"category_id": category_ids[0], "include_descendants": True},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+        response = client.get(
+            "/api/v1/contents/categories/unknown/breadcrumbs", headers=headers
+        )
+        assert response.status_code == 404
+
+        # Published content counts for the catalog navigation
+        response = client.get("/api/v1/contents/categories", headers=headers)
+        counts = {
+            category["name"]: (
+                category["content_count"],
+                category["total_content_count"],
+            )
+            for category in response.json()["categories"]
+        }
+        assert counts == {"IT": (0, 2), "プログラミング": (1, 2), "Python": (1, 1)}
+
     def test_create_content(self, client: TestClient, admin_token: str):
         """Test content creation"""
         content_data = {
@@ -60,6 +128,112 @@ class TestContentAPI:
         assert data["content_type"] == content_data["content_type"]
         assert "content_id" in data
 
+    def test_update_content_statement_count(self, client: TestClient, admin_token: str):
+        """Test that an update returns the written values without a refresh"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        with assert_max_statements(2):
+            create_response = client.post(
+                "/api/v1/contents/",
+                json={"title": "Draft", "content_type": ContentType.DOCUMENT.value},
+                headers=headers,
+            )
+        content = create_response.json()
+
+        # User lookup, content lookup and the UPDATE
+        with assert_max_statements(3):
+            response = client.put(
+                f"/api/v1/contents/{content['content_id']}",
+                json={"title": "Final"},
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "Final"
+        assert data["updated_at"] >= content["updated_at"]
+
+    def test_conditional_get(self, client: TestClient, admin_token: str):
+        """Test that repeat views get a 304 until the content changes"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        content_id = client.post(
+            "/api/v1/contents/",
+            json={"title": "Draft", "content_type": ContentType.DOCUMENT.value},
+            headers=headers,
+        ).json()["content_id"]
+        url = f"/api/v1/contents/{content_id}"
+
+        response = client.get(url, headers=headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        client.put(url, json={"title": "Final"}, headers=headers)
+        response = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["title"] == "Final"
+
+        for list_url in ("/api/v1/contents/", "/api/v1/contents/categories"):
+            response = client.get(list_url, headers=headers)
+            repeat = client.get(
+                list_url, headers={**headers, "If-None-Match": response.headers["etag"]}
+            )
+            assert repeat.status_code == 304
+        assert response.headers["cache-control"] == "private, max-age=60"
+
+    def test_get_contents_fields(self, client: TestClient, admin_token: str):
+        """Test that fields= narrows the columns read and the fields returned"""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        client.post(
+            "/api/v1/contents/",
+            json={
+                "title": "Sparse Python",
+                "description": "Long description " * 50,
+                "content_type": ContentType.DOCUMENT.value,
+            },
+            headers=headers,
+        )
+
+        with count_statements() as stats:
+            response = client.get(
+                "/api/v1/contents/",
+                params={"fields": "content_id,title,is_published,title"},
+                headers=headers,
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] >= 1
+        assert all(
+            list(item) == ["content_id", "title", "is_published"]
+            for item in data["contents"]
+        )
+        select = next(
+            statement
+            for statement in stats.recorded
+            if "FROM contents" in statement and "count(" not in statement
+        )
+        assert "contents.title" in select
+        assert "contents.description" not in select
+
+        response = client.get(
+            "/api/v1/contents/",
+            params={"fields": "title,highlight", "search": "Sparse"},
+            headers=headers,
+        )
+        item = response.json()["contents"][0]
+        assert list(item) == ["title", "highlight"]
+        assert "<mark>Sparse</mark>" in item["highlight"]["title"]
+
+        response = client.get(
+            "/api/v1/contents/", params={"fields": "title,password"}, headers=headers
+        )
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+
     def test_get_contents(self, client: TestClient, user_token: str):
         """Test getting contents"""
         response = client.get(
@@ -72,16 +246,63 @@ class TestContentAPI:
         assert "total" in data
         assert "page" in data
 
-    def test_search_contents(self, client: TestClient, user_token: str):
-        """Test content search"""
+    def test_search_contents(
+        self, client: TestClient, user_token: str, admin_token: str
+    ):
+        """Test content search with highlighted results"""
+        client.post(
+            "/api/v1/contents/",
+            json={
+                "title": "Python入門",
+                "description": "Pythonで始めるデータ分析",
+                "content_type": ContentType.VIDEO.value,
+            },
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
         response = client.get(
-            "/api/v1/contents/?search=Python",
+            "/api/v1/contents/?search=Python データ分析",
             headers={"Authorization": f"Bearer {user_token}"},
         )
 
         assert response.status_code == 200
         data = response.json()
-        assert "contents" in data
+        assert data["total"] == 1
+        assert data["contents"][0]["highlight"] == {
+            "title": "<mark>Python</mark>入門",
+            "description": "<mark>Python</mark>で始める<mark>データ分析</mark>",
+        }
+
+    def test_suggest_contents(
+        self, client: TestClient, user_token: str, admin_token: str
+    ):
+        """Test search-as-you-type over published contents"""
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        content_ids = []
+        for title in ("セキュリティ研修", "セキュリティ基礎", "セキュリティ応用"):
+            response = client.post(
+                "/api/v1/contents/",
+                json={"title": title, "content_type": ContentType.VIDEO.value},
+                headers=admin_headers,
+            )
+            content_ids.append(response.json()["content_id"])
+        for content_id in content_ids[:2]:
+            client.post(f"/api/v1/contents/{content_id}/publish", headers=admin_headers)
+
+        try:
+            response = client.get(
+                "/api/v1/contents/suggest",
+                params={"q": "セキュリティ"},
+                headers={"Authorization": f"Bearer {user_token}"},
+            )
+        finally:
+            suggest_index.reset()
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "query": "セキュリティ",
+            "content_ids": content_ids[:2],
+        }
 
     def test_unauthorized_access(self, client: TestClient):
         """Test unauthorized access to admin endpoints"""
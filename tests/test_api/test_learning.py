@@ -39,6 +39,45 @@ class TestLearningAPI:
         assert data["progress_percentage"] == 50.0
         assert data["is_completed"] is False
 
+    def test_get_user_progress_fields(self, client: TestClient, user_token: str):
+        """Test listing user progress, whole or narrowed with fields="""
+        headers = {"Authorization": f"Bearer {user_token}"}
+        content_id = client.post(
+            "/api/v1/contents/",
+            json={"title": "Progress List Content", "content_type": "video"},
+            headers=headers,
+        ).json()["content_id"]
+        client.post(
+            f"/api/v1/learning/progress/{content_id}",
+            json={"progress_percentage": 100.0, "time_spent_minutes": 10},
+            headers=headers,
+        )
+
+        response = client.get("/api/v1/learning/progress", headers=headers)
+        assert response.status_code == 200
+        progress = response.json()["progress"]
+        assert progress[0]["content_title"] == "Progress List Content"
+        assert progress[0]["is_completed"] is True
+        assert progress[0]["completed_at"] is not None
+
+        response = client.get(
+            "/api/v1/learning/progress",
+            params={"fields": "content_id,content_title,is_completed"},
+            headers=headers,
+        )
+        assert response.json()["progress"] == [
+            {
+                "content_id": content_id,
+                "content_title": "Progress List Content",
+                "is_completed": True,
+            }
+        ]
+
+        response = client.get(
+            "/api/v1/learning/progress", params={"fields": ""}, headers=headers
+        )
+        assert response.status_code == 400
+
     def test_get_content_progress(self, client: TestClient, user_token: str):
         """Test getting user progress for content"""
         # Create content and update progress first
@@ -0,0 +1,85 @@
+"""
+Tests for releasing request database sessions before serialization
+"""
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.api.v1.deps import SessionReleasingRoute
+from src.config import database
+from src.config.database import get_db
+from src.utils.db_instrumentation import InstrumentedAsyncQueuePool
+
+checked_out_at_serialization = []
+
+
+class PoolProbe(BaseModel):
+    """Response model that records pool usage while it is being validated"""
+
+    value: int
+
+    @field_validator("value")
+    @classmethod
+    def record_pool(cls, value):
+        checked_out_at_serialization.append(database.engine.pool.checkedout())
+        return value
+
+
+@pytest.fixture
+def pool_app(tmp_path, monkeypatch):
+    """Application whose get_db sessions come from a private pool"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'release.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+    )
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(
+        database,
+        "AsyncSessionLocal",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    checked_out_at_serialization.clear()
+
+    router = APIRouter(route_class=SessionReleasingRoute)
+
+    @router.get("/query", response_model=PoolProbe)
+    async def query(db: AsyncSession = Depends(get_db)):
+        value = await db.scalar(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+        return {"value": value}
+
+    @router.get("/no-query", response_model=PoolProbe)
+    async def no_query(db: AsyncSession = Depends(get_db)):
+        return {"value": 0}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as test_client:
+        yield test_client, engine
+
+
+def test_connection_released_before_serialization(pool_app):
+    """Test that the connection is back in the pool when the response is built"""
+    client, engine = pool_app
+
+    response = client.get("/query")
+
+    assert response.status_code == 200
+    assert response.json() == {"value": 1}
+    assert checked_out_at_serialization == [0]
+    assert engine.pool.checkedout() == 0
+
+
+def test_unused_session_never_checks_out(pool_app):
+    """Test that a session that runs no query does not touch the pool"""
+    client, engine = pool_app
+
+    response = client.get("/no-query")
+
+    assert response.status_code == 200
+    assert checked_out_at_serialization == [0]
+    assert engine.pool.checkedin() == 0
@@ -0,0 +1,47 @@
+"""
+Tests for user API endpoints
+"""
+
+from fastapi.testclient import TestClient
+
+
+class TestUserAPI:
+    """Test user API endpoints"""
+
+    def test_import_users(self, client: TestClient, admin_token: str):
+        """Test importing users from a CSV upload"""
+        csv_content = (
+            "email,display_name,department,position\n"
+            "imported1@example.com,Imported One,Engineering,Developer\n"
+            "imported2@example.com,Imported Two,Sales,\n"
+            "broken,Broken Row,,\n"
+        )
+
+        response = client.post(
+            "/api/v1/users/import",
+            files={"file": ("users.csv", csv_content.encode(), "text/csv")},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["failed"] == 1
+        assert data["errors"][0]["line"] == 4
+
+        users_response = client.get(
+            "/api/v1/users/", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        emails = {user["email"] for user in users_response.json()}
+        assert {"imported1@example.com", "imported2@example.com"} <= emails
+
+    def test_import_users_invalid_file(self, client: TestClient, admin_token: str):
+        """Test that a CSV without the required columns is rejected"""
+        response = client.post(
+            "/api/v1/users/import",
+            files={"file": ("users.csv", b"name\nSomeone\n", "text/csv")},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert response.status_code == 400
+        assert "email" in response.json()["detail"]
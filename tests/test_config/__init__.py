@@ -0,0 +1 @@
+"""Config Tests Package"""
@@ -0,0 +1,69 @@
+"""
+Tests for database engine configuration
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config.database import (
+    async_database_url,
+    ping_idle_connections,
+    warm_up_pool,
+)
+from src.utils.db_instrumentation import InstrumentedAsyncQueuePool
+
+
+def create_test_engine(tmp_path, **kwargs):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        **kwargs,
+    )
+
+
+def test_async_database_url():
+    """Test that synchronous drivers are replaced by asyncio drivers"""
+    mysql_url = async_database_url("mysql+pymysql://user:pw@db:3306/elearning")
+    sqlite_url = async_database_url("sqlite:///./app.db")
+
+    assert mysql_url.drivername == "mysql+aiomysql"
+    assert mysql_url.database == "elearning"
+    assert sqlite_url.drivername == "sqlite+aiosqlite"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_pool(tmp_path):
+    """Test that warm-up leaves connections checked in to the pool"""
+    engine = create_test_engine(tmp_path, pool_size=3)
+
+    opened = await warm_up_pool(engine, 3)
+
+    assert opened == 3
+    assert engine.pool.checkedin() == 3
+    assert engine.pool.checkedout() == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_idle_connection_failing_ping_is_replaced(tmp_path):
+    """Test that an idle connection is pinged and replaced when dead"""
+    engine = create_test_engine(tmp_path, pool_size=1)
+    ping_idle_connections(engine, idle_seconds=0)
+
+    async with engine.connect() as connection:
+        first = (await connection.get_raw_connection()).driver_connection
+
+    pings = []
+
+    def failing_ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        raise ConnectionError("server has gone away")
+
+    engine.sync_engine.dialect.do_ping = failing_ping
+
+    async with engine.connect() as connection:
+        second = (await connection.get_raw_connection()).driver_connection
+
+    assert len(pings) == 1
+    assert second is not first
+    await engine.dispose()
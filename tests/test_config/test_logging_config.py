@@ -0,0 +1,61 @@
+"""
+Tests for the background logging pipeline
+"""
+
+import io
+import logging
+import queue
+
+from src.config.logging_config import BackgroundLogListener, DroppingQueueHandler
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_queue_handler_drops_when_full():
+    """Test that a full queue drops and counts records instead of blocking"""
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+
+    for index in range(3):
+        handler.handle(make_record(f"message {index}"))
+
+    assert log_queue.qsize() == 1
+    assert handler.dropped == 2
+
+
+def test_listener_flushes_on_stop():
+    """Test that stopping the listener writes every queued record"""
+    stream = io.StringIO()
+    output_handler = logging.StreamHandler(stream)
+    log_queue = queue.Queue(maxsize=100)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = BackgroundLogListener(log_queue, queue_handler, output_handler)
+
+    for index in range(50):
+        queue_handler.handle(make_record(f"message {index}"))
+
+    listener.start()
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 50
+    assert lines[-1] == "message 49"
+
+
+def test_listener_reports_dropped_records():
+    """Test that the writer logs how many records were dropped"""
+    stream = io.StringIO()
+    output_handler = logging.StreamHandler(stream)
+    log_queue = queue.Queue(maxsize=1)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = BackgroundLogListener(log_queue, queue_handler, output_handler)
+
+    queue_handler.handle(make_record("kept"))
+    queue_handler.handle(make_record("dropped"))
+
+    listener.start()
+    listener.stop()
+
+    assert "dropped 1 records" in stream.getvalue()
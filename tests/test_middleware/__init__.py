@@ -0,0 +1 @@
+"""Middleware Tests Package"""
@@ -0,0 +1,60 @@
+"""
+Tests for request logging middleware
+"""
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.middleware.request_logging import RequestLoggingMiddleware
+
+
+class RecordingLogger:
+    """Logger that records emitted events"""
+
+    def __init__(self):
+        self.records = []
+
+    def info(self, event, **kwargs):
+        self.records.append(kwargs)
+
+    warning = info
+
+
+def build_client(sample_rate: float, logger: RecordingLogger) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, sample_rate=sample_rate, logger=logger)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"item_id": item_id}
+
+    return TestClient(app)
+
+
+def test_logs_route_template():
+    """Test one log line per request with the route template"""
+    logger = RecordingLogger()
+    client = build_client(1.0, logger)
+
+    response = client.get("/items/42")
+
+    assert response.status_code == 200
+    assert len(logger.records) == 1
+    record = logger.records[0]
+    assert record["method"] == "GET"
+    assert record["route"] == "/items/{item_id}"
+    assert record["status_code"] == 200
+    assert record["duration_ms"] >= 0
+
+
+def test_sampling_keeps_errors():
+    """Test that sampled-out successes are skipped but errors are logged"""
+    logger = RecordingLogger()
+    client = build_client(0.0, logger)
+
+    client.get("/items/42")
+    client.get("/items/0")
+
+    assert [r["status_code"] for r in logger.records] == [404]
@@ -0,0 +1,214 @@
+"""
+Assessment service tests
+"""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.assessment import (
+    Assessment,
+    AssessmentSubmission,
+    Question,
+    QuestionChoice,
+    Quiz,
+    QuizAnswer,
+    QuizAttempt,
+)
+from src.models.content import Content
+from src.models.user import User
+from src.schemas.assessment import AssessmentSubmissionGrade, QuizAttemptSubmit
+from src.services.assessment_service import AssessmentService
+
+
+@pytest.fixture
+async def quiz_with_answers(db_session: AsyncSession):
+    """Quiz with two questions, three attempts and an answer per question"""
+    questions = [
+        Question(
+            question_id=f"question-{i}",
+            question_text="Question",
+            question_type="true_false",
+            order_index=i,
+            choices=[
+                QuestionChoice(
+                    choice_id=f"choice-{i}", choice_text="True", order_index=0
+                )
+            ],
+        )
+        for i in range(2)
+    ]
+    attempts = [
+        QuizAttempt(
+            attempt_id=f"attempt-{i}",
+            quiz_id="q1",
+            user_id="u1",
+            attempt_number=i + 1,
+            max_score=2.0,
+            answers=[
+                QuizAnswer(answer_id=f"answer-{i}-{j}", question_id=f"question-{j}")
+                for j in range(2)
+            ],
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(
+        [
+            User(user_id="u1", email="alice@example.com", display_name="Alice"),
+            Content(content_id="c1", title="Security Basics", content_type="video"),
+            Quiz(
+                quiz_id="q1",
+                title="Security Quiz",
+                content_id="c1",
+                created_by="u1",
+                questions=questions,
+            ),
+        ]
+    )
+    db_session.add_all(attempts)
+    await db_session.commit()
+
+
+async def count(db: AsyncSession, model) -> int:
+    return await db.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+async def test_get_quiz_orders_questions_and_choices(db_session: AsyncSession):
+    """Test that questions and choices come in order_index order, as stored"""
+    db_session.add_all(
+        [
+            User(user_id="u1", email="alice@example.com", display_name="Alice"),
+            Content(content_id="c1", title="Security Basics", content_type="video"),
+            Quiz(
+                quiz_id="q1",
+                title="Security Quiz",
+                content_id="c1",
+                created_by="u1",
+                questions=[
+                    Question(
+                        question_id=f"question-{i}",
+                        question_text="Question",
+                        question_type="multiple_choice",
+                        order_index=i,
+                        choices=[
+                            QuestionChoice(
+                                choice_id=f"choice-{i}-{j}",
+                                choice_text="Choice",
+                                order_index=j,
+                            )
+                            for j in (2, 0, 1)
+                        ],
+                    )
+                    for i in (1, 0)
+                ],
+            ),
+        ]
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+
+    quiz = await AssessmentService(db_session).get_quiz("q1")
+
+    assert [question.order_index for question in quiz.questions] == [0, 1]
+    for question in quiz.questions:
+        assert [choice.order_index for choice in question.choices] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_delete_quiz_hides_quiz(db_session: AsyncSession, quiz_with_answers):
+    """Test that a deleted quiz is not returned while its data is purged"""
+    service = AssessmentService(db_session)
+
+    assert await service.delete_quiz("q1")
+
+    assert await service.get_quiz("q1") is None
+    assert await service.get_quizzes() == ([], 0)
+    assert await service.get_quiz_attempts(quiz_id="q1") == ([], 0)
+    assert await service.get_quiz_attempts(user_id="u1") == ([], 0)
+    assert not await service.delete_quiz("q1")
+    assert await count(db_session, QuizAnswer) == 6
+
+
+@pytest.mark.asyncio
+async def test_delete_assessment_hides_submissions(db_session: AsyncSession):
+    """Test that submissions of a deleted assessment are neither listed nor graded"""
+    db_session.add_all(
+        [
+            User(user_id="u1", email="alice@example.com", display_name="Alice"),
+            Assessment(
+                assessment_id="a1",
+                title="Final Exam",
+                assessment_type="exam",
+                total_points=10.0,
+                created_by="u1",
+                submissions=[AssessmentSubmission(submission_id="s1", user_id="u1")],
+            ),
+        ]
+    )
+    await db_session.commit()
+    service = AssessmentService(db_session)
+    assert (await service.get_assessment_submissions(assessment_id="a1"))[1] == 1
+
+    assert await service.delete_assessment("a1")
+
+    assert await service.get_assessment_submissions(assessment_id="a1") == ([], 0)
+    assert await service.get_assessment_submissions(user_id="u1") == ([], 0)
+    grade = AssessmentSubmissionGrade(score=8.0)
+    assert await service.grade_submission("s1", grade, "u1") is None
+
+
+@pytest.mark.asyncio
+async def test_attempts_refresh_quiz_statistics(
+    db_session: AsyncSession, quiz_with_answers
+):
+    """Test that cached statistics are dropped when an attempt starts or ends"""
+    db_session.add(User(user_id="u2", email="bob@example.com", display_name="Bob"))
+    await db_session.commit()
+    service = AssessmentService(db_session)
+    await service.publish_quiz("q1")
+    assert (await service.get_quiz_statistics("q1"))["total_attempts"] == 3
+
+    attempt = await service.start_quiz_attempt("q1", "u2")
+    statistics = await service.get_quiz_statistics("q1")
+    assert (statistics["total_attempts"], statistics["completed_attempts"]) == (4, 0)
+
+    await service.submit_quiz_attempt(attempt.attempt_id, QuizAttemptSubmit(answers=[]))
+    statistics = await service.get_quiz_statistics("q1")
+    assert (statistics["total_attempts"], statistics["completed_attempts"]) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_purge_quiz_in_batches(db_session: AsyncSession, quiz_with_answers):
+    """Test that related rows are deleted in batches with progress reported"""
+    service = AssessmentService(db_session)
+    await service.delete_quiz("q1")
+    progress = []
+
+    deleted = await service.purge_quiz(
+        "q1", batch_size=4, progress=lambda table, rows: progress.append((table, rows))
+    )
+
+    assert deleted == {
+        "quiz_answers": 6,
+        "quiz_attempts": 3,
+        "question_choices": 2,
+        "questions": 2,
+        "quizzes": 1,
+    }
+    assert progress[:3] == [
+        ("quiz_answers", 4),
+        ("quiz_answers", 6),
+        ("quiz_attempts", 3),
+    ]
+    for model in (Quiz, Question, QuestionChoice, QuizAttempt, QuizAnswer):
+        assert await count(db_session, model) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_quiz_requires_deleted_quiz(
+    db_session: AsyncSession, quiz_with_answers
+):
+    """Test that a quiz that was not deleted is never purged"""
+    assert await AssessmentService(db_session).purge_quiz("q1") is None
+    assert await count(db_session, QuizAnswer) == 6
@@ -0,0 +1,355 @@
+"""
+Read-through cache tests
+"""
+
+import asyncio
+import fnmatch
+import random
+import time
+
+import pytest
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.content import Content
+from src.schemas.content import ContentUpdate
+from src.services.cache import (
+    InMemoryCache,
+    JsonCodec,
+    RedisCache,
+    _pack,
+    cached,
+    get_cache,
+)
+from src.services.content_service import ContentService
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_used():
+    """Test that the entry used longest ago is dropped at capacity"""
+    cache = InMemoryCache(max_entries=2)
+    await cache.set("content:a", "A", ttl_seconds=60)
+    await cache.set("content:b", "B", ttl_seconds=60)
+    assert await cache.get("content:a") == "A"
+
+    await cache.set("content:c", "C", ttl_seconds=60)
+
+    assert len(cache) == 2
+    assert await cache.get("content:b") is None
+    assert await cache.get("content:a") == "A"
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expires_entries(monkeypatch):
+    """Test that entries are not returned after their TTL"""
+    cache = InMemoryCache()
+    await cache.set("content:a", "A", ttl_seconds=10)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+
+    assert await cache.get("content:a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_invalidates_tags():
+    """Test that invalidating a tag drops every entry carrying it"""
+    cache = InMemoryCache()
+    await cache.set("content:a", "A", 60, tags=["content:a", "category:k"])
+    await cache.set("category:k", "K", 60, tags=["category:k"])
+    await cache.set("content:b", "B", 60, tags=["content:b"])
+
+    assert await cache.invalidate_tags(["category:k"]) == 2
+    assert await cache.get("content:a") is None
+    assert await cache.get("category:k") is None
+    assert await cache.get("content:b") == "B"
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_refuses_values_older_than_invalidation():
+    """Test that a value computed before its tags were invalidated is dropped"""
+    cache = InMemoryCache()
+    versions = await cache.tag_versions(["content:a"])
+    await cache.invalidate_tags(["content:a"])
+
+    await cache.set("content:a", "A", 60, ["content:a"], versions)
+    assert await cache.get("content:a") is None
+
+    versions = await cache.tag_versions(["content:a"])
+    await cache.clear()
+    await cache.set("content:a", "A", 60, ["content:a"], versions)
+    assert await cache.get("content:a") is None
+
+    versions = await cache.tag_versions(["content:a"])
+    await cache.set("content:a", "A", 60, ["content:a"], versions)
+    assert await cache.get("content:a") == "A"
+
+
+class FakeRedis:
+    """The few Redis commands RedisCache uses, without expiry"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value).encode()
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def watch(self, *keys):
+        assert keys, "ERR wrong number of arguments for 'watch' command"
+
+    async def mget(self, keys):
+        return await self.redis.mget(keys)
+
+    def multi(self):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.commands.append(lambda data: data.__setitem__(key, value.encode()))
+
+    def sadd(self, key, member):
+        self.commands.append(
+            lambda data: data.setdefault(key, set()).add(member.encode())
+        )
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda data: key in data)
+
+    def smembers(self, key):
+        self.commands.append(lambda data: set(data.get(key, ())))
+
+    def delete(self, key):
+        self.commands.append(lambda data: data.pop(key, None) is not None)
+
+    def incr(self, key):
+        def incr(data):
+            data[key] = str(int(data.get(key, 0)) + 1).encode()
+            return int(data[key])
+
+        self.commands.append(incr)
+
+    async def execute(self):
+        results = [command(self.redis.data) for command in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_invalidates_tags():
+    """Test storing, tagging, invalidating and clearing through Redis"""
+    cache = RedisCache(FakeRedis())
+    await cache.set("content:a", "A", 60, tags=["content:a", "category:k"])
+    await cache.set("content:b", "B", 60, tags=["content:b"])
+    assert await cache.get("content:a") == "A"
+
+    assert await cache.invalidate_tags(["category:k"]) == 1
+    assert await cache.get("content:a") is None
+    assert "cache-tag:category:k" not in cache.redis.data
+
+    # Computed before the invalidation, so not stored
+    versions = await cache.tag_versions(["category:k"])
+    assert versions == (1,)
+    await cache.invalidate_tags(["category:k"])
+    await cache.set("content:a", "A", 60, ["category:k"], versions)
+    assert await cache.get("content:a") is None
+    await cache.set("content:a", "A", 60, ["category:k"], (2,))
+    assert await cache.get("content:a") == "A"
+    await cache.set("untagged", "U", 60, [], await cache.tag_versions([]))
+    assert await cache.get("untagged") == "U"
+
+    # Only the first worker finding the entry expired refreshes it
+    assert await cache.acquire_refresh("content:b@1.000", 30)
+    assert not await cache.acquire_refresh("content:b@1.000", 30)
+
+    await cache.clear()
+    assert cache.redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_cached_content_reads(db_session: AsyncSession):
+    """Test that hits return detached copies and writes invalidate them"""
+    db_session.add(Content(content_id="c1", title="機械学習", content_type="video"))
+    await db_session.commit()
+    service = ContentService(db_session)
+
+    first = await service.get_content_by_id("c1")
+    assert await get_cache().get("content:c1") is not None
+
+    second = await service.get_content_by_id("c1")
+    assert second is not first
+    assert sa_inspect(second).detached
+    assert second.title == "機械学習"
+    assert second.created_at == first.created_at
+
+    await service.update_content("c1", ContentUpdate(title="深層学習"))
+    assert await get_cache().get("content:c1") is None
+    assert (await service.get_content_by_id("c1")).title == "深層学習"
+
+    assert await service.get_content_by_id("missing") is None
+    assert await get_cache().get("content:missing") is None
+
+
+class SlowReads:
+    """Service whose read takes long enough for callers to pile up"""
+
+    def __init__(self):
+        self.calls = 0
+        self.version = 1
+        self.fail = False
+
+    @cached("slow", JsonCodec(), lambda item: [f"slow:{item}"])
+    async def get(self, item: str):
+        self.calls += 1
+        version, fail = self.version, self.fail
+        await asyncio.sleep(0.05)
+        if fail:
+            raise RuntimeError("database unavailable")
+        return {"item": item, "version": version}
+
+
+@pytest.fixture
+async def slow_reads():
+    yield SlowReads()
+    await get_cache().clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(slow_reads):
+    """Test that 500 callers missing the same key share one computation"""
+    results = await asyncio.gather(*(slow_reads.get("a") for _ in range(500)))
+
+    assert slow_reads.calls == 1
+    assert all(result == {"item": "a", "version": 1} for result in results)
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 500
+
+
+@pytest.mark.asyncio
+async def test_failed_computation_is_not_shared(slow_reads):
+    """Test that waiters retry once together when the computation fails"""
+    slow_reads.fail = True
+
+    results = await asyncio.gather(
+        *(slow_reads.get("a") for _ in range(10)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The first computation and a single retry shared by the waiters
+    assert slow_reads.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_the_retry_of_a_failed_computation(slow_reads):
+    """Test that the retry's result is handed to every waiter"""
+    slow_reads.fail = True
+    reads = asyncio.gather(
+        *(slow_reads.get("a") for _ in range(10)), return_exceptions=True
+    )
+    await asyncio.sleep(0.01)
+    slow_reads.fail = False
+
+    results = await reads
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [{"item": "a", "version": 1}] * 9
+    assert slow_reads.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_computation_racing_a_write_is_not_stored(slow_reads):
+    """Test that a result read before an invalidation is not cached"""
+    read = asyncio.create_task(slow_reads.get("a"))
+    await asyncio.sleep(0.01)
+    slow_reads.version = 2
+    await get_cache().invalidate_tags(["slow:a"])
+
+    assert await read == {"item": "a", "version": 1}
+    assert await get_cache().get("slow:a") is None
+    assert await slow_reads.get("a") == {"item": "a", "version": 2}
+    assert await slow_reads.get("a") == {"item": "a", "version": 2}
+    assert slow_reads.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_computation_is_retried(slow_reads):
+    """Test that waiters are not failed by the cancellation of another caller"""
+    leader = asyncio.create_task(slow_reads.get("a"))
+    await asyncio.sleep(0.01)
+    waiters = asyncio.gather(*(slow_reads.get("a") for _ in range(3)))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await waiters == [{"item": "a", "version": 1}] * 3
+    assert leader.cancelled()
+    assert slow_reads.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_served_while_refreshed(slow_reads):
+    """Test that one caller refreshes an expired entry, the others get it"""
+    await get_cache().set(
+        "slow:a",
+        _pack(time.time() - 1, 0.05, '{"item": "a", "version": 0}'),
+        60,
+        tags=["slow:a"],
+    )
+
+    results = await asyncio.gather(*(slow_reads.get("a") for _ in range(100)))
+
+    assert slow_reads.calls == 1
+    assert results.count({"item": "a", "version": 1}) == 1
+    assert results.count({"item": "a", "version": 0}) == 99
+    assert await slow_reads.get("a") == {"item": "a", "version": 1}
+
+
+@pytest.mark.asyncio
+async def test_entry_refreshed_early(slow_reads, monkeypatch):
+    """Test that an entry close to expiry may be refreshed ahead of time"""
+    await get_cache().set(
+        "slow:a",
+        _pack(time.time() + 1, 0.5, '{"item": "a", "version": 0}'),
+        60,
+        tags=["slow:a"],
+    )
+
+    # -log(1 - 0.2) * 0.5 s is well short of the second left
+    monkeypatch.setattr(random, "random", lambda: 0.2)
+    assert (await slow_reads.get("a"))["version"] == 0
+    assert slow_reads.calls == 0
+
+    # -log(1 - 0.99) * 0.5 s is more than the second left
+    monkeypatch.setattr(random, "random", lambda: 0.99)
+    assert (await slow_reads.get("a"))["version"] == 1
+    assert slow_reads.calls == 1
@@ -1,8 +1,360 @@
 """
-Tests for content service (placeholder)
+Tests for content service
 """
 
+import asyncio
 
-def test_placeholder():
-    """Placeholder test"""
-    assert True
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.content import Category, Content
+from src.schemas.content import (
+    CategoryUpdate,
+    ContentCreate,
+    ContentType,
+    ContentUpdate,
+)
+from src.services.category_tree import CategoryNode, CategoryTree
+from src.services.content_search import (
+    MySQLContentSearch,
+    highlight,
+    search_terms,
+)
+from src.services.content_service import ContentService
+from src.services.content_suggest import suggest_index
+from src.utils.ngram_index import NgramIndex
+
+
+@pytest.fixture
+async def catalog(db_session: AsyncSession):
+    """Contents in Japanese and English"""
+    db_session.add_all(
+        [
+            Content(
+                content_id="c1",
+                title="機械学習の基礎",
+                description="教師あり学習と教師なし学習の入門",
+                content_type="video",
+            ),
+            Content(
+                content_id="c2",
+                title="Python入門",
+                description="Pythonで始める機械学習。機械学習ライブラリも紹介します。",
+                content_type="video",
+            ),
+            Content(
+                content_id="c3",
+                title="Java入門",
+                description="Javaの基本文法",
+                content_type="document",
+            ),
+        ]
+    )
+    await db_session.commit()
+
+
+async def search(db: AsyncSession, text: str):
+    contents, total = await ContentService(db).get_contents(search=text)
+    assert total == len(contents)
+    return [content.content_id for content in contents]
+
+
+@pytest.mark.asyncio
+async def test_search_contents(db_session: AsyncSession, catalog):
+    """Test that every term must match the title or description"""
+    assert sorted(await search(db_session, "機械学習")) == ["c1", "c2"]
+    assert await search(db_session, "python 機械学習") == ["c2"]
+    assert await search(db_session, "機械学習 Java") == []
+
+
+@pytest.mark.asyncio
+async def test_search_short_terms(db_session: AsyncSession, catalog):
+    """Test that terms shorter than the index tokens still match"""
+    assert sorted(await search(db_session, "入門")) == ["c1", "c2", "c3"]
+    assert await search(db_session, "入門 Java") == ["c3"]
+
+
+@pytest.mark.asyncio
+async def test_search_index_follows_changes(db_session: AsyncSession, catalog):
+    """Test that updated and deleted contents are reindexed"""
+    service = ContentService(db_session)
+
+    await service.update_content("c3", ContentUpdate(title="Kotlin入門"))
+    await service.delete_content("c1")
+
+    assert await search(db_session, "Java入門") == []
+    assert await search(db_session, "Kotlin") == ["c3"]
+    assert await search(db_session, "教師あり") == []
+
+
+@pytest.mark.asyncio
+async def test_search_ignores_query_syntax(db_session: AsyncSession, catalog):
+    """Test that quotes and operators in the search are not interpreted"""
+    assert search_terms('"Python" -Java* (入門)') == ["Python", "Java", "入門"]
+    assert await search(db_session, '"Python"') == ["c2"]
+
+
+def test_mysql_search_uses_fulltext_index():
+    """Test that MySQL searches use MATCH ... AGAINST in boolean mode"""
+    query = MySQLContentSearch().apply(select(Content), ["機械学習", "a"])
+
+    sql = str(query.compile(dialect=mysql.dialect()))
+
+    assert "MATCH (contents.title, contents.description) AGAINST" in sql
+    assert "IN BOOLEAN MODE" in sql
+    assert "ORDER BY MATCH" in sql
+    assert "LIKE" in sql
+
+
+def test_highlight():
+    """Test that terms are marked and the text escaped and shortened"""
+    assert highlight("Python <入門>", ["python"]) == "<mark>Python</mark> &lt;入門&gt;"
+    assert highlight("x" * 50 + "機械学習" + "y" * 50, ["機械学習"], 20) == (
+        "…xxxxx<mark>機械学習</mark>yyyyyyyyyyy…"
+    )
+    assert highlight(None, ["python"]) is None
+
+
+@pytest.fixture
+async def loaded_suggest_index(db_session: AsyncSession, catalog):
+    """Suggest index loaded from the catalog, with one content published"""
+    await ContentService(db_session).publish_content("c1")
+    await suggest_index.load(db_session)
+    yield suggest_index
+    suggest_index.reset()
+
+
+@pytest.mark.asyncio
+async def test_suggest_index_follows_changes(
+    db_session: AsyncSession, loaded_suggest_index
+):
+    """Test that content writes keep the suggest index current"""
+    service = ContentService(db_session)
+    db_session.add(Category(category_id="k1", name="データサイエンス"))
+    await db_session.commit()
+    assert loaded_suggest_index.suggest("機械") == ["c1"]
+
+    await service.publish_content("c2")
+    assert loaded_suggest_index.suggest("機械") == ["c1", "c2"]
+
+    content = await service.create_content(
+        ContentCreate(title="統計入門", content_type=ContentType.VIDEO, category_id="k1"),
+        created_by=None,
+    )
+    assert loaded_suggest_index.suggest("統計") == []
+    await service.publish_content(content.content_id)
+    assert loaded_suggest_index.suggest("データサイエンス") == [content.content_id]
+
+    await service.update_content("c1", ContentUpdate(title="深層学習"))
+    await service.unpublish_content("c2")
+    await service.delete_content(content.content_id)
+
+    assert loaded_suggest_index.suggest("機械") == []
+    assert loaded_suggest_index.suggest("深層") == ["c1"]
+    assert loaded_suggest_index.suggest("統計") == []
+
+
+@pytest.mark.asyncio
+async def test_suggest_index_loads_once(db_session: AsyncSession, catalog, monkeypatch):
+    """Test that concurrent first requests wait for a single build"""
+    await ContentService(db_session).publish_content("c1")
+    builds = []
+    build = NgramIndex.build
+
+    def counting_build(*args):
+        builds.append(args)
+        return build(*args)
+
+    monkeypatch.setattr(NgramIndex, "build", counting_build)
+    try:
+        await asyncio.gather(
+            *(suggest_index.ensure_loaded(db_session) for _ in range(5))
+        )
+        await suggest_index.ensure_loaded(db_session)
+    finally:
+        suggest_index.reset()
+
+    assert len(builds) == 1
+
+
+def test_category_tree():
+    """Test ancestors, descendants and breadcrumbs of the cached tree"""
+    tree = CategoryTree(
+        [
+            CategoryNode("it", "IT", None, True),
+            CategoryNode("prog", "プログラミング", "it", True),
+            CategoryNode("py", "Python", "prog", True),
+            CategoryNode("java", "Java", "prog", False),
+            CategoryNode("loop-a", "A", "loop-b", True),
+            CategoryNode("loop-b", "B", "loop-a", True),
+        ]
+    )
+
+    assert [node.name for node in tree.breadcrumbs("py")] == [
+        "IT",
+        "プログラミング",
+        "Python",
+    ]
+    assert [node.category_id for node in tree.ancestors("py")] == ["it", "prog"]
+    assert tree.descendants("it") == {"prog", "py", "java"}
+    assert tree.descendants("py") == frozenset()
+    assert [node.category_id for node in tree.children("prog")] == ["py", "java"]
+    assert tree.breadcrumbs("unknown") == []
+    # A parent_id cycle does not make paths endless
+    assert len(tree.breadcrumbs("loop-a")) == 2
+
+
+@pytest.fixture
+async def category_hierarchy(db_session: AsyncSession):
+    """IT > プログラミング > Python, and 法務, each with one content"""
+    db_session.add_all(
+        [
+            Category(category_id="it", name="IT"),
+            Category(category_id="prog", name="プログラミング", parent_id="it"),
+            Category(category_id="py", name="Python", parent_id="prog"),
+            Category(category_id="law", name="法務"),
+        ]
+    )
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Content(
+                content_id=f"c-{category_id}",
+                title=category_id,
+                category_id=category_id,
+                content_type="video",
+            )
+            for category_id in ("it", "prog", "py", "law")
+        ]
+    )
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_contents_include_descendants(
+    db_session: AsyncSession, category_hierarchy
+):
+    """Test filtering by a category and every category below it"""
+    service = ContentService(db_session)
+
+    contents, total = await service.get_contents(
+        category_id="prog", include_descendants=True
+    )
+    assert total == 2
+    assert {content.content_id for content in contents} == {"c-prog", "c-py"}
+
+    contents, _ = await service.get_contents(category_id="prog")
+    assert [content.content_id for content in contents] == ["c-prog"]
+
+
+@pytest.mark.asyncio
+async def test_category_writes_use_fresh_tree(
+    db_session: AsyncSession, category_hierarchy
+):
+    """Test that moves and deletes are checked against the updated tree"""
+    service = ContentService(db_session)
+    assert [node.name for node in await service.get_category_breadcrumbs("py")] == [
+        "IT",
+        "プログラミング",
+        "Python",
+    ]
+
+    with pytest.raises(HTTPException) as error:
+        await service.update_category("it", CategoryUpdate(parent_id="py"))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        await service.delete_category("prog")
+    assert error.value.status_code == 400
+
+    await service.update_category("py", CategoryUpdate(parent_id="law"))
+    assert await service.delete_category("prog")
+    assert [node.name for node in await service.get_category_breadcrumbs("py")] == [
+        "法務",
+        "Python",
+    ]
+    assert await service.get_category_breadcrumbs("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_category_writes_see_changes_from_other_workers(
+    db_session: AsyncSession, category_hierarchy
+):
+    """Test that moves and deletes are not checked against a cached tree"""
+    service = ContentService(db_session)
+    await service.get_category_breadcrumbs("py")
+    # Written through another worker, so this worker's tree is not invalidated
+    await db_session.execute(
+        update(Category).where(Category.category_id == "law").values(parent_id="py")
+    )
+    await db_session.execute(
+        insert(Category).values(category_id="contract", name="契約", parent_id="law")
+    )
+    await db_session.commit()
+
+    with pytest.raises(HTTPException) as error:
+        await service.update_category("it", CategoryUpdate(parent_id="law"))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        await service.delete_category("law")
+    assert error.value.status_code == 400
+
+
+async def category_counts(db: AsyncSession):
+    result = await db.execute(
+        select(
+            Category.category_id,
+            Category.content_count,
+            Category.total_content_count,
+        )
+    )
+    return {category_id: (count, total) for category_id, count, total in result.all()}
+
+
+@pytest.mark.asyncio
+async def test_category_content_counts(db_session: AsyncSession, category_hierarchy):
+    """Test that content and category writes keep the counts current"""
+    service = ContentService(db_session)
+
+    await service.publish_content("c-py")
+    await service.publish_content("c-prog")
+    assert await category_counts(db_session) == {
+        "it": (0, 2),
+        "prog": (1, 2),
+        "py": (1, 1),
+        "law": (0, 0),
+    }
+
+    await service.update_content("c-py", ContentUpdate(category_id="law"))
+    await service.update_category("prog", CategoryUpdate(parent_id="law"))
+    assert await category_counts(db_session) == {
+        "it": (0, 0),
+        "prog": (1, 1),
+        "py": (0, 0),
+        "law": (1, 2),
+    }
+
+    await service.delete_content("c-prog")
+    await service.unpublish_content("c-py")
+    assert set((await category_counts(db_session)).values()) == {(0, 0)}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_category_counts(db_session: AsyncSession, category_hierarchy):
+    """Test that drifted counts are recomputed from the contents"""
+    service = ContentService(db_session)
+    await service.publish_content("c-py")
+    await db_session.execute(
+        update(Category)
+        .where(Category.category_id.in_(["it", "law"]))
+        .values(total_content_count=5)
+    )
+
+    assert await service.reconcile_category_counts() == 2
+    assert (await category_counts(db_session))["it"] == (0, 1)
+    assert (await category_counts(db_session))["law"] == (0, 0)
+    assert await service.reconcile_category_counts() == 0
@@ -0,0 +1,210 @@
+"""
+Invalidation bus tests
+"""
+
+import asyncio
+import json
+import multiprocessing
+import queue
+import socket
+import time
+
+import pytest
+
+from src.services.cache import evict_local_copies, get_cache
+from src.services.category_tree import CATEGORY_TREE_TAG, category_tree
+from src.services.content_suggest import suggest_index
+from src.services.invalidation_bus import (
+    ALL_TAGS,
+    RedisInvalidationBus,
+    SocketInvalidationBus,
+)
+
+WORKERS = 3
+
+
+def run_worker(worker: int, directory: str, commands, events) -> None:
+    """Worker process: report what it receives, publish what it is told"""
+
+    async def main():
+        bus = SocketInvalidationBus(directory)
+
+        async def report(tags):
+            events.put(("received", worker, tags, time.time()))
+
+        bus.subscribe(report)
+        await bus.start()
+        events.put(("ready", worker, None, time.time()))
+        loop = asyncio.get_running_loop()
+        while True:
+            command = await loop.run_in_executor(None, commands.get)
+            if command is None:
+                break
+            await bus.publish(command)
+            events.put(("published", worker, command, time.time()))
+        await bus.stop()
+
+    asyncio.run(main())
+
+
+def test_workers_receive_each_others_invalidations(tmp_path):
+    """Test that every other worker process applies a published message"""
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    commands = [context.Queue() for _ in range(WORKERS)]
+    processes = [
+        context.Process(
+            target=run_worker, args=(worker, str(tmp_path), command, events)
+        )
+        for worker, command in enumerate(commands)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for _ in processes:
+            assert events.get(timeout=30)[0] == "ready"
+        commands[0].put(["content:c1", "category:k1"])
+
+        received = {}
+        published_at = None
+        deadline = time.monotonic() + 10
+        while len(received) < WORKERS - 1 or published_at is None:
+            kind, worker, tags, at = events.get(
+                timeout=max(deadline - time.monotonic(), 0.1)
+            )
+            if kind == "published":
+                published_at = at
+            elif kind == "received":
+                received[worker] = (tags, at)
+
+        # The publisher does not receive its own message
+        assert set(received) == set(range(1, WORKERS))
+        for tags, at in received.values():
+            assert tags == ["content:c1", "category:k1"]
+            assert at - published_at < 1.0
+        with pytest.raises(queue.Empty):
+            events.get(timeout=0.2)
+    finally:
+        for command in commands:
+            command.put(None)
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+
+    assert list(tmp_path.glob("*.sock")) == []
+
+
+@pytest.mark.asyncio
+async def test_socket_bus_removes_sockets_of_exited_workers(tmp_path):
+    """Test that publishing drops sockets nobody listens on any more"""
+    left_behind = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    left_behind.bind(str(tmp_path / "exited.sock"))
+    left_behind.close()
+
+    bus = SocketInvalidationBus(str(tmp_path))
+    await bus.publish(["content:c1"])
+
+    assert not (tmp_path / "exited.sock").exists()
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.channels = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """Redis pub/sub over one channel, as much as the bus uses"""
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.subscriptions = []
+
+    async def publish(self, channel, message):
+        await self.messages.put({"type": "message", "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        self.subscriptions.append(FakePubSub(self.messages))
+        return self.subscriptions[-1]
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_applies_messages_of_other_workers():
+    """Test that own messages are skipped and a subscription drops all"""
+    redis = FakeRedis()
+    publisher = RedisInvalidationBus(redis, "invalidation")
+    subscriber = RedisInvalidationBus(redis, "invalidation")
+    received = []
+
+    async def record(tags):
+        received.append(tags)
+
+    subscriber.subscribe(record)
+    await subscriber.start()
+    try:
+        await subscriber.publish(["content:own"])
+        await publisher.publish(["content:c1"])
+        await redis.messages.put({"type": "message", "data": b"not json"})
+        for _ in range(10):
+            await asyncio.sleep(0)
+    finally:
+        await subscriber.stop()
+
+    assert received == [[ALL_TAGS], ["content:c1"]]
+    assert redis.subscriptions[0].channels == ["invalidation"]
+    assert redis.subscriptions[0].closed
+
+
+@pytest.mark.asyncio
+async def test_bus_splits_large_invalidations():
+    """Test that many tags are sent in several messages"""
+    redis = FakeRedis()
+    bus = RedisInvalidationBus(redis, "invalidation")
+
+    await bus.publish([f"category:{number}" for number in range(1200)])
+
+    sizes = []
+    while not redis.messages.empty():
+        message = await redis.messages.get()
+        sizes.append(len(json.loads(message["data"])["tags"]))
+    assert sizes == [500, 500, 200]
+
+
+@pytest.mark.asyncio
+async def test_evict_local_copies():
+    """Test that received tags drop the matching in-process copies"""
+    cache = get_cache()
+    await cache.set("content:c1", "{}", 60, tags=["content:c1"])
+    await cache.set("content:c2", "{}", 60, tags=["content:c2"])
+    suggest_index.loaded_at = time.monotonic()
+    category_tree._tree = tree = object()
+    category_tree._loaded_at = time.monotonic()
+
+    try:
+        await evict_local_copies(["content:c1"])
+        assert await cache.get("content:c1") is None
+        assert await cache.get("content:c2") == "{}"
+        assert suggest_index.is_stale()
+        assert category_tree._tree is tree
+
+        await evict_local_copies([CATEGORY_TREE_TAG])
+        assert category_tree._tree is None
+
+        await evict_local_copies([ALL_TAGS])
+        assert await cache.get("content:c2") is None
+    finally:
+        suggest_index.reset()
+        category_tree.invalidate()
@@ -0,0 +1,180 @@
+"""
+Session store tests
+"""
+
+import pytest
+
+from src.services.session_store import InMemorySessionStore, RedisSessionStore
+
+
+@pytest.mark.asyncio
+async def test_rotate_session():
+    """Test compare-and-set rotation"""
+    store = InMemorySessionStore()
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=60)
+
+    assert await store.rotate_session("sid-1", "jti-1", "jti-2", ttl_seconds=60)
+    assert not await store.rotate_session("sid-1", "jti-1", "jti-3", ttl_seconds=60)
+
+    session = await store.get_session("sid-1")
+    assert session == {"user_id": "user-1", "token_id": "jti-2"}
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_sessions():
+    """Test revoking every session of a user"""
+    store = InMemorySessionStore()
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=60)
+    await store.create_session("sid-2", "user-1", "jti-2", ttl_seconds=60)
+    await store.create_session("sid-3", "user-2", "jti-3", ttl_seconds=60)
+
+    assert await store.revoke_user_sessions("user-1") == 2
+    assert await store.get_session("sid-1") is None
+    assert await store.get_session("sid-2") is None
+    assert await store.get_user_session_ids("user-2") == ["sid-3"]
+
+
+@pytest.mark.asyncio
+async def test_expired_session():
+    """Test that expired sessions are not returned"""
+    store = InMemorySessionStore()
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=0)
+
+    assert await store.get_session("sid-1") is None
+    assert await store.get_user_session_ids("user-1") == []
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_sessions_counts_live_sessions():
+    """Test that expired sessions are dropped but not counted, as in Redis"""
+    store = InMemorySessionStore()
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=0)
+    await store.create_session("sid-2", "user-1", "jti-2", ttl_seconds=60)
+
+    assert await store.revoke_user_sessions("user-1") == 1
+    assert await store.revoke_user_sessions("user-1") == 0
+
+
+class FakeRedis:
+    """The Redis commands RedisSessionStore uses, on a clock moved by hand"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires_at = {}
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+        for key, expires_at in list(self.expires_at.items()):
+            if expires_at <= self.now:
+                self.data.pop(key, None)
+                del self.expires_at[key]
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self.data.setdefault(key, {}).update(mapping or {field: value})
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def srem(self, key, member):
+        self.data.get(key, set()).discard(member)
+
+    def expire(self, key, seconds):
+        if key in self.data:
+            self.expires_at[key] = self.now + seconds
+
+    def ttl(self, key):
+        if key not in self.data:
+            return -2
+        if key not in self.expires_at:
+            return -1
+        return int(self.expires_at[key] - self.now)
+
+    def delete(self, key):
+        self.expires_at.pop(key, None)
+        return int(self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def rotate(keys, args):
+            # What the Lua script does, run atomically by Redis
+            session_key, user_key = keys
+            expected, new, ttl, session_id = args
+            if self.data.get(session_key, {}).get("token_id") != expected:
+                return 0
+            self.hset(session_key, "token_id", new)
+            self.expire(session_key, ttl)
+            self.sadd(user_key, session_id)
+            if self.ttl(user_key) < ttl:
+                self.expire(user_key, ttl)
+            return 1
+
+        return rotate
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.commands.append(
+            lambda: command(*args, **kwargs)
+        )
+
+    async def execute(self):
+        results = [command() for command in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.mark.asyncio
+async def test_redis_rotate_session():
+    """Test compare-and-set rotation through Redis"""
+    store = RedisSessionStore(FakeRedis())
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=60)
+
+    assert await store.rotate_session("sid-1", "jti-1", "jti-2", ttl_seconds=60)
+    assert not await store.rotate_session("sid-1", "jti-1", "jti-3", ttl_seconds=60)
+    assert not await store.rotate_session("missing", "jti-1", "jti-3", ttl_seconds=60)
+
+    session = await store.get_session("sid-1")
+    assert session == {"user_id": "user-1", "token_id": "jti-2"}
+
+
+@pytest.mark.asyncio
+async def test_redis_rotated_session_is_revoked_with_the_user():
+    """Test that a session kept alive by rotation stays in the user's set"""
+    redis = FakeRedis()
+    store = RedisSessionStore(redis)
+    await store.create_session("sid-1", "user-1", "jti-1", ttl_seconds=60)
+    await store.create_session("sid-2", "user-1", "jti-2", ttl_seconds=60)
+
+    redis.advance(50)
+    assert await store.rotate_session("sid-1", "jti-1", "jti-3", ttl_seconds=60)
+    # Past the TTL given at login, which sid-2 was not rotated beyond
+    redis.advance(30)
+    assert await store.get_session("sid-1") is not None
+    assert await store.get_session("sid-2") is None
+
+    assert await store.revoke_user_sessions("user-1") == 1
+    assert await store.get_session("sid-1") is None
+    assert redis.data == {}
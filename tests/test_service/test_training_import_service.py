@@ -0,0 +1,181 @@
+"""
+Training record import service tests
+"""
+
+import io
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.assessment import Quiz, QuizAttempt
+from src.models.content import Content
+from src.models.learning import LearningProgress
+from src.models.user import User
+from src.schemas.learning import ProgressUpdate
+from src.services.assessment_service import AssessmentService
+from src.services.learning_service import LearningService
+from src.services.training_import_service import TrainingRecordImportService
+from src.utils.csv_import import ImportCheckpoint
+
+
+@pytest.fixture
+async def training_catalog(db_session: AsyncSession):
+    """Users, contents and a quiz referred to by the import files"""
+    db_session.add_all(
+        [
+            User(user_id="u1", email="alice@example.com", display_name="Alice"),
+            User(user_id="u2", email="bob@example.com", display_name="Bob"),
+            Content(content_id="c1", title="Security Basics", content_type="video"),
+            Content(content_id="c2", title="Compliance", content_type="document"),
+            Content(content_id="c3", title="Compliance", content_type="video"),
+            Quiz(
+                quiz_id="q1",
+                title="Security Quiz",
+                content_id="c1",
+                passing_score=70.0,
+                created_by="u1",
+            ),
+        ]
+    )
+    await db_session.commit()
+
+
+async def progress_rows(db: AsyncSession):
+    result = await db.execute(
+        select(LearningProgress).order_by(LearningProgress.user_id)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_import_progress(db_session: AsyncSession, training_catalog):
+    """Test that progress rows are resolved by email and title and inserted"""
+    csv_file = io.StringIO(
+        "email,content_title,progress_percentage,time_spent_minutes,"
+        "started_at,completed_at\n"
+        "alice@example.com,Security Basics,100,45,2023-04-01T09:00,2023-04-02T10:00\n"
+        "BOB@example.com,Security Basics,40,,2023-05-01T09:00,\n"
+        "carol@example.com,Security Basics,10,5,2023-05-01T09:00,\n"
+        "alice@example.com,Compliance,10,5,2023-05-01T09:00,\n"
+        "alice@example.com,Unknown Course,10,5,2023-05-01T09:00,\n"
+    )
+
+    result = await TrainingRecordImportService(db_session).import_progress_csv(csv_file)
+
+    assert (result.processed, result.imported, result.failed) == (5, 2, 3)
+    assert [error.line for error in result.errors] == [4, 5, 6]
+    assert "several contents" in result.errors[1].error
+
+    alice, bob = await progress_rows(db_session)
+    assert alice.is_completed
+    assert alice.completed_at == datetime(2023, 4, 2, 10, 0)
+    assert alice.last_accessed_at == alice.completed_at
+    assert (bob.progress_percentage, bob.time_spent_minutes) == (40.0, 0)
+    assert not bob.is_completed
+
+
+@pytest.mark.asyncio
+async def test_import_progress_updates_existing_rows(
+    db_session: AsyncSession, training_catalog
+):
+    """Test that importing again or over live progress does not duplicate rows"""
+    await LearningService(db_session).update_progress(
+        "u2", "c1", ProgressUpdate(progress_percentage=20, time_spent_minutes=10)
+    )
+    content = (
+        "email,content_title,progress_percentage,started_at\n"
+        "alice@example.com,Security Basics,50,2023-04-01T09:00\n"
+        "bob@example.com,Security Basics,60,2023-04-01T09:00\n"
+    )
+
+    service = TrainingRecordImportService(db_session)
+    await service.import_progress_csv(io.StringIO(content))
+    await service.import_progress_csv(io.StringIO(content))
+
+    rows = await progress_rows(db_session)
+    assert len(rows) == 2
+    for row in rows:
+        await db_session.refresh(row)
+    assert [row.progress_percentage for row in rows] == [50.0, 60.0]
+
+
+class UserRecord(BaseModel):
+    email: str
+    display_name: str
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_created_at(db_session: AsyncSession):
+    """Test that a re-import updates rows without resetting created_at"""
+    service = TrainingRecordImportService(db_session)
+
+    async def import_users(display_name: str):
+        await service._import(
+            io.StringIO(f"email,display_name\nalice@example.com,{display_name}\n"),
+            None,
+            UserRecord,
+            lambda record: record.model_dump(),
+            User.__table__,
+            "user_id",
+            ("email",),
+        )
+        user = (await db_session.execute(select(User))).scalar_one()
+        await db_session.refresh(user)
+        return user.display_name, user.created_at
+
+    _, created_at = await import_users("Alice")
+    assert await import_users("Alice Smith") == ("Alice Smith", created_at)
+
+
+@pytest.mark.asyncio
+async def test_import_quiz_attempts(db_session: AsyncSession, training_catalog):
+    """Test that attempts are inserted with derived pass and time spent"""
+    csv_file = io.StringIO(
+        "email,quiz_title,attempt_number,started_at,completed_at,score,max_score,"
+        "is_passed\n"
+        "alice@example.com,Security Quiz,1,2023-04-01T09:00,2023-04-01T09:25,60,10,\n"
+        "alice@example.com,Security Quiz,2,2023-04-03T09:00,2023-04-03T09:15,80,10,\n"
+        "bob@example.com,Security Quiz,1,2023-04-03T09:00,2023-04-03T09:15,50,10,true\n"
+    )
+    statistics = AssessmentService(db_session).get_quiz_statistics
+    assert (await statistics("q1"))["total_attempts"] == 0
+
+    result = await TrainingRecordImportService(db_session).import_quiz_attempts_csv(
+        csv_file
+    )
+
+    assert (result.imported, result.failed) == (3, 0)
+    # The cached statistics of the quiz are dropped
+    assert (await statistics("q1"))["total_attempts"] == 3
+    query = select(QuizAttempt).order_by(
+        QuizAttempt.user_id, QuizAttempt.attempt_number
+    )
+    attempts = (await db_session.execute(query)).scalars().all()
+    assert [attempt.is_passed for attempt in attempts] == [False, True, True]
+    assert attempts[0].time_spent_minutes == 25
+    assert {attempt.status for attempt in attempts} == {"completed"}
+
+
+@pytest.mark.asyncio
+async def test_import_resumes_from_checkpoint(
+    db_session: AsyncSession, training_catalog, tmp_path
+):
+    """Test that lines before the checkpoint are skipped and it is removed"""
+    checkpoint = ImportCheckpoint(str(tmp_path / "progress.csv.checkpoint"))
+    checkpoint.save(2)
+    csv_file = io.StringIO(
+        "email,content_title,progress_percentage,started_at\n"
+        "alice@example.com,Security Basics,50,2023-04-01T09:00\n"
+        "bob@example.com,Security Basics,60,2023-04-01T09:00\n"
+    )
+
+    result = await TrainingRecordImportService(
+        db_session, chunk_size=1
+    ).import_progress_csv(csv_file, ImportCheckpoint(checkpoint.path))
+
+    assert (result.skipped, result.imported) == (1, 1)
+    assert [row.user_id for row in await progress_rows(db_session)] == ["u2"]
+    assert ImportCheckpoint(checkpoint.path).line == 0
@@ -0,0 +1,88 @@
+"""
+User import service tests
+"""
+
+import io
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import User
+from src.schemas.user import UserCreate
+from src.services.user_import_service import UserImportService
+from src.services.user_service import UserService
+from src.utils.csv_import import CSVFormatError
+from src.utils.db_instrumentation import count_statements
+
+
+@pytest.mark.asyncio
+async def test_import_csv_upserts_by_email(db_session: AsyncSession):
+    """Test that new users are created and existing emails updated"""
+    await UserService(db_session).create_user(
+        "existing-id",
+        UserCreate(
+            email="existing@example.com", display_name="Old Name", department="Sales"
+        ),
+    )
+    csv_file = io.StringIO(
+        "email,display_name,department,position\n"
+        "existing@example.com,New Name,Engineering,Lead\n"
+        "new1@example.com,New One,,\n"
+        "new2@example.com,New Two,Engineering,Developer\n"
+    )
+
+    result = await UserImportService(db_session).import_csv(csv_file)
+
+    assert (result.processed, result.imported, result.failed) == (3, 3, 0)
+    users = {
+        user.email: user
+        for user in (await db_session.execute(select(User))).scalars().all()
+    }
+    existing = users["existing@example.com"]
+    assert existing.user_id == "existing-id"
+    await db_session.refresh(existing)
+    assert (existing.display_name, existing.department) == ("New Name", "Engineering")
+    assert users["new1@example.com"].department is None
+    assert users["new2@example.com"].is_active
+
+
+@pytest.mark.asyncio
+async def test_import_csv_reports_row_errors(db_session: AsyncSession):
+    """Test that invalid rows are reported by line and valid rows imported"""
+    csv_file = io.StringIO(
+        "email,display_name\n"
+        "valid@example.com,Valid\n"
+        "not-an-email,Broken\n"
+        "missing-name@example.com,\n"
+    )
+
+    result = await UserImportService(db_session).import_csv(csv_file)
+
+    assert (result.processed, result.imported, result.failed) == (3, 1, 2)
+    assert [error.line for error in result.errors] == [3, 4]
+    assert result.errors[0].error.startswith("email:")
+    assert result.errors[1].error.startswith("display_name:")
+
+
+@pytest.mark.asyncio
+async def test_import_csv_writes_one_statement_per_chunk(db_session: AsyncSession):
+    """Test that rows are written in chunks, not one by one"""
+    lines = [f"user{index}@example.com,User {index}" for index in range(5)]
+    csv_file = io.StringIO("email,display_name\n" + "\n".join(lines) + "\n")
+
+    with count_statements() as stats:
+        result = await UserImportService(db_session, chunk_size=2).import_csv(csv_file)
+
+    assert result.imported == 5
+    inserts = [s for s in stats.recorded if s.lstrip().startswith("INSERT")]
+    assert len(inserts) == 3
+
+
+@pytest.mark.asyncio
+async def test_import_csv_missing_columns(db_session: AsyncSession):
+    """Test that a file without the required columns is rejected"""
+    csv_file = io.StringIO("mail,name\nuser@example.com,User\n")
+
+    with pytest.raises(CSVFormatError, match="display_name, email"):
+        await UserImportService(db_session).import_csv(csv_file)
@@ -3,14 +3,14 @@ User service tests
 """
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.services.user_service import UserService
 from src.schemas.user import UserCreate
 
 
 @pytest.mark.asyncio
-async def test_create_user(db_session: Session):
+async def test_create_user(db_session: AsyncSession):
     """Test user creation"""
     user_service = UserService(db_session)
 
@@ -22,7 +22,7 @@ async def test_create_user(db_session: Session):
 
 
 @pytest.mark.asyncio
-async def test_get_user_by_email(db_session: Session):
+async def test_get_user_by_email(db_session: AsyncSession):
     """Test get user by email"""
     user_service = UserService(db_session)
 
@@ -0,0 +1,67 @@
+"""
+Tests for SQL statement instrumentation
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.utils.db_instrumentation import (
+    assert_max_statements,
+    begin_request_stats,
+    count_statements,
+    end_request_stats,
+    statement_shape,
+)
+
+
+def test_statement_shape_collapses_in_lists():
+    """Test that IN lists of different lengths have the same shape"""
+    first = statement_shape("SELECT * FROM t WHERE id IN (?, ?)")
+    second = statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?, ?)")
+
+    assert first == second == "SELECT * FROM t WHERE id IN (?)"
+
+
+@pytest.mark.asyncio
+async def test_count_statements(db_session: AsyncSession):
+    """Test counting statements inside a block"""
+    with count_statements() as stats:
+        await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT 2"))
+
+    assert stats.statements == 2
+    assert stats.duration >= 0
+
+
+@pytest.mark.asyncio
+async def test_assert_max_statements_fails(db_session: AsyncSession):
+    """Test that exceeding the maximum raises with the executed statements"""
+    with pytest.raises(AssertionError, match="at most 1 SQL statements"):
+        with assert_max_statements(1):
+            await db_session.execute(text("SELECT 1"))
+            await db_session.execute(text("SELECT 2"))
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_detection(db_session: AsyncSession):
+    """Test that a statement repeated more than the threshold is reported"""
+    token = begin_request_stats("/test")
+    for value in range(settings.N_PLUS_ONE_THRESHOLD + 1):
+        await db_session.execute(text("SELECT :value"), {"value": value})
+    stats = end_request_stats(token)
+
+    assert stats.repeated_shapes == ["SELECT ?"]
+
+
+def test_debug_headers(client: TestClient, user_token: str):
+    """Test that statement count and DB time headers are returned in debug"""
+    response = client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert response.status_code == 200
+    assert int(response.headers["x-db-statements"]) >= 1
+    assert float(response.headers["x-db-time-ms"]) >= 0
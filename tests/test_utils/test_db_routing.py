@@ -0,0 +1,173 @@
+"""
+Tests for read replica routing
+"""
+
+import time
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config.database import Base
+from src.models.user import User
+from src.services.cache import JsonCodec, cached, get_cache
+from src.services.user_service import UserService
+from src.utils.db_routing import (
+    RedisReplicaStickiness,
+    ReplicaStickiness,
+    RoutingSession,
+    publish_writes,
+    read_only,
+    set_current_user,
+)
+from src.utils import db_routing
+
+
+@pytest.fixture
+async def routed_sessions(tmp_path, monkeypatch):
+    """Session factory over a primary and a replica that hold different rows"""
+    stickiness = ReplicaStickiness(60)
+    monkeypatch.setattr(db_routing, "get_replica_stickiness", lambda: stickiness)
+    await set_current_user(None)
+
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for target, name in ((primary, "Primary"), (replica, "Replica")):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                User.__table__.insert().values(
+                    user_id=name.lower(),
+                    email=f"{name.lower()}@example.com",
+                    display_name=name,
+                    department="Engineering",
+                    position="Developer",
+                )
+            )
+
+    yield async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replicas=[replica.sync_engine],
+        expire_on_commit=False,
+    )
+
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def user_names(db: AsyncSession):
+    result = await db.execute(select(User.display_name))
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_use_replica(routed_sessions):
+    """Test that decorated reads go to the replica and others to the primary"""
+    async with routed_sessions() as db:
+        users = await UserService(db).get_users()
+        assert [user.display_name for user in users] == ["Replica"]
+
+        assert await user_names(db) == ["Primary"]
+        assert await UserService(db).get_user_by_id("primary") is not None
+
+
+class CachedUserNames:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @cached("user_names", JsonCodec(), lambda: ["users"])
+    @read_only
+    async def get(self):
+        return await user_names(self.db)
+
+
+@pytest.mark.asyncio
+async def test_cache_misses_are_filled_from_primary(routed_sessions):
+    """Test that a cached read_only method is not filled from a replica"""
+    try:
+        async with routed_sessions() as db:
+            assert await CachedUserNames(db).get() == ["Primary"]
+            assert await CachedUserNames(db).get() == ["Primary"]
+            # Outside of the cache the method still reads the replica
+            assert await CachedUserNames.get.__wrapped__(CachedUserNames(db)) == [
+                "Replica"
+            ]
+    finally:
+        await get_cache().clear()
+
+
+@pytest.mark.asyncio
+async def test_session_stays_on_primary_after_write(routed_sessions):
+    """Test that a session reads its own writes once it has written"""
+    async with routed_sessions() as db:
+        db.add(
+            User(
+                user_id="new",
+                email="new@example.com",
+                display_name="New",
+                department="Engineering",
+                position="Developer",
+            )
+        )
+        await db.commit()
+
+        users = await UserService(db).get_users()
+        assert sorted(user.display_name for user in users) == ["New", "Primary"]
+
+
+@pytest.mark.asyncio
+async def test_recent_writer_reads_from_primary(routed_sessions):
+    """Test that a user who just wrote is pinned to the primary"""
+    await set_current_user("writer")
+    async with routed_sessions() as db:
+        await db.execute(
+            User.__table__.update()
+            .where(User.user_id == "primary")
+            .values(display_name="Updated")
+        )
+        await db.commit()
+
+    # Later sessions of the same request read from the primary
+    async with routed_sessions() as db:
+        assert await read_only(user_names)(db) == ["Updated"]
+    await publish_writes()
+
+    # So does the user's next request
+    await set_current_user("writer")
+    async with routed_sessions() as db:
+        assert await read_only(user_names)(db) == ["Updated"]
+
+    await set_current_user("someone-else")
+    async with routed_sessions() as db:
+        assert await read_only(user_names)(db) == ["Replica"]
+
+
+class FakeRedis:
+    """SET with PX and EXISTS, as much as the stickiness store uses"""
+
+    def __init__(self):
+        self.expires_at = {}
+
+    async def set(self, key, value, px):
+        self.expires_at[key] = time.monotonic() + px / 1000
+
+    async def exists(self, key):
+        return int(self.expires_at.get(key, 0) > time.monotonic())
+
+
+@pytest.mark.asyncio
+async def test_pins_are_shared_between_workers():
+    """Test that a pin published by one worker is seen by the others"""
+    redis = FakeRedis()
+    worker, other_worker = (
+        RedisReplicaStickiness(redis, 60),
+        RedisReplicaStickiness(redis, 60),
+    )
+
+    await worker.mark("writer")
+
+    assert await other_worker.is_sticky("writer")
+    assert not await other_worker.is_sticky("someone-else")
+    assert not await RedisReplicaStickiness(FakeRedis(), 60).is_sticky("writer")
@@ -0,0 +1,26 @@
+"""
+HTTP caching tests
+"""
+
+from src.models.content import Content
+from src.utils.http_cache import _matches, etag_for
+
+
+def test_etag_changes_with_any_column():
+    """Test that the ETag covers every column and the extra values"""
+    content = Content(content_id="c1", title="Python入門", content_type="video")
+    etag = etag_for(content)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_for(content) == etag
+    assert etag_for(content, extra=(1,)) != etag
+    content.description = "変更"
+    assert etag_for(content) != etag
+
+
+def test_if_none_match():
+    """Test matching of lists, weak tags and the wildcard"""
+    assert _matches('"a", "b"', '"b"')
+    assert _matches('W/"b"', '"b"')
+    assert _matches("*", '"b"')
+    assert not _matches('"a"', '"b"')
@@ -0,0 +1,62 @@
+"""
+Tests for the event loop lag monitor
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.utils.loop_monitor import EVENT_LOOP_BLOCKED_TOTAL, LoopLagMonitor
+
+
+class RecordingLogger:
+    """Logger that records emitted events"""
+
+    def __init__(self):
+        self.records = []
+
+    def warning(self, event, **kwargs):
+        self.records.append(kwargs)
+
+
+def blocking_handler():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_reports_blocking_call_with_stack():
+    """Test that a blocked loop is counted and logged with the blocking frame"""
+    logger = RecordingLogger()
+    monitor = LoopLagMonitor(
+        interval=0.01, threshold_ms=50, capture_stacks=True, logger=logger
+    )
+    blocked_before = EVENT_LOOP_BLOCKED_TOTAL.labels().value
+
+    monitor.start()
+    await asyncio.sleep(0.05)
+    blocking_handler()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert EVENT_LOOP_BLOCKED_TOTAL.labels().value == blocked_before + 1
+    assert len(logger.records) == 1
+    assert logger.records[0]["lag_ms"] >= 100
+    assert "blocking_handler" in logger.records[0]["stack"]
+
+
+@pytest.mark.asyncio
+async def test_no_report_when_loop_is_responsive():
+    """Test that short awaits are not reported"""
+    logger = RecordingLogger()
+    monitor = LoopLagMonitor(
+        interval=0.01, threshold_ms=50, capture_stacks=False, logger=logger
+    )
+
+    monitor.start()
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+    await monitor.stop()
+
+    assert logger.records == []
+    assert not monitor.is_running
@@ -0,0 +1,73 @@
+"""
+Tests for the metrics registry
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from src.utils.metrics import MetricsRegistry
+
+
+def test_histogram_rendering():
+    """Test cumulative buckets, sum and count"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0)
+    )
+
+    histogram.labels("/a").observe(0.05)
+    histogram.labels("/a").observe(0.5)
+    histogram.labels("/a").observe(5.0)
+
+    output = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in output
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in output
+    assert 'latency_seconds_count{route="/a"} 3' in output
+    assert 'latency_seconds_sum{route="/a"} 5.55' in output
+
+
+def test_merges_worker_snapshots(tmp_path):
+    """Test that snapshots of other workers are merged"""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ["route"])
+    gauge = registry.gauge("in_progress", "In progress")
+    counter.labels("/a").inc(2)
+    gauge.set(1)
+
+    # Snapshot of an exited worker (pid that cannot exist)
+    other = registry.snapshot()
+    with open(tmp_path / "metrics_999999999.json", "w") as f:
+        json.dump(other, f)
+
+    output = registry.render(str(tmp_path))
+    assert 'requests_total{route="/a"} 4' in output
+    # Gauges of exited workers are ignored
+    assert "in_progress 1" in output
+
+
+def test_cache_hit_ratio():
+    """Test that the cache hit ratio is derived from lookups"""
+    from src.utils.metrics import record_cache_lookup, registry
+
+    record_cache_lookup("test_cache", hit=True)
+    record_cache_lookup("test_cache", hit=True)
+    record_cache_lookup("test_cache", hit=False)
+    record_cache_lookup("test_cache", hit=True)
+
+    assert 'cache_hit_ratio{cache="test_cache"} 0.75' in registry.render()
+
+
+def test_metrics_endpoint(client: TestClient):
+    """Test the /metrics endpoint exposes request metrics by route"""
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in (
+        response.text
+    )
+    assert "db_pool_connections" in response.text
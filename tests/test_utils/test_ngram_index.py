@@ -0,0 +1,55 @@
+"""
+Tests for the in-memory n-gram index
+"""
+
+from src.utils.ngram_index import NgramIndex, ngrams
+
+WEIGHTS = {"title": 3, "description": 1}
+
+
+def build_index():
+    return NgramIndex.build(
+        WEIGHTS,
+        [
+            ("c1", {"title": "機械学習の基礎", "description": "教師あり学習"}),
+            ("c2", {"title": "Python入門", "description": "機械学習ライブラリ"}),
+            ("c3", {"title": "Java入門", "description": None}),
+        ],
+    )
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_ngrams():
+    """Test that text is normalized and split into bigrams per word"""
+    assert ngrams("ＰＹ 学習") == {"py", "学習"}
+    assert ngrams("a") == set()
+
+
+def test_search_ranks_title_matches_first():
+    """Test that a title match outranks a description match"""
+    index = build_index()
+
+    assert ids(index.search("機械学習")) == ["c1", "c2"]
+    assert ids(index.search("ｐｙｔｈｏｎ")) == ["c2"]
+    assert ids(index.search("入門", limit=1)) == ["c2"]
+    assert index.search("x") == []
+
+
+def test_remove_and_replace():
+    """Test that removed and replaced documents stay consistent"""
+    index = build_index()
+
+    index.add("c1", {"title": "深層学習", "description": None})
+    index.remove("c3")
+    index.remove("unknown")
+
+    assert len(index) == 2
+    assert ids(index.search("機械学習")) == ["c2"]
+    assert ids(index.search("深層")) == ["c1"]
+    assert index.search("Java") == []
+
+    index.compact()
+    assert ids(index.search("学習")) == ["c1", "c2"]
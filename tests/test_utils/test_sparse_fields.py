@@ -0,0 +1,37 @@
+"""
+Sparse fieldset tests
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from src.models.content import Content
+from src.utils.sparse_fields import parse_fields, project
+
+ALLOWED = ("content_id", "title", "is_published")
+
+
+def test_parse_fields():
+    """Test that names are trimmed, deduplicated and kept in order"""
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields(" title, content_id,title,", ALLOWED) == ["title", "content_id"]
+
+
+@pytest.mark.parametrize("fields", ["title,password", "", " , "])
+def test_parse_fields_rejects_unknown_fields(fields):
+    """Test that names outside the allow-list, or none at all, are a 400"""
+    with pytest.raises(HTTPException) as error:
+        parse_fields(fields, ALLOWED)
+
+    assert error.value.status_code == 400
+    assert "allowed: content_id, title, is_published" in error.value.detail
+
+
+def test_project():
+    """Test that only the named attributes are read"""
+    content = Content(content_id="c1", title="Python入門", content_type="video")
+
+    assert project(content, ["title", "content_id"]) == {
+        "title": "Python入門",
+        "content_id": "c1",
+    }